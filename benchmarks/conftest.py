@@ -0,0 +1,56 @@
+"""
+The fixtures of the benchmarks. The pages in `fixtures/` are hand-built copies of the structure of the ilrdc.tw
+pages (a grammar part, 基本詞彙 and 長篇語料), so the benchmarks run offline. The synthetic pages repeat their rows
+to 10k–100k rows, which makes complexity regressions stand out.
+
+Run them with `python -m pytest benchmarks` (requires pytest-benchmark).
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from ilrdc import urldialector
+from ilrdc.core.grammar import GrammarCleaner
+from ilrdc.core.story import StoryCleaner
+from ilrdc.core.vocabulary import VocabularyCleaner
+from tests.pages import Site, parse_records, read_fixture, serve_site
+
+SCALES = [10_000, 100_000]
+
+# --------------------------------------------------------------------
+# fixtures
+
+
+@pytest.fixture(params=["grammar.html", "vocab.html", "story.html"])
+def page_name(request) -> str:
+    return request.param
+
+
+@pytest.fixture(params=SCALES, ids=lambda rows: f"{rows}rows")
+def rows(request) -> int:
+    return request.param
+
+
+@pytest.fixture
+def grammar_records() -> list[dict[str, str]]:
+    return parse_records(GrammarCleaner, read_fixture("grammar.html"))
+
+
+@pytest.fixture
+def vocab_records() -> list[dict[str, str]]:
+    return parse_records(VocabularyCleaner, read_fixture("vocab.html"))
+
+
+@pytest.fixture
+def story_records() -> list[dict[str, str]]:
+    return parse_records(StoryCleaner, read_fixture("story.html"))
+
+
+@pytest.fixture(scope="session")
+def ilrdc_server():
+    """The ilrdc_server fixture serves the fixtures on a local port and points BASE_URL at it."""
+    base_url = urldialector.BASE_URL
+    with serve_site(Site(log=False)) as site:
+        urldialector.BASE_URL = site.base_url
+        yield site.base_url
+    urldialector.BASE_URL = base_url
@@ -0,0 +1,35 @@
+from ilrdc.base import get_backend
+from ilrdc.core.grammar import GrammarCleaner
+from ilrdc.core.vocabulary import VocabularyCleaner
+from tests.pages import read_fixture, scale_fixture
+
+
+def extract(cleaner: type, html: str) -> list[dict[str, str]]:
+    backend = get_backend("lxml")
+    return list(cleaner(backend.parse(html), backend).extract_data())
+
+
+def test_grammar_extract_data(benchmark):
+    records = benchmark(extract, GrammarCleaner, read_fixture("grammar.html"))
+    assert len(records) == 40
+    assert records[0]["Id"] == "(4-1)a."
+    assert records[0]["sound_url"] == "https://ilrdc.tw/grammar/sound/2/4-1-1.mp3"
+
+
+def test_vocabulary_extract_data(benchmark):
+    records = benchmark(extract, VocabularyCleaner, read_fixture("vocab.html"))
+    assert len(records) == 12
+    assert records[0]["sound_url"] == "沒有音檔"
+    assert {record["alphabet"] for record in records} == {"A", "B", "C", "H", "K", "M", "N", "S", "U", "Y"}
+
+
+def test_grammar_extract_data_scaling(benchmark, rows):
+    html = scale_fixture("grammar.html", rows)
+    records = benchmark.pedantic(extract, (GrammarCleaner, html), rounds=3)
+    assert len(records) == rows
+
+
+def test_vocabulary_extract_data_scaling(benchmark, rows):
+    html = scale_fixture("vocab.html", rows)
+    records = benchmark.pedantic(extract, (VocabularyCleaner, html), rounds=3)
+    assert len(records) == html.count('class="ab"')
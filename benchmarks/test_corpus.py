@@ -0,0 +1,26 @@
+import sys
+from ilrdc.corpus import Corpus
+
+
+def tagged_records(records: list[dict[str, str]], rows: int) -> list[dict[str, str]]:
+    dialects = ["泰雅語", "邵語"]
+    return [
+        {"dialect_ch": dialects[num % 2], "part_type": "vocab", "part": "基本詞彙", **records[num % len(records)]}
+        for num in range(rows)
+    ]
+
+
+def test_corpus_from_records(benchmark, vocab_records, rows):
+    records = tagged_records(vocab_records, rows)
+    corpus = benchmark.pedantic(Corpus.from_records, (records,), rounds=3)
+    assert len(corpus) == rows
+    assert corpus[1] == records[1] and corpus.to_dicts()[-1] == records[-1]
+    dict_bytes = sum(sys.getsizeof(record) + sum(map(sys.getsizeof, record.values())) for record in records)
+    assert corpus.nbytes < dict_bytes / 2
+
+
+def test_corpus_filter(benchmark, vocab_records):
+    corpus = Corpus.from_records(tagged_records(vocab_records, 10_000))
+    selection = benchmark(corpus.filter, dialect="邵語", part="vocab")
+    assert len(selection) == 5_000
+    assert all(row["dialect_ch"] == "邵語" for row in selection.filter(alphabet="A"))
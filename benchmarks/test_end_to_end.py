@@ -0,0 +1,16 @@
+from ilrdc import ILRDC
+
+
+def download_all() -> dict[str, object]:
+    return {
+        part_type: ILRDC("泰雅語", part_type).download_data()
+        for part_type in ("grammar", "vocab", "story")
+    }
+
+
+def test_download_data(benchmark, ilrdc_server):
+    data = benchmark.pedantic(download_all, rounds=3)
+    assert len(data["grammar"]) == 15
+    assert all(len(records) == 40 for part in data["grammar"] for records in part.values())
+    assert len(data["vocab"]["基本詞彙"]) == 12
+    assert [list(story) for story in data["story"]] == [["紋面"], ["祖靈"], ["老人"]]
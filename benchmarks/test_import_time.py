@@ -0,0 +1,41 @@
+import sys
+import subprocess
+import pytest
+
+HEAVY_MODULES = ["pandas", "pyarrow", "pydantic", "bs4", "lxml", "requests", "fake_useragent", "aiohttp"]
+IMPORT_BUDGET = 0.05
+
+
+def import_time(statement: str) -> float:
+    """The import_time function runs `statement` in a fresh interpreter, and returns the cumulative import time of
+    the ilrdc package in seconds, as reported by `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        _, cumulative_us, name = line.split("|")
+        if name.strip() == "ilrdc":
+            return int(cumulative_us) / 1e6
+    raise AssertionError("ilrdc was not imported")
+
+
+def loaded_modules(statement: str) -> set[str]:
+    code = f"{statement}\nimport sys\nprint(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+@pytest.mark.parametrize(
+    "statement",
+    ["import ilrdc", "from ilrdc import ILRDCDialect; ILRDCDialect.get_list_info()", "from ilrdc import ILRDC"],
+)
+def test_no_heavy_imports(statement):
+    assert loaded_modules(statement).isdisjoint(HEAVY_MODULES)
+
+
+def test_import_time_budget():
+    best = min(import_time("from ilrdc import ILRDCDialect") for _ in range(5))
+    assert best < IMPORT_BUDGET, f"import ilrdc took {best * 1000:.1f} ms"
@@ -0,0 +1,34 @@
+from ilrdc.core.story import StoryCleaner, StoryDownloader
+from ilrdc.urldialector import URLDialector
+from tests.pages import parse_records, scale_fixture
+
+
+def test_get_each_story(benchmark, story_records):
+    downloader = StoryDownloader(URLDialector("泰雅語", "長篇語料"))
+    stories = benchmark(downloader.get_each_story, story_records)
+    assert [list(story) for story in stories] == [["紋面"], ["祖靈"], ["老人"]]
+    assert all(len(sentences) == 8 for story in stories for sentences in story.values())
+
+
+def test_get_each_story_scaling(benchmark, rows):
+    records = parse_records(StoryCleaner, scale_fixture("story.html", rows))
+    downloader = StoryDownloader(URLDialector("泰雅語", "長篇語料"))
+    stories = benchmark.pedantic(downloader.get_each_story, (records,), rounds=5)
+    # the fixture repeats blocks of 10 rows: a title row, the row of the story audio and 8 sentences
+    assert rows % 10 == 0 and len(stories) == rows // 10
+    assert [list(story) for story in stories[:4]] == [["紋面"], ["祖靈"], ["老人"], ["紋面"]]
+    assert [len(sentences) for story in stories for sentences in story.values()] == [8] * (rows // 10)
+
+
+def test_get_each_story_without_titles():
+    downloader = StoryDownloader(URLDialector("泰雅語", "長篇語料"))
+    assert downloader.get_each_story([{"dialect": "a", "chinese_translation": "甲", "sound_url": ""}]) == []
+
+
+def test_get_story(benchmark, ilrdc_server):
+    downloader = StoryDownloader(URLDialector("泰雅語", "長篇語料"))
+    index = downloader.get_story_index()
+    assert [(entry.title, entry.sentences) for entry in index] == [("紋面", 8), ("祖靈", 8), ("老人", 8)]
+    sentences = benchmark(downloader.get_story, "祖靈")
+    assert len(sentences) == 8 and all(sentence["dialect"] for sentence in sentences)
+    assert [list(story) for story in downloader.download()] == [["紋面"], ["祖靈"], ["老人"]]
@@ -0,0 +1,28 @@
+import os
+from ilrdc.ilrdc import jsonify, tablizer
+
+
+def synthetic_data(records: list[dict[str, str]], rows: int) -> dict[str, list]:
+    return {"否定句結構": [records[num % len(records)] for num in range(rows)]}
+
+
+def test_jsonify(benchmark, tmp_path, grammar_records):
+    paths = benchmark(jsonify, "泰雅語", {"否定句結構": grammar_records}, str(tmp_path))
+    assert [os.path.basename(path) for path in paths] == ["泰雅語 - 否定句結構.json"]
+
+
+def test_tablizer(benchmark, tmp_path, vocab_records):
+    paths = benchmark(tablizer, "泰雅語", {"基本詞彙": vocab_records}, str(tmp_path))
+    assert [os.path.basename(path) for path in paths] == ["泰雅語 - 基本詞彙.csv"]
+
+
+def test_jsonify_scaling(benchmark, tmp_path, grammar_records, rows):
+    data = synthetic_data(grammar_records, rows)
+    benchmark.pedantic(jsonify, ("泰雅語", data, str(tmp_path)), rounds=3)
+
+
+def test_tablizer_scaling(benchmark, tmp_path, grammar_records, rows):
+    data = synthetic_data(grammar_records, rows)
+    (path,) = benchmark.pedantic(tablizer, ("泰雅語", data, str(tmp_path)), rounds=3)
+    with open(path, encoding="utf_8_sig") as file:
+        assert sum(1 for _ in file) == rows + 1
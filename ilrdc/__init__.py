@@ -1,2 +1,41 @@
-from .ilrdc import ILRDC
-from .urldialector import URLDialector, ILRDCDialect, ILRDCPart
+"""
+The heavy modules are imported when their names are first used, so that e.g. `ILRDCDialect.get_list_info()` does
+not load requests, lxml, bs4 or pydantic.
+"""
+import importlib
+from .urldialector import URLDialector, ILRDCDialect, ILRDCPart, RequestCatalog, get_catalog, use_catalog, refresh_catalog
+
+LAZY_ATTRIBUTES = {
+    "ILRDC": ".ilrdc",
+    "export_parquet": ".ilrdc",
+    "HTTPSession": ".util",
+    "Metrics": ".util",
+    "RecordCache": ".util",
+    "ResponseCache": ".util",
+    "ILRDCBatch": ".plan",
+    "Request": ".plan",
+    "Corpus": ".corpus",
+}
+
+__all__ = [
+    "URLDialector",
+    "ILRDCDialect",
+    "ILRDCPart",
+    "RequestCatalog",
+    "get_catalog",
+    "use_catalog",
+    "refresh_catalog",
+    *LAZY_ATTRIBUTES,
+]
+
+
+def __getattr__(name: str):
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(LAZY_ATTRIBUTES))
@@ -1 +1,2 @@
 from .base import DataCleaner, DataDownloader
+from .backend import ParserBackend, BeautifulSoupBackend, LxmlBackend, get_backend
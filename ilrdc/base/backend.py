@@ -0,0 +1,146 @@
+import re
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from lxml import etree
+
+
+class ParserBackend(ABC):
+    """
+    The ParserBackend object parses the html and walks its tags on behalf of the cleaners, so that the cleaners do
+    not depend on a particular html library.
+    """
+
+    @abstractmethod
+    def parse(self, html: str) -> Any:
+        """The parse method parses the html into a document."""
+        pass
+
+    @abstractmethod
+    def find(
+        self, tag, name: Optional[str] = None, class_: Optional[str] = None, id: Optional[str] = None
+    ) -> Optional[Any]:
+        """The find method finds the first descendant of `tag` matching the tag name, class and id."""
+        pass
+
+    @abstractmethod
+    def find_all(self, tag, name: str) -> list:
+        """The find_all method finds all the descendants of `tag` with the tag name."""
+        pass
+
+    @abstractmethod
+    def text(self, tag) -> str:
+        """The text method gets all the text in `tag`."""
+        pass
+
+    @abstractmethod
+    def sound_src(self, tag, pattern: re.Pattern) -> Optional[str]:
+        """The sound_src method gets the sound url (e.g. `/sound/2/4-1-1.mp3`) in `tag`; `pattern` is the regex
+        matching it in the html of the tag."""
+        pass
+
+
+class BeautifulSoupBackend(ParserBackend):
+    """
+    The BeautifulSoupBackend object walks a BeautifulSoup tree, and finds the sound url by searching the html of the
+    tag with a regex. bs4 is only imported once a page is parsed.
+    """
+
+    def parse(self, html: str) -> "BeautifulSoup":
+        from bs4 import BeautifulSoup
+
+        return BeautifulSoup(html, "lxml")
+
+    def find(self, tag, name=None, class_=None, id=None):
+        attrs = {}
+        if class_ is not None:
+            attrs["class_"] = class_
+        if id is not None:
+            attrs["id"] = id
+        return tag.find(name, **attrs)
+
+    def find_all(self, tag, name: str) -> list:
+        return tag.find_all(name)
+
+    def text(self, tag) -> str:
+        return tag.text
+
+    def sound_src(self, tag, pattern: re.Pattern) -> Optional[str]:
+        match = pattern.search(str(tag))
+        if match is None:
+            return None
+        return match.group()
+
+
+class LxmlBackend(ParserBackend):
+    """
+    The LxmlBackend object walks an lxml tree with compiled XPath expressions, and reads the `src` attribute
+    directly instead of serializing the tag back to html. lxml is imported when the backend is created.
+    """
+
+    SOUND_SRC = re.compile(r"^\.(.*(mp3|wav|ogg|wma))")
+
+    def __init__(self) -> None:
+        from lxml import etree, html
+
+        self.etree = etree
+        self.document_fromstring = html.document_fromstring
+        self.xpaths: dict[tuple, "etree.XPath"] = {}
+        self.src_xpath = etree.XPath("descendant-or-self::*/@src")
+        self.text_xpath = etree.XPath("string()")
+
+    def xpath(self, name: Optional[str], class_: Optional[str], id: Optional[str]) -> "etree.XPath":
+        """The xpath method compiles the XPath expression of a query once.
+
+        Returns:
+            an etree.XPath object
+        """
+        key = (name, class_, id)
+        if key not in self.xpaths:
+            predicates = ""
+            if class_ is not None:
+                predicates += f"[contains(concat(' ', normalize-space(@class), ' '), ' {class_} ')]"
+            if id is not None:
+                predicates += f"[@id='{id}']"
+            self.xpaths[key] = self.etree.XPath(f"descendant::{name or '*'}{predicates}")
+        return self.xpaths[key]
+
+    def parse(self, html: str):
+        return self.document_fromstring(html)
+
+    def find(self, tag, name=None, class_=None, id=None):
+        result = self.xpath(name, class_, id)(tag)
+        return result[0] if result else None
+
+    def find_all(self, tag, name: str) -> list:
+        return self.xpath(name, None, None)(tag)
+
+    def text(self, tag) -> str:
+        return str(self.text_xpath(tag))
+
+    def sound_src(self, tag, pattern: re.Pattern) -> Optional[str]:
+        for src in self.src_xpath(tag):
+            match = self.SOUND_SRC.match(src)
+            if match is not None:
+                return match.group(1)
+        return None
+
+
+BACKENDS = {"bs4": BeautifulSoupBackend, "lxml": LxmlBackend}
+
+
+def get_backend(name: str) -> ParserBackend:
+    """The get_backend function creates the parser backend by its name.
+
+    Args:
+        name (str): either "bs4" or "lxml"
+
+    Returns:
+        a ParserBackend object
+    """
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"unknown parser {name!r}, choose from {list(BACKENDS)}") from None
@@ -1,11 +1,33 @@
+import time
 from abc import ABC, abstractmethod
+from typing import AsyncGenerator, ClassVar, Generator, Iterable, Union
+from ilrdc.util import get_default_session
+from .backend import ParserBackend, get_backend
 
 
 class DataCleaner(ABC):
     """
-    The DataCleaner objects cleans the data.
+    The DataCleaner objects cleans the data. The tags are walked by a ParserBackend, so that the cleaners work with
+    either BeautifulSoup or lxml. Bump `parser_version` whenever the cleaned records change, so that the records
+    cached by a RecordCache are parsed again.
     """
 
+    backend: ParserBackend
+
+    parser_version: ClassVar[str] = "1"
+    validation_seconds: float = 0.0
+
+    def validate(self, model: type, **fields) -> dict[str, str]:
+        """The validate method validates a row with the pydantic `model`, and adds up the time it takes.
+
+        Returns:
+            a dict
+        """
+        start = time.perf_counter()
+        data = model(**fields).dict()
+        self.validation_seconds += time.perf_counter() - start
+        return data
+
     @abstractmethod
     def clean_data(self, specified_tag):
         """The clean_data method cleans the data from the BeautifulSoup object."""
@@ -18,10 +40,160 @@ class DataCleaner(ABC):
 
 
 class DataDownloader(ABC):
+    """
+    The DataDownloader object fetches the pages with `self.session` and cleans them with `cleaner`, using the parser
+    backend named by `self.parser`, and validates them with pydantic if `self.strict` is True. The cleaned records
+    are looked up in `self.record_cache` first. The fetch, parse and validation times go to `self.metrics`, if given.
+    """
+
+    cleaner: ClassVar[type[DataCleaner]]
+    part_type: ClassVar[str]
+
+    @property
+    def request_infos(self) -> list[dict[str, str]]:
+        """The request_infos property makes `self.request_info_list` a list.
+
+        Returns:
+            a list
+        """
+        info_list = self.request_info_list
+        if isinstance(info_list, dict):
+            return [info_list]
+        return list(info_list)
+
+    def fetch_page(self, url: str) -> str:
+        """The fetch_page method fetches the html of the argument `url`."""
+        return (self.session or get_default_session()).fetch(url, self.metrics)
+
+    async def afetch_page(self, url: str, client) -> str:
+        """The afetch_page coroutine is the async version of `fetch_page`."""
+        return await (self.session or get_default_session()).afetch(url, client, self.metrics)
+
+    @property
+    def parser_version(self) -> str:
+        """The parser_version property names the cleaner and its version, which is part of the record cache key."""
+        return f"{self.cleaner.__name__}/{self.cleaner.parser_version}"
+
+    def parse_page(self, html: str, url: str = "") -> Iterable[dict[str, str]]:
+        """The parse_page method cleans the argument `html`, unless the same page has been cleaned by the same
+           parser version before.
+
+        Args:
+            html (str): the html of the page
+            url (str): the url of the page, which labels the parse event in `self.metrics`
+
+        Returns:
+            an iterable of the cleaned records
+        """
+        start = time.perf_counter()
+        parser_version = self.parser_version
+        if self.record_cache is not None:
+            records = self.record_cache.get(html, parser_version)
+            if records is not None:
+                if self.metrics is not None:
+                    self.metrics.record(
+                        "parse", time.perf_counter() - start, url=url, rows=len(records), cache="hit"
+                    )
+                return records
+        backend = get_backend(self.parser)
+        cleaner = self.cleaner(backend.parse(html), backend, self.strict)
+        records = cleaner.extract_data()
+        if self.record_cache is not None or self.metrics is not None:
+            records = list(records)
+        if self.record_cache is not None:
+            self.record_cache.put(html, parser_version, records)
+        if self.metrics is not None:
+            self.metrics.record("parse", time.perf_counter() - start, url=url, rows=len(records))
+            if self.strict:
+                self.metrics.record("validate", cleaner.validation_seconds, url=url, rows=len(records))
+        return records
+
+    def tag_records(
+        self, info: dict, records: Iterable[dict[str, str]]
+    ) -> Generator[dict[str, str], None, None]:
+        """The tag_records method tags the cleaned records of a page with the dialect, part type and part.
+
+        Args:
+            info (dict): the request info of the page
+            records (Iterable): the cleaned records of the page
+
+        Yields:
+            a dict: {"dialect_ch": "泰雅語", "part_type": "grammar", "part": "基本句型及詞序", "Id": ..., ...}
+        """
+        tags = {
+            "dialect_ch": self.url_dialector.dialect_ch,
+            "part_type": self.part_type,
+            "part": info["part_name"],
+        }
+        for record in records:
+            yield {**tags, **record}
+
+    def iter_records(self) -> Generator[dict[str, str], None, None]:
+        """The iter_records method yields the flat records page by page, as soon as each row is parsed.
+
+        Yields:
+            a dict tagged by `tag_records`
+        """
+        for info in self.request_infos:
+            html = self.fetch_page(info["part_url"])
+            yield from self.tag_records(info, self.parse_page(html, info["part_url"]))
+
+    async def aiter_records(self, client) -> AsyncGenerator[dict[str, str], None]:
+        """The aiter_records method is the async version of `iter_records`. All the pages are fetched concurrently,
+           and each page is parsed as soon as it arrives.
+
+        Args:
+            client (aiohttp.ClientSession): the shared async client
+
+        Yields:
+            a dict tagged by `tag_records`
+        """
+        import asyncio
+
+        async def fetch(info):
+            return info, await self.afetch_page(info["part_url"], client)
+
+        for task in asyncio.as_completed([fetch(info) for info in self.request_infos]):
+            info, html = await task
+            for record in self.tag_records(info, self.parse_page(html, info["part_url"])):
+                yield record
+
+    def failure_message(self, info: dict, error: Exception) -> str:
+        """The failure_message method describes the failure of a page, which is returned in place of its data."""
+        return f"「{info['part_name']}」下載失敗：{error!r}"
+
+    def assemble_page(self, info: dict, pages: dict[str, Union[list, Exception]]) -> Union[dict, list, str]:
+        """The assemble_page method formats the cleaned records of a page fetched beforehand.
+
+        Args:
+            info (dict): the request info of the page
+            pages (dict): {url: the cleaned records of the page, or the exception raised while fetching it}
+
+        Returns:
+            the data of the page formatted by `format_data`, or an error message
+        """
+        records = pages[info["part_url"]]
+        if isinstance(records, Exception):
+            return self.failure_message(info, records)
+        return self.format_data(info["part_name"], list(records))
+
     @abstractmethod
     def get_data(self, info: dict):
         pass
-    
-    @abstractmethod 
+
+    @abstractmethod
     def download(self):
         pass
+
+    @abstractmethod
+    async def aget_data(self, info: dict, client):
+        pass
+
+    @abstractmethod
+    async def adownload(self, client):
+        pass
+
+    @abstractmethod
+    def assemble(self, pages: dict[str, Union[list, Exception]]):
+        """The assemble method builds the same data as `download` from the pages fetched beforehand."""
+        pass
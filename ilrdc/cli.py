@@ -0,0 +1,263 @@
+import os
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, TextIO
+from dataclasses import dataclass
+from .sync import PART_TYPES, Synchronizer
+from .urldialector import get_catalog
+from .util import HTTPSession, Metrics, RecordCache, ResponseCache, Scheduler, AdaptiveLimiter
+
+FORMAT_CHOICES = ["json", "jsonl", "csv"]
+
+
+# --------------------------------------------------------------------
+# helper functions
+
+
+def split_choices(value: str, choices: list[str], name: str) -> list[str]:
+    """The split_choices function splits a comma-separated argument, where "all" stands for every choice.
+
+    Args:
+        value (str): the argument, e.g. "泰雅語,邵語" or "all"
+        choices (list): the valid choices
+        name (str): the name of the argument
+
+    Returns:
+        a list
+    """
+    if value == "all":
+        return list(choices)
+    values = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in values if item not in choices]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown {name}: {', '.join(unknown)} (choose from {', '.join(choices)})"
+        )
+    return values
+
+
+def positive_int(value: str) -> int:
+    """The positive_int function is the type of the options which count something, e.g. `--jobs`."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def build_session(args: argparse.Namespace) -> HTTPSession:
+    """The build_session function creates the HTTPSession from the command-line options."""
+    cache = None
+    if args.cache_dir:
+        cache = ResponseCache(args.cache_dir, max_age=args.max_age)
+    scheduler = Scheduler(rate=args.rate, limiter=AdaptiveLimiter(initial=args.jobs))
+    return HTTPSession(pool_size=args.jobs, timeout=args.timeout, cache=cache, scheduler=scheduler)
+
+
+def run_sync(args: argparse.Namespace) -> int:
+    """The run_sync function runs `ilrdc sync`.
+
+    Returns:
+        an int: the exit code
+    """
+    dialects = split_choices(args.dialects, list(get_catalog().dialects), "dialects")
+    part_types = split_choices(args.parts, list(PART_TYPES), "parts")
+    formats = tuple(split_choices(args.format, FORMAT_CHOICES, "formats"))
+    record_cache = RecordCache(args.record_cache) if args.record_cache else None
+    with build_session(args) as session:
+        synchronizer = Synchronizer(
+            args.output_dir,
+            formats,
+            session=session,
+            record_cache=record_cache,
+            max_workers=args.jobs,
+        )
+        report = synchronizer.sync(dialects, part_types)
+    for state in ("changed", "unchanged", "failed"):
+        print(f"{state}: {len(report[state])}")
+    for url in report["failed"]:
+        print(f"failed: {url}", file=sys.stderr)
+    return 1 if report["failed"] else 0
+
+
+def plan_export(dialects: list[str], part_types: list[str]) -> list[tuple[str, str, Optional[str], str]]:
+    """The plan_export function splits the export into jobs: a job per grammar part, so that the parts of a dialect
+       are downloaded in parallel, and a job per vocabulary or story page.
+
+    Returns:
+        a list of tuples: (dialect chinese name, part type, part, url)
+    """
+    catalog = get_catalog()
+    jobs = []
+    for dialect_ch in dialects:
+        for part_type in part_types:
+            parts = catalog.part_types[part_type] if part_type == "grammar" else (None,)
+            for part in parts:
+                info = catalog.lookup(dialect_ch, part_type, part)
+                jobs.append((dialect_ch, part_type, part, info["part_url"]))
+    return jobs
+
+
+@dataclass
+class Progress:
+    """
+    The Progress object reports the finished jobs, the rows and the throughput on stderr while the export runs: a
+    line updated in place on a terminal, or a line every `interval` seconds otherwise (e.g. in a cron log).
+    """
+
+    total: int
+    metrics: Metrics
+    interval: float = 1.0
+    stream: TextIO = sys.stderr
+
+    def __post_init__(self) -> None:
+        self.done, self.failed = 0, 0
+        self.started_at = time.monotonic()
+        self.tty = self.stream.isatty()
+        if not self.tty:
+            self.interval = max(self.interval, 10.0)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self) -> "Progress":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stopped.set()
+        self.thread.join()
+        self.show(final=True)
+
+    def update(self, ok: bool) -> None:
+        self.done += 1
+        self.failed += not ok
+
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        summary = self.metrics.summary()
+        rows = summary.get("parse", {}).get("rows", 0)
+        megabytes = summary.get("fetch", {}).get("bytes", 0) / 1e6
+        eta = f"{(self.total - self.done) * elapsed / self.done:.0f}s" if self.done else "--"
+        return (
+            f"{self.done}/{self.total} parts, {self.failed} failed, {rows} rows, "
+            f"{rows / elapsed:.0f} rows/s, {megabytes / elapsed:.2f} MB/s, "
+            f"elapsed {elapsed:.0f}s, ETA {eta}"
+        )
+
+    def show(self, final: bool = False) -> None:
+        if self.tty:
+            print(f"\r\033[K{self.line()}", end="\n" if final else "", file=self.stream, flush=True)
+        else:
+            print(self.line(), file=self.stream, flush=True)
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.show()
+
+
+def export_job(job: tuple, args: argparse.Namespace, formats: tuple, **options) -> list[str]:
+    """The export_job function downloads the data of a job and writes it in every format of `formats`."""
+    from .ilrdc import ILRDC
+
+    dialect_ch, part_type, part, _ = job
+    return ILRDC(dialect_ch, part_type, part, **options).export(formats, args.out)
+
+
+def run_export(args: argparse.Namespace) -> int:
+    """The run_export function runs `ilrdc export`.
+
+    Returns:
+        an int: the exit code
+    """
+    dialects = split_choices(args.dialects, list(get_catalog().dialects), "dialects")
+    part_types = split_choices(args.parts, list(PART_TYPES), "parts")
+    formats = tuple(split_choices(args.format, FORMAT_CHOICES, "formats"))
+    jobs = plan_export(dialects, part_types)
+    if args.dry_run:
+        for dialect_ch, part_type, part, url in jobs:
+            print(f"{dialect_ch}\t{part_type}\t{part or '-'}\t{url}")
+        print(f"{len(jobs)} parts, formats: {', '.join(formats)}, output: {args.out}")
+        return 0
+    os.makedirs(args.out, exist_ok=True)
+    metrics = Metrics()
+    record_cache = RecordCache(args.record_cache) if args.record_cache else None
+    paths, failures = [], []
+    with build_session(args) as session, ThreadPoolExecutor(args.jobs) as executor:
+        options = {"session": session, "record_cache": record_cache, "metrics": metrics}
+        futures = {executor.submit(export_job, job, args, formats, **options): job for job in jobs}
+        with Progress(len(jobs), metrics) as progress:
+            for future in as_completed(futures):
+                try:
+                    paths.extend(future.result())
+                except Exception as error:
+                    failures.append((futures[future], error))
+                progress.update(ok=future.exception() is None)
+    print(f"exported: {len(paths)} files")
+    print(f"failed: {len(failures)}")
+    for (dialect_ch, part_type, part, url), error in failures:
+        print(f"failed: {dialect_ch} {part or part_type} {url}: {error!r}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+# --------------------------------------------------------------------
+# public interface
+
+
+def add_common_arguments(parser: argparse.ArgumentParser, jobs_help: str) -> None:
+    """The add_common_arguments function adds the options shared by the subcommands."""
+    parser.add_argument("--dialects", default="all", help="comma-separated dialects, or all")
+    parser.add_argument("--parts", default="all", help="comma-separated part types (grammar,vocab,story), or all")
+    parser.add_argument("--jobs", type=positive_int, default=10, help=jobs_help)
+    parser.add_argument("--timeout", type=float, default=30, help="the timeout of a request in seconds")
+    parser.add_argument("--rate", type=float, help="the maximum number of requests per second")
+    parser.add_argument("--cache-dir", help="the directory of the page cache")
+    parser.add_argument("--max-age", type=float, help="the number of seconds a cached page is fresh")
+    parser.add_argument("--record-cache", help="the SQLite file of the record cache")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """The build_parser function builds the parser of the `ilrdc` command."""
+    parser = argparse.ArgumentParser(
+        prog="ilrdc", description="Download the data from ilrdc.tw."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sync = subparsers.add_parser(
+        "sync", help="only download the pages that have changed since the last sync"
+    )
+    sync.add_argument("output_dir", help="the output directory")
+    sync.add_argument("--format", default="json", help="comma-separated formats (json,jsonl,csv)")
+    add_common_arguments(sync, "the number of pages checked at the same time")
+    sync.set_defaults(func=run_sync)
+
+    export = subparsers.add_parser(
+        "export", help="download every part in parallel and write it, showing the progress"
+    )
+    export.add_argument("--out", default=".", help="the output directory")
+    export.add_argument("--format", default="jsonl", help="comma-separated formats (json,jsonl,csv)")
+    export.add_argument("--dry-run", action="store_true", help="print the parts and their urls without downloading")
+    add_common_arguments(export, "the number of parts downloaded at the same time")
+    export.set_defaults(func=run_export)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """The main function is the entry point of the `ilrdc` command.
+
+    Args:
+        argv (list): the command-line arguments, `sys.argv[1:]` by default
+
+    Returns:
+        an int: the exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
@@ -1,3 +1,10 @@
 from .story import StoryDownloader
 from .grammar import GrammarDownloader
 from .vocabulary import VocabularyDownloader
+
+
+DOWNLOADERS = {
+    "grammar": GrammarDownloader,
+    "vocab": VocabularyDownloader,
+    "story": StoryDownloader,
+}
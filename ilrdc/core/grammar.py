@@ -1,53 +1,33 @@
 import re
-import pydantic
-from typing import Union
-from bs4 import BeautifulSoup
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, ClassVar, Iterable, Optional, Union
+from dataclasses import dataclass, field
 from ilrdc.urldialector import URLDialector
-from ilrdc.base import DataCleaner, DataDownloader
-from ilrdc.util import modify_sound_url, download_url
+from ilrdc.base import DataCleaner, DataDownloader, ParserBackend, BeautifulSoupBackend
+from ilrdc.util import HTTPSession, Metrics, RecordCache, normalize_sound_url, normalize_content
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
-class GrammarInfo(pydantic.BaseModel):
-    """
-    The GrammarInfo object keeps track of an item in inventory, including Id, dialect, chinese translation and sound url.`
-    """
-
-    Id: str
-    dialect: str
-    chinese_translation: str
-    sound_url: str
-
-    @pydantic.validator("sound_url")
-    @classmethod
-    def is_soud_url(cls, value) -> str:
-        """The is_soud_url method makes sure there is sould_url value definied."""
-        if not value:
-            return "沒有音檔"
 
-        return modify_sound_url(value)
-
-    @pydantic.validator("Id", "dialect", "chinese_translation")
-    @classmethod
-    def check_content(cls, value):
-        """The check_content method makes sure there is Id, dialect or chinese translation value definied"""
-        if value is None:
-            return "not found"
-        return value
+SOUND_PATTERN = re.compile('(?<=src\="\.).*(mp3|wav|ogg|wma)(?="\>\<td)')
 
 
 @dataclass
 class GrammarCleaner(DataCleaner):
     """
-    The GrammarCleaner objects first extracts the data from the html, and then cleans it.
+    The GrammarCleaner objects first extracts the data from the html, and then cleans it. The rows are validated by
+    GrammarInfo only if `strict` is True.
     """
 
-    soup: BeautifulSoup
+    soup: "BeautifulSoup"
+    backend: ParserBackend = field(default_factory=BeautifulSoupBackend)
+    strict: bool = False
 
     def __post_init__(self) -> None:
-        self.table_tag = self.soup.find(class_="template-1")
+        self.table_tag = self.backend.find(self.soup, class_="template-1")
 
-    def clean_data(self, specified_tag: BeautifulSoup) -> dict[str, str]:
+    def clean_data(self, specified_tag: "BeautifulSoup") -> dict[str, str]:
         """
         Args:
             specified_tag (BeautifulSoup): the specified html tag
@@ -60,32 +40,50 @@ class GrammarCleaner(DataCleaner):
                 'sound_url': 'https://ilrdc.tw/grammar/sound/2/4-1-1.mp3'}
             }
         """
-        Id = specified_tag.find(class_="code").text.strip()
-        dialect = specified_tag.find(class_="ab").text.strip()
-        chinese_translation = specified_tag.find(class_="ch").text.strip()
-        sound_url = re.search(
-            '(?<=src\="\.).*(mp3|wav|ogg|wma)(?="\>\<td)', str(specified_tag)
-        ).group()
-        data = GrammarInfo(
+        backend = self.backend
+        Id = backend.text(backend.find(specified_tag, class_="code")).strip()
+        dialect = backend.text(backend.find(specified_tag, class_="ab")).strip()
+        chinese_translation = backend.text(backend.find(specified_tag, class_="ch")).strip()
+        sound_url = backend.sound_src(specified_tag, SOUND_PATTERN) or ""
+        if not self.strict:
+            return {
+                "Id": normalize_content(Id),
+                "dialect": normalize_content(dialect),
+                "chinese_translation": normalize_content(chinese_translation),
+                "sound_url": normalize_sound_url(sound_url),
+            }
+        from .models import GrammarInfo
+
+        return self.validate(
+            GrammarInfo,
             Id=Id,
             dialect=dialect,
             chinese_translation=chinese_translation,
             sound_url=f"{sound_url}",
         )
-        return data.dict()
 
     def extract_data(self) -> map:
-        tr_lists = self.table_tag.find_all("tr")
+        tr_lists = self.backend.find_all(self.table_tag, "tr")
         return map(self.clean_data, tr_lists)
 
 
 @dataclass
 class GrammarDownloader(DataDownloader):
     """
-    The GrammarDownloader object downloads the data in the grammar part.
+    The GrammarDownloader object downloads the data in the grammar part. The grammar parts are fetched by a thread
+    pool of `max_workers` threads.
     """
 
+    cleaner: ClassVar[type] = GrammarCleaner
+    part_type: ClassVar[str] = "grammar"
+
     url_dialector: URLDialector
+    session: Optional[HTTPSession] = None
+    record_cache: Optional[RecordCache] = None
+    parser: str = "lxml"
+    strict: bool = False
+    max_workers: int = 10
+    metrics: Optional[Metrics] = None
 
     @property
     def request_info_list(self) -> Union[list[dict[str, str]], dict[str, str]]:
@@ -94,22 +92,45 @@ class GrammarDownloader(DataDownloader):
         Returns:
             a dict if a grammar part is specified, a list otherwise.
         """
-        info_list = self.url_dialector.generate()
-        if isinstance(info_list, list):
-            return info_list[:-2]
-        return info_list
+        return self.url_dialector.lookup(self.part_type)
 
-    def extract_grammar_data(self, url: str) -> map:
+    def extract_grammar_data(self, url: str) -> Iterable[dict[str, str]]:
         """The extract_grammar_data method extracts the grammar data based on the argument `url`.
 
         Args:
             url (str): the grammar url
 
         Returns:
-            a map object
+            an iterable of the cleaned records
+        """
+        return self.parse_page(self.fetch_page(url), url)
+
+    async def aextract_grammar_data(self, url: str, client) -> Iterable[dict[str, str]]:
+        """The aextract_grammar_data coroutine extracts the grammar data based on the argument `url` with the async client.
+
+        Args:
+            url (str): the grammar url
+            client (aiohttp.ClientSession): the shared async client
+
+        Returns:
+            an iterable of the cleaned records
+        """
+        return self.parse_page(await self.afetch_page(url, client), url)
+
+    def format_data(self, part: str, grammar_data: list) -> Union[dict[str, list], str]:
+        """The format_data method wraps the argument `grammar_data` with its part name.
+
+        Args:
+            part (str): the part name
+            grammar_data (list): the cleaned grammar data
+
+        Returns:
+            a dict if the `grammar_data` is not an empty list, a string otherwise
         """
-        bsObj = download_url(url)
-        return GrammarCleaner(bsObj).extract_data()
+        if grammar_data:
+            return {part: grammar_data}
+
+        return f"沒有「{part}」相關資料"
 
     def get_data(self, info: dict) -> Union[dict[str, str], str]:
         """The get_data method gets the data from the argument `info`.
@@ -123,17 +144,87 @@ class GrammarDownloader(DataDownloader):
         url = info["part_url"]
         part = info["part_name"]
         grammar_data = list(self.extract_grammar_data(url))
-        if grammar_data:
-            return {part: grammar_data}
+        return self.format_data(part, grammar_data)
 
-        return f"沒有「{part}」相關資料"
+    async def aget_data(self, info: dict, client) -> Union[dict[str, str], str]:
+        """The aget_data coroutine is the async version of `get_data`."""
+        url = info["part_url"]
+        part = info["part_name"]
+        grammar_data = list(await self.aextract_grammar_data(url, client))
+        return self.format_data(part, grammar_data)
+
+    def get_data_safely(self, info: dict) -> Union[dict[str, str], str]:
+        """The get_data_safely method isolates the failure of a grammar part, so that the other parts still succeed.
+
+        Args:
+            info (dict): the request info in `self.request_info_list`
+
+        Returns:
+            the same data as `get_data` if succeeded, an error message otherwise
+        """
+        try:
+            return self.get_data(info)
+        except Exception as error:
+            return self.failure_message(info, error)
+
+    async def aget_data_safely(self, info: dict, client) -> Union[dict[str, str], str]:
+        """The aget_data_safely coroutine is the async version of `get_data_safely`."""
+        try:
+            return await self.aget_data(info, client)
+        except Exception as error:
+            return self.failure_message(info, error)
 
     def download(self) -> Union[dict[str, str], list[dict[str, str]]]:
-        """The download method downloads the data by mapping `self.request_info_list` into the method `get_data`.
+        """The download method downloads the data by mapping `self.request_info_list` into the method `get_data`
+           with a thread pool. The output keeps the order of the grammar parts.
+
+        Returns:
+            a dict if the `self.request_info_list` is not a list, a list otherwise.
+        """
+        request_info_list = self.request_info_list
+        if isinstance(request_info_list, dict):
+            return self.get_data(request_info_list)
+        if self.max_workers <= 1:
+            return list(map(self.get_data_safely, request_info_list))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.get_data_safely, request_info_list))
+
+    async def adownload(self, client) -> Union[dict[str, str], list[dict[str, str]]]:
+        """The adownload coroutine downloads all the grammar parts concurrently over the argument `client`.
+
+        Args:
+            client (aiohttp.ClientSession): the shared async client
+
+        Returns:
+            a dict if the `self.request_info_list` is not a list, a list otherwise.
+        """
+        request_info_list = self.request_info_list
+        if isinstance(request_info_list, dict):
+            return await self.aget_data(request_info_list, client)
+        import asyncio
+
+        tasks = [self.aget_data_safely(info, client) for info in request_info_list]
+        return list(await asyncio.gather(*tasks))
+
+    def assemble(self, pages: dict[str, Union[list, Exception]]) -> Union[dict[str, str], list[dict[str, str]]]:
+        """The assemble method builds the same data as `download` from the pages fetched beforehand.
+
+        Args:
+            pages (dict): {url: the cleaned records of the page, or the exception raised while fetching it}
 
         Returns:
             a dict if the `self.request_info_list` is not a list, a list otherwise.
         """
-        if isinstance(self.request_info_list, dict):
-            return self.get_data(self.request_info_list)
-        return list(map(self.get_data, self.request_info_list))
+        request_info_list = self.request_info_list
+        if isinstance(request_info_list, dict):
+            return self.assemble_page(request_info_list, pages)
+        return [self.assemble_page(info, pages) for info in request_info_list]
+
+
+def __getattr__(name: str):
+    # GrammarInfo moved to ilrdc.core.models, so that pydantic is only imported in strict mode
+    if name == "GrammarInfo":
+        from .models import GrammarInfo
+
+        return GrammarInfo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,71 @@
+"""
+The pydantic models validating the rows of each part. They are only imported when `strict` is True.
+"""
+import pydantic
+from typing import Any
+from ilrdc.util import normalize_sound_url, normalize_content
+
+
+class GrammarInfo(pydantic.BaseModel):
+    """
+    The GrammarInfo object keeps track of an item in inventory, including Id, dialect, chinese translation and sound url.`
+    """
+
+    Id: str
+    dialect: str
+    chinese_translation: str
+    sound_url: str
+
+    @pydantic.validator("sound_url")
+    @classmethod
+    def is_soud_url(cls, value) -> str:
+        """The is_soud_url method makes sure there is sould_url value definied."""
+        return normalize_sound_url(value)
+
+    @pydantic.validator("Id", "dialect", "chinese_translation")
+    @classmethod
+    def check_content(cls, value):
+        """The check_content method makes sure there is Id, dialect or chinese translation value definied"""
+        return normalize_content(value)
+
+
+class VocabularyInfo(pydantic.BaseModel):
+    """
+    The VocabularyInfo object keeps track of an item in inventory, including vocab, chinese translation, sound url and
+    the alphabet section it belongs to.`
+    """
+
+    vocab: str
+    chinese_translation: str
+    sound_url: Any
+    alphabet: str = ""
+
+    @pydantic.validator("sound_url")
+    @classmethod
+    def is_soud_url(cls, value) -> str:
+        """The is_soud_url method makes sure there is sould_url value definied."""
+        return normalize_sound_url(value)
+
+    @pydantic.validator("vocab", "chinese_translation")
+    @classmethod
+    def check_content(cls, value):
+        """The check_content method makes sure there is vocab or chinese translation value definied"""
+        return normalize_content(value)
+
+
+class StoryInfo(pydantic.BaseModel):
+    dialect: Any
+    chinese_translation: Any
+    sound_url: Any
+
+    @pydantic.validator("sound_url")
+    @classmethod
+    def is_soud_url(cls, value: str) -> str:
+        """The is_soud_url method makes sure there is sould_url value definied."""
+        return normalize_sound_url(value)
+
+    @pydantic.validator("dialect", "chinese_translation")
+    @classmethod
+    def has_content(cls, value: str) -> str:
+        """The check_content method makes sure there is vocab or chinese translation value definied"""
+        return normalize_content(value, "").strip()
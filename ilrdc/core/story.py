@@ -1,47 +1,34 @@
 import re
-import pydantic
-from bs4 import BeautifulSoup
-from dataclasses import dataclass
-from typing import Generator, Union, Any
+import hashlib
+from functools import cached_property
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, ClassVar, Generator, Iterable, Optional, Union
 from ilrdc.urldialector import URLDialector
-from ilrdc.base import DataCleaner, DataDownloader
-from ilrdc.util import modify_sound_url, download_url
+from ilrdc.base import DataCleaner, DataDownloader, ParserBackend, BeautifulSoupBackend, get_backend
+from ilrdc.util import HTTPSession, Metrics, RecordCache, normalize_sound_url, normalize_content, has_sound_url
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
-class StoryInfo(pydantic.BaseModel):
-    dialect: Any
-    chinese_translation: Any
-    sound_url: Any
 
-    @pydantic.validator("sound_url")
-    @classmethod
-    def is_soud_url(cls, value: str) -> str:
-        """The is_soud_url method makes sure there is sould_url value definied."""
-        if value is None:
-            return "沒有音檔"
-        return modify_sound_url(value.group())
-
-    @pydantic.validator("dialect", "chinese_translation")
-    @classmethod
-    def has_content(cls, value: str) -> str:
-        """The check_content method makes sure there is vocab or chinese translation value definied"""
-        if value is None:
-            return ""
-        return value.text.strip()
+SOUND_PATTERN = re.compile('(?<=src\="\.).*(mp3|wav|ogg|wma)')
 
 
 @dataclass
 class StoryCleaner(DataCleaner):
     """
-    The StoryCleaner objects first extracts the data from the html, and then cleans it.
+    The StoryCleaner objects first extracts the data from the html, and then cleans it. The rows are validated by
+    StoryInfo only if `strict` is True.
     """
 
-    soup: BeautifulSoup
+    soup: "BeautifulSoup"
+    backend: ParserBackend = field(default_factory=BeautifulSoupBackend)
+    strict: bool = False
 
     def __post_init__(self) -> None:
-        self.table_tag = self.soup.find("div", id="part_19")
+        self.table_tag = self.backend.find(self.soup, "div", id="part_19")
 
-    def clean_data(self, specified_tag: BeautifulSoup) -> dict[str, str]:
+    def clean_data(self, specified_tag: "BeautifulSoup") -> dict[str, str]:
         """The extract_data method extracts the data from the html.
 
         Args:
@@ -54,21 +41,59 @@ class StoryCleaner(DataCleaner):
                 'sound_url': 'https://ilrdc.tw/grammar/sound/2/A3-2-1.mp3'}
             }
         """
-        dialect = specified_tag.find(class_="ab")
-        chinese_translation = specified_tag.find(class_="ch")
-        sound_url = re.search('(?<=src\="\.).*(mp3|wav|ogg|wma)', str(specified_tag))
-        data = StoryInfo(
+        backend = self.backend
+        dialect = backend.find(specified_tag, class_="ab")
+        chinese_translation = backend.find(specified_tag, class_="ch")
+        sound_url = backend.sound_src(specified_tag, SOUND_PATTERN)
+        if dialect is not None:
+            dialect = backend.text(dialect)
+        if chinese_translation is not None:
+            chinese_translation = backend.text(chinese_translation)
+        if not self.strict:
+            return {
+                "dialect": normalize_content(dialect, "").strip(),
+                "chinese_translation": normalize_content(chinese_translation, "").strip(),
+                "sound_url": normalize_sound_url(sound_url),
+            }
+        from .models import StoryInfo
+
+        return self.validate(
+            StoryInfo,
             dialect=dialect,
             chinese_translation=chinese_translation,
             sound_url=sound_url,
         )
-        return data.dict()
+
+    @cached_property
+    def rows(self) -> list:
+        """The rows property lists the <tr> tags of the table once, so that each story only slices it."""
+        return self.backend.find_all(self.table_tag, "tr")
 
     def extract_data(self) -> Generator[None, None, dict]:
-        tr_lists = self.table_tag.find_all("tr")
-        result = map(self.clean_data, tr_lists)
+        result = map(self.clean_data, self.rows)
         return result
 
+    def extract_rows(self, start: int, stop: int) -> Generator[None, None, dict]:
+        """The extract_rows method cleans only the rows from `start` up to `stop`, e.g. the sentences of a story."""
+        return map(self.clean_data, self.rows[start:stop])
+
+
+@dataclass(frozen=True)
+class StoryEntry:
+    """
+    The StoryEntry object locates a story on the story page: its sentences are the rows from `start` up to `stop`,
+    and `audio` of them have a sound file.
+    """
+
+    title: str
+    start: int
+    stop: int
+    audio: int = 0
+
+    @property
+    def sentences(self) -> int:
+        return self.stop - self.start
+
 
 @dataclass
 class StoryDownloader(DataDownloader):
@@ -76,7 +101,18 @@ class StoryDownloader(DataDownloader):
     The StoryDownloader object downloads the data in the story part.
     """
 
+    cleaner: ClassVar[type] = StoryCleaner
+    part_type: ClassVar[str] = "story"
+
     url_dialector: URLDialector
+    session: Optional[HTTPSession] = None
+    record_cache: Optional[RecordCache] = None
+    parser: str = "lxml"
+    strict: bool = False
+    metrics: Optional[Metrics] = None
+    story_index: Optional[list[StoryEntry]] = field(default=None, init=False, repr=False)
+    story_titles: dict[str, StoryEntry] = field(default_factory=dict, init=False, repr=False)
+    story_digest: Optional[str] = field(default=None, init=False, repr=False)
 
     @property
     def request_info_list(self) -> Union[list[dict[str, str]], dict[str, str]]:
@@ -85,28 +121,85 @@ class StoryDownloader(DataDownloader):
         Returns:
             a dict if a story part is specified, a list otherwise.
         """
-        info_list = self.url_dialector.generate()
-        if isinstance(info_list, list):
-            return info_list[-1]
-        return info_list
+        return self.url_dialector.lookup(self.part_type)
 
-    def find_title_index(self, story_list: list) -> list[int]:
-        """The find_title_index method finds the title, stored as a dictionary, from the argument `story_list`.
+    def walk_stories(
+        self, records: Iterable[dict[str, str]]
+    ) -> Generator[tuple[bool, int, Union[str, dict[str, str]]], None, None]:
+        """The walk_stories method finds the stories in a single pass over the records. A record with an empty
+           `dialect` follows the title of a story, whose chinese translation is the story title, and the sentences
+           run up to the title of the next story. Both `segment_stories` and `index_stories` follow it.
 
         Args:
-            story_list (list): the story_list that comes from adding `self.story_request_info` to the method `self.download_content()'
+            records (Iterable): the cleaned records of the story page
+
+        Yields:
+            a tuple: (True, the row number of the first sentence, the story title) when a story starts, and
+                     (False, the row number, the record) for each of its sentences
+        """
+        previous, is_sentence, is_open = None, False, False
+        num = -1
+        for num, record in enumerate(records):
+            if record.get("dialect") == "":
+                if previous is not None:
+                    is_open = True
+                    yield True, num + 1, previous.get("chinese_translation")
+                previous, is_sentence = record, False
+                continue
+            if is_sentence and is_open:
+                yield False, num - 1, previous
+            previous, is_sentence = record, True
+        if is_sentence and is_open:
+            yield False, num, previous
+
+    def segment_stories(
+        self, records: Iterable[dict[str, str]]
+    ) -> Generator[tuple[str, dict[str, str]], None, None]:
+        """The segment_stories method finds the story of each record in a single pass, see `walk_stories`.
+
+        Args:
+            records (Iterable): the cleaned records of the story page
+
+        Yields:
+            a tuple: (the story title, the record of a sentence)
+        """
+        title = None
+        for is_title, _, value in self.walk_stories(records):
+            if is_title:
+                title = value
+            else:
+                yield title, value
+
+    def index_stories(self, records: Iterable[dict[str, str]]) -> list[StoryEntry]:
+        """The index_stories method locates the stories in a single pass over the records, without keeping them.
+
+        Args:
+            records (Iterable): the cleaned records of the story page
 
         Returns:
-            a list containing the title index in the argument `story_list`.
+            a list of StoryEntry objects
         """
-        title_index = [
-            num - 1
-            for num, story_dict in enumerate(story_list)
-            if story_dict.get("dialect") == ""
-        ]
-        final_index = len(story_list)
-        title_index.append(final_index)
-        return title_index
+        entries = []
+        for is_title, num, value in self.walk_stories(records):
+            if is_title:
+                entries.append(StoryEntry(value, num, num))
+            else:
+                entry = entries[-1]
+                audio = entry.audio + has_sound_url(value.get("sound_url"))
+                entries[-1] = StoryEntry(entry.title, entry.start, num + 1, audio)
+        return entries
+
+    def tag_records(
+        self, info: dict, records: Iterable[dict[str, str]]
+    ) -> Generator[dict[str, str], None, None]:
+        """The tag_records method tags the sentences with the dialect, part type, part and story title."""
+        tags = {
+            "dialect_ch": self.url_dialector.dialect_ch,
+            "part_type": self.part_type,
+            "part": info["part_name"],
+        }
+        for title, record in self.segment_stories(records):
+            yield {**tags, "story_title": title, **record}
 
     def get_each_story(self, data: list) -> list[dict[str, str]]:
         """The get_each_story method finds each story from the argument `data`.
@@ -117,32 +210,124 @@ class StoryDownloader(DataDownloader):
         Returns:
             a list
         """
-        title_index = self.find_title_index(data)
-        index_num = 0
-        stories_list = []
-        while True:
-            story = {
-                data[title_index[index_num]].get("chinese_translation"): data[
-                    title_index[index_num] + 2 : title_index[index_num + 1]
-                ]
-            }
-            stories_list.append(story)
-            index_num += 1
-            if index_num == len(title_index) - 1:
-                break
-        return stories_list
+        return [{entry.title: data[entry.start : entry.stop]} for entry in self.index_stories(data)]
+
+    def build_story_index(self, html: str, url: str) -> list[StoryEntry]:
+        """The build_story_index method indexes the stories of the story page through `parse_page`, so that the
+           record cache and the metrics are used, and remembers the hash of the page it indexed.
+
+        Args:
+            html (str): the html of the story page
+            url (str): the story url
+
+        Returns:
+            a list of StoryEntry objects
+        """
+        self.story_index = self.index_stories(self.parse_page(html, url))
+        self.story_titles = {}
+        for entry in self.story_index:
+            self.story_titles.setdefault(entry.title, entry)
+        self.story_digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        return self.story_index
+
+    def open_story_page(self) -> StoryCleaner:
+        """The open_story_page method fetches and parses the story page for a single call, through the session and
+           its ResponseCache; the parsed page is not kept by the downloader. The index is rebuilt if the page has
+           changed since it was indexed, so that its rows still point at the right sentences.
+
+        Returns:
+            a StoryCleaner object
+        """
+        url = self.request_info_list["part_url"]
+        html = self.fetch_page(url)
+        if self.story_index is None or hashlib.sha256(html.encode("utf-8")).hexdigest() != self.story_digest:
+            self.build_story_index(html, url)
+        backend = get_backend(self.parser)
+        return self.cleaner(backend.parse(html), backend, self.strict)
+
+    def get_story_index(self) -> list[StoryEntry]:
+        """The get_story_index method indexes the stories of the dialect once. Only the index is kept, neither the
+           page nor the cleaned records.
+
+        Returns:
+            a list of StoryEntry objects
+        """
+        if self.story_index is None:
+            url = self.request_info_list["part_url"]
+            self.build_story_index(self.fetch_page(url), url)
+        return self.story_index
+
+    def find_story(self, title: str) -> StoryEntry:
+        """The find_story method looks up the index entry of the story `title`, and raises ValueError if there is none."""
+        entry = self.story_titles.get(title)
+        if entry is None:
+            raise ValueError(f"unknown story {title!r}, choose from {list(self.story_titles)}")
+        return entry
+
+    def get_story(self, title: str) -> list[dict[str, str]]:
+        """The get_story method gets the sentences of the story `title`. The page is fetched again (from the
+           ResponseCache of the session, if it has one), and only the rows of that story are cleaned.
 
-    def extract_story_data(self, url: str) -> map:
+        Args:
+            title (str): the story title, i.e. the chinese translation of its title
+
+        Returns:
+            a list
+        """
+        if self.story_index is not None:
+            self.find_story(title)
+        page = self.open_story_page()
+        entry = self.find_story(title)
+        return list(page.extract_rows(entry.start, entry.stop))
+
+    def iter_stories(self) -> Generator[tuple[StoryEntry, list[dict[str, str]]], None, None]:
+        """The iter_stories method yields the stories one at a time, so that only one story is cleaned and held in
+           memory at a time. The page is fetched and parsed once for the whole iteration, and dropped after it.
+
+        Yields:
+            a tuple: (the StoryEntry object, the sentences of the story)
+        """
+        page = self.open_story_page()
+        for entry in self.story_index:
+            yield entry, list(page.extract_rows(entry.start, entry.stop))
+
+    def extract_story_data(self, url: str) -> Iterable[dict[str, str]]:
         """The extract_story_data method extracts the story data based on the argument `url`.
 
         Args:
             url (str): the story url
 
         Returns:
-            a map object
+            an iterable of the cleaned records
         """
-        bsObj = download_url(url)
-        return StoryCleaner(bsObj).extract_data()
+        return self.parse_page(self.fetch_page(url), url)
+
+    async def aextract_story_data(self, url: str, client) -> Iterable[dict[str, str]]:
+        """The aextract_story_data coroutine extracts the story data based on the argument `url` with the async client.
+
+        Args:
+            url (str): the story url
+            client (aiohttp.ClientSession): the shared async client
+
+        Returns:
+            an iterable of the cleaned records
+        """
+        return self.parse_page(await self.afetch_page(url, client), url)
+
+    def format_data(self, part: str, story_data: list) -> Union[list, str]:
+        """The format_data method checks whether the argument `story_data` has content.
+
+        Args:
+            part (str): the part name
+            story_data (list): the cleaned story data
+
+        Returns:
+            a list if the `story_data` is not an empty list, a string otherwise
+        """
+        if story_data:
+            return story_data
+
+        return f"沒有「{part}」相關資料"
 
     def get_data(self, info: dict) -> Union[dict[str, str], str]:
         """The get_data method gets the data from the argument `info`.
@@ -156,10 +341,14 @@ class StoryDownloader(DataDownloader):
         url = info["part_url"]
         part = info["part_name"]
         story_data = list(self.extract_story_data(url))
-        if story_data:
-            return story_data
+        return self.format_data(part, story_data)
 
-        return f"沒有「{part}」相關資料"
+    async def aget_data(self, info: dict, client) -> Union[dict[str, str], str]:
+        """The aget_data coroutine is the async version of `get_data`."""
+        url = info["part_url"]
+        part = info["part_name"]
+        story_data = list(await self.aextract_story_data(url, client))
+        return self.format_data(part, story_data)
 
     def download(self) -> dict[str, list]:
         """The download method downloads the data by mapping `self.request_info_list` into the method `get_data`.
@@ -168,5 +357,29 @@ class StoryDownloader(DataDownloader):
             a dict
         """
         result = self.get_data(self.request_info_list)
-        stories = self.get_each_story(result)
-        return stories
+        if isinstance(result, list):
+            return self.get_each_story(result)
+        return result
+
+    async def adownload(self, client) -> dict[str, list]:
+        """The adownload coroutine is the async version of `download`."""
+        result = await self.aget_data(self.request_info_list, client)
+        if isinstance(result, list):
+            return self.get_each_story(result)
+        return result
+
+    def assemble(self, pages: dict[str, Union[list, Exception]]) -> dict[str, list]:
+        """The assemble method is the version of `download` that uses the pages fetched beforehand."""
+        result = self.assemble_page(self.request_info_list, pages)
+        if isinstance(result, list):
+            return self.get_each_story(result)
+        return result
+
+
+def __getattr__(name: str):
+    # StoryInfo moved to ilrdc.core.models, so that pydantic is only imported in strict mode
+    if name == "StoryInfo":
+        from .models import StoryInfo
+
+        return StoryInfo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
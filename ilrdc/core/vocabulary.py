@@ -1,98 +1,93 @@
 import re
-import pydantic
-from typing import Union, Any
-from bs4 import BeautifulSoup
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, ClassVar, Generator, Iterable, Optional, Union
+from dataclasses import dataclass, field
 from ilrdc.urldialector import URLDialector
-from ilrdc.base import DataCleaner, DataDownloader
-from ilrdc.util import modify_sound_url, download_url
+from ilrdc.base import DataCleaner, DataDownloader, ParserBackend, BeautifulSoupBackend
+from ilrdc.util import HTTPSession, Metrics, RecordCache, normalize_sound_url, normalize_content
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
-class VocabularyInfo(pydantic.BaseModel):
-    """
-    The VocabularyInfo object keeps track of an item in inventory, including vocab, chinese translation and sound url.`
-    """
-
-    vocab: str
-    chinese_translation: str
-    sound_url: Any
 
-    @pydantic.validator("sound_url")
-    @classmethod
-    def is_soud_url(cls, value) -> str:
-        """The is_soud_url method makes sure there is sould_url value definied."""
-        if value is None:
-            return "沒有音檔"
-        return modify_sound_url(value.group())
-
-    @pydantic.validator("vocab", "chinese_translation")
-    @classmethod
-    def check_content(cls, value):
-        """The check_content method makes sure there is vocab or chinese translation value definied"""
-        if value is None:
-            return "not found"
-        return value
+SOUND_PATTERN = re.compile('(?<=src\="\.).*(mp3|wav|ogg|wma)')
 
 
 @dataclass
 class VocabularyCleaner(DataCleaner):
     """
-    The VocabularyCleaner objects first extracts the data from the html, and then cleans it.
+    The VocabularyCleaner objects first extracts the data from the html, and then cleans it. The rows are validated
+    by VocabularyInfo only if `strict` is True.
     """
 
-    soup: BeautifulSoup
+    parser_version: ClassVar[str] = "2"
+
+    soup: "BeautifulSoup"
+    backend: ParserBackend = field(default_factory=BeautifulSoupBackend)
+    strict: bool = False
 
     def __post_init__(self) -> None:
-        self.table_tag = self.soup.find("table")
+        self.table_tag = self.backend.find(self.soup, "table")
 
-    def remove_alphabet_soup(
-        self, tr_lists_with_alphabets: list[BeautifulSoup]
-    ) -> list[BeautifulSoup]:
-        """The remove_alphabet_soup method renives the soup object that contains English alphabet.
+    def iter_entries(
+        self, tr_lists: Iterable["BeautifulSoup"]
+    ) -> Generator[tuple[str, "BeautifulSoup"], None, None]:
+        """The iter_entries method walks the rows once. A row with an alphabet header (e.g. `A`) starts a new alphabet
+           section; the other rows are entries of the current section.
 
         Args:
-            tr_lists_with_alphabets (list): the list of soup object
+            tr_lists (Iterable): the rows of the table
 
-        Returns:
-            a list
+        Yields:
+            a tuple: (the alphabet section, the row of the entry)
         """
-        alphabet_soup = list(
-            filter(
-                None,
-                [value.find("td", "alphabet") for value in tr_lists_with_alphabets],
-            )
-        )
-        alphabet = list(map(lambda value: value.text, alphabet_soup))
-        for bsObj in tr_lists_with_alphabets:
-            if bsObj.text.strip() in alphabet:
-                tr_lists_with_alphabets.remove(bsObj)
-        return tr_lists_with_alphabets
-
-    def clean_data(self, specified_tag: BeautifulSoup) -> dict[str, str]:
+        alphabet = ""
+        for tr in tr_lists:
+            header = self.backend.find(tr, "td", class_="alphabet")
+            if header is not None:
+                alphabet = self.backend.text(header).strip()
+                continue
+            yield alphabet, tr
+
+    def clean_data(self, specified_tag: "BeautifulSoup", alphabet: str = "") -> dict[str, str]:
         """The extract_data method extracts the data from the html.
 
         Args:
             specified_tag (BeautifulSoup): the specified html tag
+            alphabet (str): the alphabet section of the tag
 
         Returns:
             a dict: {
-                'dialect': 'aw',
+                'vocab': 'aw',
                 'chinese_translation': '好的；是的',
-                'sound_url': 'https://ilrdc.tw/grammar/sound/2/A2-1-4.mp3'}
+                'sound_url': 'https://ilrdc.tw/grammar/sound/2/A2-1-4.mp3',
+                'alphabet': 'A'}
             }
         """
-        vocab = specified_tag.find(class_="ab").text.strip()
-        chinese_translation = specified_tag.find(class_="ch").text.strip()
-        sound_url = re.search('(?<=src\="\.).*(mp3|wav|ogg|wma)', str(specified_tag))
-        data = VocabularyInfo(
-            vocab=vocab, chinese_translation=chinese_translation, sound_url=sound_url
+        backend = self.backend
+        vocab = backend.text(backend.find(specified_tag, class_="ab")).strip()
+        chinese_translation = backend.text(backend.find(specified_tag, class_="ch")).strip()
+        sound_url = backend.sound_src(specified_tag, SOUND_PATTERN)
+        if not self.strict:
+            return {
+                "vocab": normalize_content(vocab),
+                "chinese_translation": normalize_content(chinese_translation),
+                "sound_url": normalize_sound_url(sound_url),
+                "alphabet": alphabet,
+            }
+        from .models import VocabularyInfo
+
+        return self.validate(
+            VocabularyInfo,
+            vocab=vocab,
+            chinese_translation=chinese_translation,
+            sound_url=sound_url,
+            alphabet=alphabet,
         )
-        return data.dict()
 
-    def extract_data(self) -> map:
-        tr_lists_with_alphabets = self.table_tag.find_all("tr")
-        tr_lists = self.remove_alphabet_soup(tr_lists_with_alphabets)
-        return map(self.clean_data, tr_lists)
+    def extract_data(self) -> Generator[dict[str, str], None, None]:
+        tr_lists = self.backend.find_all(self.table_tag, "tr")
+        for alphabet, tr in self.iter_entries(tr_lists):
+            yield self.clean_data(tr, alphabet)
 
 
 @dataclass
@@ -101,7 +96,15 @@ class VocabularyDownloader(DataDownloader):
     The VocabularyDownloader object downloads the data in the vocabulary part.
     """
 
+    cleaner: ClassVar[type] = VocabularyCleaner
+    part_type: ClassVar[str] = "vocab"
+
     url_dialector: URLDialector
+    session: Optional[HTTPSession] = None
+    record_cache: Optional[RecordCache] = None
+    parser: str = "lxml"
+    strict: bool = False
+    metrics: Optional[Metrics] = None
 
     @property
     def request_info_list(self) -> Union[list[dict[str, str]], dict[str, str]]:
@@ -110,22 +113,45 @@ class VocabularyDownloader(DataDownloader):
         Returns:
             a dict if a vocabulary part is specified, a list otherwise.
         """
-        info_list = self.url_dialector.generate()
-        if isinstance(info_list, list):
-            return info_list[-2]
-        return info_list
+        return self.url_dialector.lookup(self.part_type)
 
-    def extract_vocabulary_data(self, url: str) -> map:
+    def extract_vocabulary_data(self, url: str) -> Iterable[dict[str, str]]:
         """The extract_vocabulary_data method extracts the vocabulary data based on the argument `url`.
 
         Args:
             url (str): the vocabulary url
 
         Returns:
-            a map object
+            an iterable of the cleaned records
+        """
+        return self.parse_page(self.fetch_page(url), url)
+
+    async def aextract_vocabulary_data(self, url: str, client) -> Iterable[dict[str, str]]:
+        """The aextract_vocabulary_data coroutine extracts the vocabulary data based on the argument `url` with the async client.
+
+        Args:
+            url (str): the vocabulary url
+            client (aiohttp.ClientSession): the shared async client
+
+        Returns:
+            an iterable of the cleaned records
+        """
+        return self.parse_page(await self.afetch_page(url, client), url)
+
+    def format_data(self, part: str, vocabulary_data: list) -> Union[dict[str, list], str]:
+        """The format_data method wraps the argument `vocabulary_data` with its part name.
+
+        Args:
+            part (str): the part name
+            vocabulary_data (list): the cleaned vocabulary data
+
+        Returns:
+            a dict if the `vocabulary_data` is not an empty list, a string otherwise
         """
-        bsObj = download_url(url)
-        return VocabularyCleaner(bsObj).extract_data()
+        if vocabulary_data:
+            return {part: vocabulary_data}
+
+        return f"沒有「{part}」相關資料"
 
     def get_data(self, info: dict) -> Union[dict[str, str], str]:
         """The get_data method gets the data from the argument `info`.
@@ -139,10 +165,14 @@ class VocabularyDownloader(DataDownloader):
         url = info["part_url"]
         part = info["part_name"]
         vocabulary_data = list(self.extract_vocabulary_data(url))
-        if vocabulary_data:
-            return {part: vocabulary_data}
+        return self.format_data(part, vocabulary_data)
 
-        return f"沒有「{part}」相關資料"
+    async def aget_data(self, info: dict, client) -> Union[dict[str, str], str]:
+        """The aget_data coroutine is the async version of `get_data`."""
+        url = info["part_url"]
+        part = info["part_name"]
+        vocabulary_data = list(await self.aextract_vocabulary_data(url, client))
+        return self.format_data(part, vocabulary_data)
 
     def download(self) -> dict[str, str]:
         """The download method downloads the data by mapping `self.request_info_list` into the method `get_data`.
@@ -151,3 +181,20 @@ class VocabularyDownloader(DataDownloader):
             a dict
         """
         return self.get_data(self.request_info_list)
+
+    async def adownload(self, client) -> dict[str, str]:
+        """The adownload coroutine is the async version of `download`."""
+        return await self.aget_data(self.request_info_list, client)
+
+    def assemble(self, pages: dict[str, Union[list, Exception]]) -> dict[str, str]:
+        """The assemble method is the version of `download` that uses the pages fetched beforehand."""
+        return self.assemble_page(self.request_info_list, pages)
+
+
+def __getattr__(name: str):
+    # VocabularyInfo moved to ilrdc.core.models, so that pydantic is only imported in strict mode
+    if name == "VocabularyInfo":
+        from .models import VocabularyInfo
+
+        return VocabularyInfo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
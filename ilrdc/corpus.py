@@ -0,0 +1,341 @@
+import sys
+import itertools
+from array import array
+from collections.abc import Mapping
+from typing import Generator, Iterable, Iterator, Optional, Union
+from dataclasses import dataclass, field
+
+# the columns whose values repeat across the rows, which are interned as a whole
+CATEGORIES = ("dialect_ch", "part_type", "part", "story_title", "alphabet")
+# the placeholders of the cleaners, e.g. `normalize_sound_url` and `normalize_content`
+PLACEHOLDERS = ("沒有音檔", "not found")
+MISSING, EMPTY = 0, 1
+
+# --------------------------------------------------------------------
+# helper functions
+
+
+def split_value(column: str, value: str) -> tuple[str, str]:
+    """The split_value function splits a value into the part which is interned and the part which is stored as text,
+       e.g. "https://ilrdc.tw/grammar/sound/2/" and "4-1-1.mp3".
+
+    Args:
+        column (str): the column name
+        value (str): the value
+
+    Returns:
+        a tuple: (the interned prefix, the rest of the value)
+    """
+    if column in CATEGORIES or value in PLACEHOLDERS:
+        return value, ""
+    if value.startswith(("http://", "https://")):
+        cut = value.rfind("/") + 1
+        return value[:cut], value[cut:]
+    return "", value
+
+
+def as_choices(value: Union[str, Iterable[str]]) -> set[str]:
+    return {value} if isinstance(value, str) else set(value)
+
+
+@dataclass
+class Column:
+    """
+    The Column object stores a column: row `n` is the interned prefix `prefixes[n]` followed by
+    `text[offsets[n]:offsets[n + 1]]`. A prefix of 0 means the record has no such key.
+    """
+
+    prefixes: array = field(default_factory=lambda: array("I"))
+    offsets: array = field(default_factory=lambda: array("I", [0]))
+    text: str = ""
+
+    def fill(self, rows: int) -> None:
+        """The fill method marks the column as missing up to `rows` rows, e.g. for a column first seen late."""
+        missing = rows - len(self.prefixes)
+        self.prefixes.extend(itertools.repeat(MISSING, missing))
+        self.offsets.extend(itertools.repeat(self.offsets[-1], missing))
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.prefixes.itemsize * len(self.prefixes)
+            + self.offsets.itemsize * len(self.offsets)
+            + sys.getsizeof(self.text)
+        )
+
+
+class Row(Mapping):
+    """
+    The Row object is a read-only view of a row of a Corpus. The values are decoded when they are read, so the
+    view itself copies nothing. Its keys come in the order of the original record.
+    """
+
+    __slots__ = ("corpus", "index")
+
+    def __init__(self, corpus: "Corpus", index: int) -> None:
+        self.corpus = corpus
+        self.index = index
+
+    def __getitem__(self, key: str) -> str:
+        value = self.corpus.value(key, self.index)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys_of_row())
+
+    def __len__(self) -> int:
+        return len(self.keys_of_row())
+
+    def keys_of_row(self) -> tuple[str, ...]:
+        corpus = self.corpus
+        return corpus.key_orders[corpus.row_keys[self.index]]
+
+    def __repr__(self) -> str:
+        return f"Row({dict(self)!r})"
+
+    def to_dict(self) -> dict[str, str]:
+        return dict(self)
+
+
+@dataclass
+class Selection:
+    """
+    The Selection object holds the row numbers of the rows of a Corpus that match `Corpus.filter`. Its rows are
+    views of the corpus, not copies.
+    """
+
+    corpus: "Corpus"
+    rows: array
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: int) -> Row:
+        return Row(self.corpus, self.rows[index])
+
+    def __iter__(self) -> Iterator[Row]:
+        corpus = self.corpus
+        return (Row(corpus, index) for index in self.rows)
+
+    def __repr__(self) -> str:
+        return f"Selection({len(self.rows)} rows)"
+
+    def filter(self, dialect=None, part=None, **columns) -> "Selection":
+        """The filter method narrows the selection down, see `Corpus.filter`."""
+        return Selection(self.corpus, self.corpus.match(self.rows, dialect, part, columns))
+
+    def to_dicts(self) -> list[dict[str, str]]:
+        """The to_dicts method converts the rows to the flat records."""
+        return [row.to_dict() for row in self]
+
+
+# --------------------------------------------------------------------
+# public interface
+
+
+@dataclass
+class Corpus:
+    """
+    The Corpus object keeps the flat records of `iter_records` in memory column by column. The values which repeat
+    (the dialect, part type, part, story title, alphabet, the placeholders and the url prefixes, e.g.
+    "https://ilrdc.tw/grammar/sound/2/") are interned, and the rest of each column is one string with the row
+    offsets in an array. A record takes a few bytes per column instead of a dict of strings. The key order of each
+    record is interned as well, so that a row gives back its keys in the same order.
+    """
+
+    values: list = field(default_factory=lambda: [None, ""])
+    columns: dict[str, Column] = field(default_factory=dict)
+    key_orders: list[tuple[str, ...]] = field(default_factory=list)
+    row_keys: array = field(default_factory=lambda: array("I"))
+
+    def __post_init__(self) -> None:
+        self.ids = {value: num for num, value in enumerate(self.values) if value is not None}
+        self.key_order_ids = {keys: num for num, keys in enumerate(self.key_orders)}
+        self.size = len(next(iter(self.columns.values())).prefixes) if self.columns else 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> Row:
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("corpus index out of range")
+        return Row(self, index)
+
+    def __iter__(self) -> Iterator[Row]:
+        return (Row(self, index) for index in range(self.size))
+
+    def __repr__(self) -> str:
+        return f"Corpus({self.size} rows, columns={list(self.columns)})"
+
+    @classmethod
+    def from_records(cls, source: Union[Iterable[dict[str, str]], object]) -> "Corpus":
+        """The from_records class method builds a corpus, see `extend`."""
+        return cls().extend(source)
+
+    @classmethod
+    def download(cls, dialects: list[str], part_types: list[str], **kwargs) -> "Corpus":
+        """The download class method builds a corpus of every combination of `dialects` and `part_types`.
+
+        Args:
+            dialects (list): the dialect chinese names
+            part_types (list): the part types (i.e. grammar, vocab and story)
+            kwargs: the other arguments of ILRDC, e.g. `session` or `cache_dir`
+
+        Returns:
+            a Corpus object
+        """
+        from .ilrdc import ILRDC
+
+        corpus = cls()
+        for dialect_ch, part_type in itertools.product(dialects, part_types):
+            corpus.extend(ILRDC(dialect_ch, part_type, **kwargs))
+        return corpus
+
+    def intern(self, value: str) -> int:
+        num = self.ids.get(value)
+        if num is None:
+            num = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return num
+
+    def intern_keys(self, keys: tuple[str, ...]) -> int:
+        num = self.key_order_ids.get(keys)
+        if num is None:
+            num = self.key_order_ids[keys] = len(self.key_orders)
+            self.key_orders.append(keys)
+        return num
+
+    def extend(self, source: Union[Iterable[dict[str, str]], object]) -> "Corpus":
+        """The extend method appends the records. A value of None is kept as a missing key.
+
+        Args:
+            source: a downloader (e.g. GrammarDownloader) or an ILRDC object, or the flat records of `iter_records`
+
+        Returns:
+            the Corpus object itself
+        """
+        records = source.iter_records() if hasattr(source, "iter_records") else source
+        pieces = {name: [] for name in self.columns}
+        lengths = {name: column.offsets[-1] for name, column in self.columns.items()}
+        size = self.size
+        for record in records:
+            keys = []
+            for name, value in record.items():
+                if value is None:
+                    continue
+                keys.append(name)
+                column = self.columns.get(name)
+                if column is None:
+                    column = self.columns[name] = Column()
+                    column.fill(size)
+                    pieces[name], lengths[name] = [], 0
+                prefix, text = split_value(name, value)
+                column.prefixes.append(self.intern(prefix) if prefix else EMPTY)
+                if text:
+                    pieces[name].append(text)
+                    lengths[name] += len(text)
+                column.offsets.append(lengths[name])
+            self.row_keys.append(self.intern_keys(tuple(keys)))
+            size += 1
+            for column in self.columns.values():
+                if len(column.prefixes) < size:
+                    column.fill(size)
+        for name, column in self.columns.items():
+            column.text += "".join(pieces[name])
+        self.size = size
+        return self
+
+    def value(self, column: str, index: int) -> Optional[str]:
+        """The value method decodes a value.
+
+        Args:
+            column (str): the column name, e.g. "sound_url"
+            index (int): the row number
+
+        Returns:
+            a str, or None if the record has no such key
+        """
+        data = self.columns.get(column)
+        if data is None:
+            return None
+        prefix = data.prefixes[index]
+        if prefix == MISSING:
+            return None
+        start, stop = data.offsets[index], data.offsets[index + 1]
+        if start == stop:
+            return self.values[prefix]
+        return self.values[prefix] + data.text[start:stop]
+
+    def match(
+        self, rows: Iterable[int], dialect=None, part=None, columns: Optional[dict] = None
+    ) -> array:
+        """The match method finds the rows matching the conditions by comparing the interned ids only."""
+        conditions = [(("dialect_ch",), dialect), (("part", "part_type"), part)]
+        for name, value in (columns or {}).items():
+            if name not in CATEGORIES:
+                raise ValueError(f"cannot filter by {name!r}, choose from {list(CATEGORIES)}")
+            conditions.append(((name,), value))
+        checks = []
+        for names, value in conditions:
+            if value is None:
+                continue
+            ids = {self.ids[choice] for choice in as_choices(value) if choice in self.ids}
+            prefixes = [self.columns[name].prefixes for name in names if name in self.columns]
+            checks.append((prefixes, ids))
+        return array(
+            "I",
+            (
+                index
+                for index in rows
+                if all(any(column[index] in ids for column in prefixes) for prefixes, ids in checks)
+            ),
+        )
+
+    def filter(
+        self,
+        dialect: Union[str, Iterable[str], None] = None,
+        part: Union[str, Iterable[str], None] = None,
+        **columns,
+    ) -> Selection:
+        """The filter method selects the rows without copying them.
+
+        Args:
+            dialect (str or list): the dialect chinese names (optional)
+            part (str or list): the part names or the part types (optional)
+            columns: the values of the other interned columns, e.g. story_title="紋面" or alphabet="A"
+
+        Returns:
+            a Selection object
+        """
+        return Selection(self, self.match(range(self.size), dialect, part, columns))
+
+    def distinct(self, column: str) -> list[str]:
+        """The distinct method lists the values of an interned column, e.g. the dialects, in order of appearance."""
+        if column not in CATEGORIES:
+            raise ValueError(f"{column!r} is not interned, choose from {list(CATEGORIES)}")
+        data = self.columns.get(column)
+        if data is None:
+            return []
+        return [self.values[num] for num in dict.fromkeys(data.prefixes) if num != MISSING]
+
+    def to_dicts(self) -> list[dict[str, str]]:
+        """The to_dicts method converts the rows to the flat records."""
+        return [row.to_dict() for row in self]
+
+    def iter_dicts(self) -> Generator[dict[str, str], None, None]:
+        """The iter_dicts method is the lazy version of `to_dicts`."""
+        for row in self:
+            yield row.to_dict()
+
+    @property
+    def nbytes(self) -> int:
+        """The nbytes property estimates the memory taken by the columns and the interned values."""
+        return (
+            sum(column.nbytes for column in self.columns.values())
+            + sum(sys.getsizeof(value) for value in self.values)
+            + self.row_keys.itemsize * len(self.row_keys)
+        )
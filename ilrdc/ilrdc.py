@@ -1,63 +1,135 @@
-import json
-import pandas as pd 
-from functools import wraps
-from typing import Optional, Union
+import os
+from contextlib import ExitStack
+import itertools
+from functools import partial, wraps
+from typing import AsyncGenerator, Generator, Optional, Union
 from dataclasses import dataclass
-from .urldialector import URLDialector
-from .core import GrammarDownloader, VocabularyDownloader, StoryDownloader
+from .util import HTTPSession, Metrics, RecordCache, ResponseCache, create_client
+from .util import CSVWriter, JSONArrayWriter, JSONLinesWriter
+from .util import records_to_table, write_parquet, AudioDownloader
+from .urldialector import URLDialector, get_catalog
+from .core import DOWNLOADERS, GrammarDownloader, VocabularyDownloader, StoryDownloader
 
 
 # --------------------------------------------------------------------
 # helper functions
 
 
-def jsonify(dialect_ch: str, data: dict) -> None:
+def jsonify(
+    dialect_ch: str, data: dict, out_dir: str = ".", metrics: Optional[Metrics] = None
+) -> list[str]:
     """The jsonify function converts the argument `data` to a JSON file.
     Args:
         data (dict):
         dialect_ch (str): the dialect chinese name
+        out_dir (str): the output directory
+        metrics (Metrics): the collector of the write times (optional)
     
     Returns:
-        a json file
+        a list of the written json files
     """
+    paths = []
     for key, value in data.items():
-        with open(f"{dialect_ch} - {key}.json", "w", encoding="utf-8",) as file:
-            json.dump(value, file, ensure_ascii=False)
+        path = os.path.join(out_dir, f"{dialect_ch} - {key}.json")
+        with JSONArrayWriter(path, metrics=metrics) as writer:
+            writer.write_all(value)
+        paths.append(path)
+    return paths
 
-def tablizer(dialect_ch: str, data: dict) -> None:
-    """The tablizer method converts the argument `data` to a CSV file. If a dictionary has a key `Id`,
-       the CSV file will contain columns with `Id`; if not, exclude `Id`.
+def jsonlify(
+    dialect_ch: str, data: dict, out_dir: str = ".", metrics: Optional[Metrics] = None
+) -> list[str]:
+    """The jsonlify function converts the argument `data` to a JSON Lines file, a record per line.
+    Args:
+        data (dict):
+        dialect_ch (str): the dialect chinese name
+        out_dir (str): the output directory
+        metrics (Metrics): the collector of the write times (optional)
+
+    Returns:
+        a list of the written jsonl files
+    """
+    paths = []
+    for key, value in data.items():
+        path = os.path.join(out_dir, f"{dialect_ch} - {key}.jsonl")
+        with JSONLinesWriter(path, metrics=metrics) as writer:
+            writer.write_all(value)
+        paths.append(path)
+    return paths
+
+def tablizer(
+    dialect_ch: str, data: dict, out_dir: str = ".", metrics: Optional[Metrics] = None
+) -> list[str]:
+    """The tablizer method converts the argument `data` to a CSV file. The columns follow the keys of the records,
+       e.g. `Id`, `dialect`, `chinese_translation` and `sound_url` for the grammar part.
 
     Args:
         data (dict):
         dialect_ch (str): the dialect chinese name
+        out_dir (str): the output directory
+        metrics (Metrics): the collector of the write times (optional)
 
     Returns:
-        a csv file
+        a list of the written csv files
     """
 
+    paths = []
     for key, value in data.items():
-        df = pd.DataFrame(value)
-        column = ["Id", "dialect", "chinese_translation", "sound_url"]
-        if "Id" in value[0]:
-            df = df[column]
-        else:
-            df = df[column[1:]]
-        df.to_csv(
-            f"{dialect_ch} - {key}.csv",
-            index=False,
-            encoding="utf_8_sig",
-        )
+        path = os.path.join(out_dir, f"{dialect_ch} - {key}.csv")
+        with CSVWriter(path, metrics=metrics) as writer:
+            writer.write_all(value)
+        paths.append(path)
+    return paths
+
+FORMATS = {
+    "json": (JSONArrayWriter, "json"),
+    "jsonl": (JSONLinesWriter, "jsonl"),
+    "csv": (CSVWriter, "csv"),
+}
+
+def export_records(
+    dialect_ch: str,
+    data: dict,
+    out_dir: str = ".",
+    formats: tuple[str, ...] = ("json",),
+    metrics: Optional[Metrics] = None,
+) -> list[str]:
+    """The export_records function writes the argument `data` in every format of `formats` at once: the records of
+       each part are walked a single time and fed to all the writers.
+
+    Args:
+        dialect_ch (str): the dialect chinese name
+        data (dict):
+        out_dir (str): the output directory
+        formats (tuple): the formats (i.e. json, jsonl and csv)
+        metrics (Metrics): the collector of the write times (optional)
+
+    Returns:
+        a list of the written files
+    """
+    paths = []
+    for key, value in data.items():
+        with ExitStack() as stack:
+            writers = [
+                stack.enter_context(
+                    FORMATS[datatype][0](
+                        os.path.join(out_dir, f"{dialect_ch} - {key}.{FORMATS[datatype][1]}"),
+                        metrics=metrics,
+                    )
+                )
+                for datatype in formats
+            ]
+            for record in value:
+                for writer in writers:
+                    writer.write(record)
+        paths.extend(writer.path for writer in writers)
+    return paths
 
 def convert(datatype):
     def decorator(func):
         @wraps(func)
         def wrapper(self, *args, **kwargs): 
-            data = self.download_data()
-            if datatype == "json": 
-                self.check_type(self.download_data(), jsonify)
-            elif datatype == "csv":
-                self.check_type(self.download_data(), tablizer)
+            self.export((datatype,))
         return wrapper
     return decorator 
 
@@ -76,23 +148,188 @@ class ILRDC:
     dialect_ch: str
     part_type: str
     part: Optional[str] = None
+    session: Optional[HTTPSession] = None
+    max_workers: int = 10
+    cache_dir: Optional[str] = None
+    max_age: Optional[float] = None
+    record_cache: Optional[RecordCache] = None
+    parser: str = "lxml"
+    strict: bool = False
+    metrics: Optional[Metrics] = None
 
     def __post_init__(self) -> None:
+        get_catalog().validate(self.dialect_ch, self.part, self.part_type)
         self.dialector = URLDialector(self.dialect_ch, self.part)
+        if self.cache_dir is not None:
+            if self.session is not None:
+                raise ValueError(
+                    "`cache_dir` cannot be used with `session`, pass a ResponseCache to the HTTPSession instead"
+                )
+            cache = ResponseCache(self.cache_dir, max_age=self.max_age)
+            self.session = HTTPSession(cache=cache)
+        self.data = None
 
     def download_data(self) -> Union[list[dict[str, str]], dict[str, str]]:
-        """The download_data method downloads the data based on `self.part_type`.
+        """The download_data method downloads the data based on `self.part_type`. The data is kept by the object, so
+           the site is only scraped again after `self.refresh()`.
 
         Returns:
             a dict if the `self.part` 
         """
-        factories = {
-            "grammar": GrammarDownloader(self.dialector),
-            "vocab": VocabularyDownloader(self.dialector),
-            "story": StoryDownloader(self.dialector),
+        if self.data is None:
+            self.data = self.downloader.download()
+        return self.data
+
+    def refresh(self) -> None:
+        """The refresh method forgets the downloaded data, so that the next call downloads it again."""
+        self.data = None
+
+    def export(self, formats: tuple[str, ...] = ("json",), out_dir: str = ".") -> list[str]:
+        """The export method downloads the data once, and writes it in every format of `formats`. A format given
+           twice is written once.
+
+        Args:
+            formats (tuple): the formats (i.e. json, jsonl and csv)
+            out_dir (str): the output directory
+
+        Returns:
+            a list of the written files
+        """
+        formats = tuple(dict.fromkeys(formats))
+        unknown = [datatype for datatype in formats if datatype not in FORMATS]
+        if unknown:
+            raise ValueError(f"unknown formats {unknown}, choose from {list(FORMATS)}")
+        paths = []
+        export = partial(export_records, out_dir=out_dir, formats=formats, metrics=self.metrics)
+        self.check_type(self.download_data(), lambda dialect_ch, data: paths.extend(export(dialect_ch, data)))
+        return paths
+
+    def iter_records(self) -> Generator[dict[str, str], None, None]:
+        """The iter_records method yields the flat records as soon as each row is parsed, instead of building all
+           the data in memory.
+
+        Yields:
+            a dict: {
+                'dialect_ch': '泰雅語',
+                'part_type': 'grammar',
+                'part': '基本句型及詞序',
+                'Id': '(4-1)a.',
+                'dialect': 'maniq ngahi’ i Silan.',
+                'chinese_translation': 'Silan 吃地瓜。',
+                'sound_url': 'https://ilrdc.tw/grammar/sound/2/4-1-1.mp3'
+            }
+            The records of the story part also have the key `story_title`.
+        """
+        return self.downloader.iter_records()
+
+    async def aiter_records(self, client=None) -> AsyncGenerator[dict[str, str], None]:
+        """The aiter_records method is the async version of `iter_records`. The pages are fetched concurrently.
+
+        Args:
+            client (aiohttp.ClientSession): the shared async client; a new one is created if not given
+
+        Yields:
+            a dict
+        """
+        if client is None:
+            async with create_client(session=self.session) as client:
+                async for record in self.downloader.aiter_records(client):
+                    yield record
+            return
+        async for record in self.downloader.aiter_records(client):
+            yield record
+
+    @property
+    def downloader(self) -> Union[GrammarDownloader, VocabularyDownloader, StoryDownloader]:
+        """The downloader property selects the downloader based on `self.part_type`."""
+        options = {
+            "session": self.session,
+            "record_cache": self.record_cache,
+            "parser": self.parser,
+            "strict": self.strict,
+            "metrics": self.metrics,
+        }
+        if self.part_type == "grammar":
+            options["max_workers"] = self.max_workers
+        return DOWNLOADERS[self.part_type](self.dialector, **options)
+
+    async def adownload_data(self, client=None) -> Union[list[dict[str, str]], dict[str, str]]:
+        """The adownload_data coroutine is the async version of `download_data`. All the pages of `self.part_type`
+           are fetched concurrently.
+
+        Args:
+            client (aiohttp.ClientSession): the shared async client; a new one is created if not given
+
+        Returns:
+            the same data as `download_data`
+        """
+        if self.data is not None:
+            return self.data
+        if client is None:
+            async with create_client(session=self.session) as client:
+                self.data = await self.downloader.adownload(client)
+        else:
+            self.data = await self.downloader.adownload(client)
+        return self.data
+
+    @classmethod
+    async def download_many(
+        cls,
+        dialects: list[str],
+        part_types: list[str],
+        concurrency: int = 10,
+        session: Optional[HTTPSession] = None,
+        record_cache: Optional[RecordCache] = None,
+        parse_workers: Optional[int] = None,
+    ) -> dict[tuple[str, str], Union[list, dict]]:
+        """The download_many coroutine downloads every combination of `dialects` and `part_types` concurrently
+           over one shared async client. Each page is fetched only once (see ILRDCBatch).
+
+        Args:
+            dialects (list): the dialect chinese names
+            part_types (list): the part types (i.e. grammar, vocab and story)
+            concurrency (int): the maximum number of simultaneous connections to ilrdc.tw; the adaptive limiter of
+                               the session starts there, and backs off if the server slows down
+            session (HTTPSession): the session whose headers and timeout are used
+            record_cache (RecordCache): the cache of the cleaned records
+            parse_workers (int): the number of processes cleaning the pages, e.g. os.cpu_count()
+
+        Returns:
+            a dict: {("泰雅語", "grammar"): [...], ...}
+        """
+        from .plan import ILRDCBatch
+
+        batch = ILRDCBatch(session=session, record_cache=record_cache)
+        for dialect_ch, part_type in itertools.product(dialects, part_types):
+            batch.add(dialect_ch, part_type)
+        results = await batch.arun(concurrency, parse_workers=parse_workers)
+        return {
+            (request.dialect_ch, request.part_type): data
+            for request, data in results.items()
         }
-        return factories[self.part_type].download()
  
+    def sync(self, output_dir: str, formats: tuple[str, ...] = ("json",)) -> dict[str, list[str]]:
+        """The sync method keeps the files in `output_dir` up to date. Only the pages that have changed since the
+           last sync are downloaded, parsed and written again.
+
+        Args:
+            output_dir (str): the output directory, where the manifest is kept as well
+            formats (tuple): the output formats (i.e. json and csv)
+
+        Returns:
+            a dict: {"changed": [urls], "unchanged": [urls], "failed": [urls]}
+        """
+        from .sync import Synchronizer
+
+        synchronizer = Synchronizer(
+            output_dir,
+            formats,
+            session=self.session,
+            record_cache=self.record_cache,
+            max_workers=self.max_workers,
+        )
+        return synchronizer.sync([self.dialect_ch], [self.part_type], self.part)
+
     def check_type(self, data, func):
         if isinstance(data, list):
             for value in data:
@@ -114,3 +351,83 @@ class ILRDC:
     def to_csv(self) -> None:
         """Convert the data to a csv file"""
         return
+
+    @convert('jsonl')
+    def to_jsonl(self) -> None:
+        """Convert the data to a json lines file"""
+        return
+
+    def to_parquet(self, path: str = "ilrdc-parquet"):
+        """Convert the data to a Parquet dataset partitioned by dialect and part type, with dictionary-encoded
+        columns and zstd compression. pyarrow is an optional dependency.
+
+        Args:
+            path (str): the directory of the dataset
+
+        Returns:
+            a pyarrow.Table object
+        """
+        table = records_to_table(self.iter_records())
+        if self.metrics is None:
+            write_parquet(table, path)
+        else:
+            with self.metrics.time("write", path=path, rows=table.num_rows, format="parquet"):
+                write_parquet(table, path)
+        return table
+
+    def download_audio(self, dest: str = "ilrdc-audio", concurrency: int = 10) -> dict:
+        """The download_audio method downloads every unique sound file of the data concurrently into a
+           content-addressed store. See AudioDownloader.
+
+        Args:
+            dest (str): the directory of the store
+            concurrency (int): the number of sound files downloaded at the same time
+
+        Returns:
+            a dict: {"downloaded": [urls], "skipped": [urls], "failed": {url: error}}
+        """
+        with ExitStack() as stack:
+            session = self.session
+            if session is None:
+                session = stack.enter_context(HTTPSession(pool_size=concurrency))
+            elif session.pool_size < concurrency:
+                # a larger pool, which still shares the rate limit, retries and adaptive limiter of the session
+                session = stack.enter_context(
+                    HTTPSession(concurrency, session.timeout, session.headers, scheduler=session.scheduler)
+                )
+                session.scheduler.limiter.seed(concurrency)
+            audio_downloader = AudioDownloader(dest, session, concurrency, metrics=self.metrics)
+            return audio_downloader.download(
+                record["sound_url"] for record in self.iter_records()
+            )
+
+    def to_dataframe(self):
+        """Convert the flat records to a pandas DataFrame. pandas is an optional dependency, so it is only imported
+        here."""
+        import pandas as pd
+
+        return pd.DataFrame.from_records(self.iter_records())
+
+
+def export_parquet(
+    dialects: list[str], part_types: list[str], path: str = "ilrdc-parquet", **kwargs
+):
+    """The export_parquet function writes every combination of `dialects` and `part_types` to one Parquet dataset
+       partitioned by dialect and part type.
+
+    Args:
+        dialects (list): the dialect chinese names
+        part_types (list): the part types (i.e. grammar, vocab and story)
+        path (str): the directory of the dataset
+        kwargs: the other arguments of ILRDC, e.g. `session` or `cache_dir`
+
+    Returns:
+        a pyarrow.Table object
+    """
+    records = itertools.chain.from_iterable(
+        ILRDC(dialect_ch, part_type, **kwargs).iter_records()
+        for dialect_ch, part_type in itertools.product(dialects, part_types)
+    )
+    table = records_to_table(records)
+    write_parquet(table, path)
+    return table
@@ -0,0 +1,289 @@
+import time
+import asyncio
+from typing import Optional, Union
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .base import get_backend
+from .core import DOWNLOADERS
+from .urldialector import URLDialector, get_catalog
+from .util import HTTPSession, Metrics, RecordCache, create_client, get_default_session
+
+# --------------------------------------------------------------------
+# helper functions
+
+
+def parse_records(html: str, part_types: tuple[str, ...], parser: str, strict: bool) -> dict[str, tuple]:
+    """The parse_records function cleans a page in a worker process of the parsing pool. It only takes and returns
+       plain values, so nothing but the html and the cleaned rows is pickled between the processes.
+
+    Args:
+        html (str): the html of the page
+        part_types (tuple): the part types whose cleaner parses the page
+        parser (str): the name of the parser backend
+        strict (bool): whether the records are validated
+
+    Returns:
+        a dict: {part type: (the column names, a list of row tuples)}
+    """
+    backend = get_backend(parser)
+    parsed = {}
+    for part_type in part_types:
+        records = DOWNLOADERS[part_type].cleaner(backend.parse(html), backend, strict).extract_data()
+        columns, rows = (), []
+        for record in records:
+            columns = columns or tuple(record)
+            rows.append(tuple(record.values()))
+        parsed[part_type] = (columns, rows)
+    return parsed
+
+
+def unpack_records(columns: tuple[str, ...], rows: list[tuple]) -> list[dict[str, str]]:
+    return [dict(zip(columns, row)) for row in rows]
+
+
+# --------------------------------------------------------------------
+# public interface
+
+
+
+@dataclass(frozen=True)
+class Request:
+    """
+    The Request object is a request for the data of a dialect and part type, like an ILRDC object.
+    """
+
+    dialect_ch: str
+    part_type: str
+    part: Optional[str] = None
+
+
+@dataclass
+class ILRDCBatch:
+    """
+    The ILRDCBatch object collects many requests, collapses them into the unique set of page urls, fetches each page
+    once, and then fans the cleaned records back out to every request. `parsers` keeps a downloader per part type to
+    clean the pages.
+    """
+
+    session: Optional[HTTPSession] = None
+    record_cache: Optional[RecordCache] = None
+    parser: str = "lxml"
+    strict: bool = False
+    max_workers: int = 10
+    metrics: Optional[Metrics] = None
+    requests: list[Request] = field(init=False, default_factory=list)
+    parsers: dict[str, object] = field(init=False, default_factory=dict, repr=False)
+
+    def add(self, dialect_ch: str, part_type: str, part: Optional[str] = None) -> "ILRDCBatch":
+        """The add method adds a request, unless the same request has been added.
+
+        Args:
+            dialect_ch (str): the chinese name of the dialect
+            part_type (str): the part type (i.e. grammar, vocab and story)
+            part (str): the part to specify (optional)
+
+        Returns:
+            the ILRDCBatch object itself
+        """
+        get_catalog().validate(dialect_ch, part, part_type)
+        request = Request(dialect_ch, part_type, part)
+        if request not in self.requests:
+            self.requests.append(request)
+        if part_type not in self.parsers:
+            self.parsers[part_type] = self.downloader(request)
+        return self
+
+    def downloader(self, request: Request):
+        """The downloader method creates the downloader of a request."""
+        return DOWNLOADERS[request.part_type](
+            URLDialector(request.dialect_ch, request.part),
+            session=self.session,
+            record_cache=self.record_cache,
+            parser=self.parser,
+            strict=self.strict,
+            metrics=self.metrics,
+        )
+
+    def plan(self) -> dict[str, set[str]]:
+        """The plan method collapses the requests into the unique page urls.
+
+        Returns:
+            a dict: {url: the part types whose cleaner parses the page}
+        """
+        pages = {}
+        for request in self.requests:
+            for info in self.downloader(request).request_infos:
+                pages.setdefault(info["part_url"], set()).add(request.part_type)
+        return pages
+
+    def parse(self, html: str, part_types: set[str], url: str = "") -> dict[str, list]:
+        """The parse method cleans a page once for every part type that needs it.
+
+        Returns:
+            a dict: {part type: the cleaned records}
+        """
+        return {
+            part_type: list(self.parsers[part_type].parse_page(html, url))
+            for part_type in part_types
+        }
+
+    def fan_out(
+        self, parsed: dict[str, Union[dict[str, list], Exception]]
+    ) -> dict[Request, Union[list, dict, str]]:
+        """The fan_out method builds the data of every request from the parsed pages.
+
+        Args:
+            parsed (dict): {url: {part type: the cleaned records}, or the exception raised while fetching the page}
+
+        Returns:
+            a dict: {Request: the same data as `ILRDC.download_data`}
+        """
+        results = {}
+        for request in self.requests:
+            pages = {
+                url: records if isinstance(records, Exception) else records[request.part_type]
+                for url, records in parsed.items()
+                if isinstance(records, Exception) or request.part_type in records
+            }
+            results[request] = self.downloader(request).assemble(pages)
+        return results
+
+    def run(self) -> dict[Request, Union[list, dict, str]]:
+        """The run method fetches every unique page once with a thread pool.
+
+        Returns:
+            a dict: {Request: the same data as `ILRDC.download_data`}
+        """
+        session = self.session or get_default_session()
+
+        def fetch(item):
+            url, part_types = item
+            try:
+                return url, self.parse(session.fetch(url, self.metrics), part_types, url)
+            except Exception as error:
+                return url, error
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            parsed = dict(executor.map(fetch, self.plan().items()))
+        return self.fan_out(parsed)
+
+    def cached(self, html: str, part_types: set[str]) -> dict[str, list]:
+        """The cached method looks up the records of a page in `self.record_cache`.
+
+        Returns:
+            a dict: {part type: the cached records}, for the part types found in the cache
+        """
+        if self.record_cache is None:
+            return {}
+        cached = {}
+        for part_type in part_types:
+            records = self.record_cache.get(html, self.parsers[part_type].parser_version)
+            if records is not None:
+                cached[part_type] = records
+        return cached
+
+    async def pipeline(
+        self,
+        session: HTTPSession,
+        client,
+        pages: dict[str, set[str]],
+        parse_workers: int,
+        max_pending: Optional[int] = None,
+    ):
+        """The pipeline coroutine fetches the pages concurrently and cleans them in a pool of `parse_workers`
+           processes. A page is only fetched when fewer than `max_pending` pages are being fetched or wait for the
+           parsers, so the fetching stops while the parsers are behind and at most `max_pending` pages are in memory.
+
+        Args:
+            session (HTTPSession): the session
+            client (aiohttp.ClientSession): the async client
+            pages (dict): {url: the part types whose cleaner parses the page}
+            parse_workers (int): the number of parsing processes
+            max_pending (int): the maximum number of pages fetched but not parsed yet, `4 * parse_workers` by default
+
+        Returns:
+            a dict: {url: {part type: the cleaned records}, or the exception raised while fetching the page}
+        """
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Semaphore(max_pending or 4 * parse_workers)
+        queue: asyncio.Queue = asyncio.Queue()
+        parsed = {}
+
+        async def fetch(url: str, part_types: set[str]) -> None:
+            await pending.acquire()
+            try:
+                html = await session.afetch(url, client, self.metrics)
+            except Exception as error:
+                parsed[url] = error
+                pending.release()
+            else:
+                queue.put_nowait((url, part_types, html))
+
+        async def parse(executor: ProcessPoolExecutor) -> None:
+            while True:
+                url, part_types, html = await queue.get()
+                try:
+                    records = self.cached(html, part_types)
+                    missing = tuple(sorted(part_types - records.keys()))
+                    if missing:
+                        start = time.perf_counter()
+                        packed = await loop.run_in_executor(
+                            executor, parse_records, html, missing, self.parser, self.strict
+                        )
+                        for part_type, (columns, rows) in packed.items():
+                            records[part_type] = unpack_records(columns, rows)
+                            if self.record_cache is not None:
+                                self.record_cache.put(html, self.parsers[part_type].parser_version, records[part_type])
+                        if self.metrics is not None:
+                            rows = sum(len(records[part_type]) for part_type in missing)
+                            self.metrics.record("parse", time.perf_counter() - start, url=url, rows=rows)
+                    parsed[url] = records
+                except Exception as error:
+                    parsed[url] = error
+                finally:
+                    del html
+                    pending.release()
+                    queue.task_done()
+
+        with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+            workers = [asyncio.create_task(parse(executor)) for _ in range(parse_workers)]
+            await asyncio.gather(*(fetch(url, part_types) for url, part_types in pages.items()))
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+        return parsed
+
+    async def arun(
+        self, concurrency: Optional[int] = None, client=None, parse_workers: Optional[int] = None
+    ) -> dict[Request, Union[list, dict, str]]:
+        """The arun coroutine fetches every unique page once concurrently over one async client.
+
+        Args:
+            concurrency (int): the maximum number of simultaneous connections to ilrdc.tw; the adaptive limiter of
+                               the session starts there, and backs off if the server slows down
+            client (aiohttp.ClientSession): the shared async client; a new one is created if not given
+            parse_workers (int): the number of processes cleaning the pages; they are cleaned in the event loop if
+                                 not given
+
+        Returns:
+            a dict: {Request: the same data as `ILRDC.download_data`}
+        """
+        if client is None:
+            async with create_client(concurrency, self.session) as client:
+                return await self.arun(concurrency, client, parse_workers)
+        session = self.session or get_default_session()
+        if concurrency:
+            # the adaptive limiter of the session starts at its pool size
+            session.scheduler.limiter.seed(concurrency)
+        if parse_workers:
+            return self.fan_out(await self.pipeline(session, client, self.plan(), parse_workers))
+
+        async def fetch(url, part_types):
+            try:
+                return url, self.parse(await session.afetch(url, client, self.metrics), part_types, url)
+            except Exception as error:
+                return url, error
+
+        tasks = [fetch(url, part_types) for url, part_types in self.plan().items()]
+        parsed = dict(await asyncio.gather(*tasks))
+        return self.fan_out(parsed)
@@ -0,0 +1,207 @@
+import sqlite3
+import itertools
+from typing import Iterable, Optional, Union
+from dataclasses import dataclass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    dialect_ch TEXT NOT NULL,
+    part_type TEXT NOT NULL,
+    part TEXT NOT NULL,
+    story_title TEXT,
+    record_id TEXT,
+    text TEXT NOT NULL,
+    chinese_translation TEXT NOT NULL,
+    sound_url TEXT,
+    alphabet TEXT
+);
+CREATE INDEX IF NOT EXISTS records_dialect_part ON records (dialect_ch, part_type, part);
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+    text, chinese_translation, content='records', content_rowid='id', tokenize='trigram'
+);
+"""
+
+COLUMNS = (
+    "dialect_ch",
+    "part_type",
+    "part",
+    "story_title",
+    "record_id",
+    "text",
+    "chinese_translation",
+    "sound_url",
+    "alphabet",
+)
+
+# the trigram tokenizer cannot match a query shorter than three characters
+MIN_MATCH_LENGTH = 3
+
+
+# --------------------------------------------------------------------
+# helper functions
+
+
+def to_row(record: dict[str, str]) -> tuple:
+    """The to_row function converts a flat record of `iter_records` to a row of the `records` table.
+
+    Args:
+        record (dict): the flat record
+
+    Returns:
+        a tuple
+    """
+    return (
+        record["dialect_ch"],
+        record["part_type"],
+        record["part"],
+        record.get("story_title"),
+        record.get("Id"),
+        record.get("vocab", record.get("dialect", "")),
+        record.get("chinese_translation", ""),
+        record.get("sound_url"),
+        record.get("alphabet"),
+    )
+
+
+def to_record(row: sqlite3.Row) -> dict[str, str]:
+    """The to_record function converts a row of the `records` table back to a flat record.
+
+    Args:
+        row (sqlite3.Row): the row
+
+    Returns:
+        a dict
+    """
+    record = {
+        "dialect_ch": row["dialect_ch"],
+        "part_type": row["part_type"],
+        "part": row["part"],
+        "story_title": row["story_title"],
+        "Id": row["record_id"],
+        "vocab" if row["part_type"] == "vocab" else "dialect": row["text"],
+        "chinese_translation": row["chinese_translation"],
+        "sound_url": row["sound_url"],
+        "alphabet": row["alphabet"],
+    }
+    return {key: value for key, value in record.items() if value is not None}
+
+
+# --------------------------------------------------------------------
+# public interface
+
+
+@dataclass
+class CorpusStore:
+    """
+    The CorpusStore object keeps the records in a SQLite database, with a full-text index over the dialect text
+    (or vocab) and the chinese translation.
+    """
+
+    path: str = ":memory:"
+
+    def __post_init__(self) -> None:
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "CorpusStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """The close method closes the database."""
+        self.connection.close()
+
+    def ingest(self, source: Union[Iterable[dict[str, str]], object]) -> int:
+        """The ingest method inserts the records in a single transaction, and then indexes them. The records of a
+           (dialect, part type, part) which was ingested before replace the old ones, together with their full-text
+           entries, so that a refresh does not duplicate the rows.
+
+        Args:
+            source: a downloader (e.g. GrammarDownloader) or an ILRDC object, or the flat records of `iter_records`
+
+        Returns:
+            an int: the number of records inserted
+        """
+        records = source.iter_records() if hasattr(source, "iter_records") else source
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        replaced, inserted = set(), 0
+        with self.connection:
+            for part, group in itertools.groupby(map(to_row, records), key=lambda row: row[:3]):
+                if part not in replaced:
+                    self.delete_part(*part)
+                    replaced.add(part)
+                last_id = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM records").fetchone()[0]
+                cursor = self.connection.executemany(
+                    f"INSERT INTO records ({', '.join(COLUMNS)}) VALUES ({placeholders})", group
+                )
+                self.connection.execute(
+                    "INSERT INTO records_fts (rowid, text, chinese_translation) "
+                    "SELECT id, text, chinese_translation FROM records WHERE id > ?",
+                    (last_id,),
+                )
+                inserted += cursor.rowcount
+        return inserted
+
+    def delete_part(self, dialect_ch: str, part_type: str, part: str) -> None:
+        """The delete_part method removes the records of a part and their full-text entries, inside the current
+        transaction."""
+        condition = "dialect_ch = ? AND part_type = ? AND part = ?"
+        self.connection.execute(
+            "INSERT INTO records_fts (records_fts, rowid, text, chinese_translation) "
+            f"SELECT 'delete', id, text, chinese_translation FROM records WHERE {condition}",
+            (dialect_ch, part_type, part),
+        )
+        self.connection.execute(f"DELETE FROM records WHERE {condition}", (dialect_ch, part_type, part))
+
+    def search(
+        self,
+        text: str,
+        dialect: Optional[str] = None,
+        part: Optional[str] = None,
+        limit: Optional[int] = 50,
+    ) -> list[dict[str, str]]:
+        """The search method finds the records whose dialect text (or vocab) or chinese translation contains `text`.
+
+        Args:
+            text (str): the text to search for, e.g. "地瓜" or "ngahi"
+            dialect (str): the dialect chinese name (optional)
+            part (str): the part name or the part type (optional)
+            limit (int): the maximum number of records, or None for all of them
+
+        Returns:
+            a list of the flat records, including their sound urls
+        """
+        conditions, parameters = [], []
+        if len(text) >= MIN_MATCH_LENGTH:
+            source = "records_fts JOIN records ON records.id = records_fts.rowid"
+            conditions.append("records_fts MATCH ?")
+            parameters.append('"{}"'.format(text.replace('"', '""')))
+            order = "records_fts.rank"
+        else:
+            source = "records"
+            pattern = "%{}%".format(
+                text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            conditions.append(
+                "(records.text LIKE ? ESCAPE '\\' OR records.chinese_translation LIKE ? ESCAPE '\\')"
+            )
+            parameters.extend([pattern, pattern])
+            order = "records.id"
+        if dialect is not None:
+            conditions.append("records.dialect_ch = ?")
+            parameters.append(dialect)
+        if part is not None:
+            conditions.append("(records.part = ? OR records.part_type = ?)")
+            parameters.extend([part, part])
+
+        query = f"SELECT records.* FROM {source} WHERE {' AND '.join(conditions)} ORDER BY {order}"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        return [to_record(row) for row in self.connection.execute(query, parameters)]
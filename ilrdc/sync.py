@@ -0,0 +1,208 @@
+import os
+import json
+import hashlib
+from typing import Optional
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from .urldialector import URLDialector, get_catalog
+from .util import HTTPSession, RecordCache, get_default_session
+from .core import DOWNLOADERS, StoryDownloader
+from .ilrdc import jsonify, jsonlify, tablizer
+
+
+PART_TYPES = ("grammar", "vocab", "story")
+
+WRITERS = {"json": jsonify, "jsonl": jsonlify, "csv": tablizer}
+
+
+# --------------------------------------------------------------------
+# helper functions
+
+
+def content_hash(html: str) -> str:
+    """The content_hash function hashes the html of a page.
+
+    Args:
+        html (str): the html
+
+    Returns:
+        a str
+    """
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def page_key(url: str) -> str:
+    """The page_key function makes the manifest key from the `l` (dialect id) and `p` (part id) of the url.
+
+    Args:
+        url (str): the url (e.g. http://ilrdc.tw/grammar/index.php?l=2&p=3)
+
+    Returns:
+        a str: "2-3"
+    """
+    query = dict(item.split("=", 1) for item in url.split("?", 1)[1].split("&"))
+    return f"{query['l']}-{query['p']}"
+
+
+# --------------------------------------------------------------------
+# public interface
+
+
+@dataclass
+class Synchronizer:
+    """
+    The Synchronizer object keeps `output_dir` up to date with ilrdc.tw. A manifest stores the ETag, Last-Modified,
+    content hash, record count, formats and files of every (dialect id, part id) page; each run sends conditional
+    requests first and only parses and rewrites the outputs of the pages that have changed, or whose outputs in
+    `formats` are missing.
+    """
+
+    output_dir: str
+    formats: tuple[str, ...] = ("json",)
+    session: Optional[HTTPSession] = None
+    record_cache: Optional[RecordCache] = None
+    max_workers: int = 10
+    manifest: dict[str, dict] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.output_dir, "manifest.json")
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as file:
+                self.manifest = json.load(file)
+
+    def save_manifest(self) -> None:
+        """The save_manifest method writes the manifest atomically."""
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.manifest, file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    def plan(
+        self, dialects: list[str], part_types: list[str], part: Optional[str] = None
+    ) -> list[tuple[str, object, dict]]:
+        """The plan method lists the pages to check.
+
+        Args:
+            dialects (list): the dialect chinese names
+            part_types (list): the part types (i.e. grammar, vocab and story)
+            part (str): the part to specify (optional)
+
+        Returns:
+            a list of tuples: (dialect chinese name, downloader, request info)
+        """
+        pages = []
+        catalog = get_catalog()
+        for dialect_ch in dialects:
+            dialector = URLDialector(dialect_ch, part)
+            for part_type in part_types:
+                if part and part not in catalog.part_types[part_type]:
+                    continue
+                downloader = DOWNLOADERS[part_type](
+                    dialector, session=self.session, record_cache=self.record_cache
+                )
+                pages.extend((dialect_ch, downloader, info) for info in downloader.request_infos)
+        return pages
+
+    def check_page(self, dialect_ch: str, downloader, info: dict) -> tuple[str, dict]:
+        """The check_page method sends a conditional request for a page, and rewrites its outputs if it has changed.
+
+        Args:
+            dialect_ch (str): the dialect chinese name
+            downloader (DataDownloader): the downloader of the page
+            info (dict): the request info
+
+        Returns:
+            a tuple: (either "changed" or "unchanged", the manifest entry)
+        """
+        url = info["part_url"]
+        entry = dict(self.manifest.get(page_key(url), {}))
+        files = entry.get("files", [])
+        if not all(os.path.exists(os.path.join(self.output_dir, name)) for name in files):
+            entry = {}
+        if not set(self.formats) <= set(entry.get("formats", ())):
+            # the outputs of a format asked for the first time are missing, whether or not the page has changed
+            entry = {}
+        validators = {}
+        if entry.get("etag"):
+            validators["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            validators["If-Modified-Since"] = entry["last_modified"]
+
+        session = self.session or get_default_session()
+        status, html, headers = session.fetch_if_changed(url, validators)
+        if status == 304 and entry:
+            return "unchanged", entry
+        if not 200 <= status < 300:
+            raise ConnectionError(f"{url} returned {status}")
+
+        entry.update(
+            url=url,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+        digest = content_hash(html)
+        if entry.get("content_hash") == digest:
+            return "unchanged", entry
+
+        records = list(downloader.parse_page(html))
+        if isinstance(downloader, StoryDownloader) and records:
+            data = downloader.get_each_story(records)
+        else:
+            data = downloader.format_data(info["part_name"], records)
+        files = []
+        for datatype in self.formats:
+            files.extend(self.write(dialect_ch, data, WRITERS[datatype]))
+        entry.update(content_hash=digest, record_count=len(records), files=files, formats=list(self.formats))
+        return "changed", entry
+
+    def write(self, dialect_ch: str, data, func) -> list[str]:
+        """The write method writes the data of a page like `ILRDC.check_type` does."""
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, list):
+            return []
+        files = []
+        for value in data:
+            if type(value) is dict:
+                files.extend(
+                    os.path.relpath(path, self.output_dir)
+                    for path in func(dialect_ch, value, self.output_dir)
+                )
+        return files
+
+    def sync(
+        self,
+        dialects: Optional[list[str]] = None,
+        part_types: Optional[list[str]] = None,
+        part: Optional[str] = None,
+    ) -> dict[str, list[str]]:
+        """The sync method checks every page of `dialects` and `part_types`, and rewrites the changed ones.
+
+        Args:
+            dialects (list): the dialect chinese names, all the dialects by default
+            part_types (list): the part types, all the part types by default
+            part (str): the part to specify (optional)
+
+        Returns:
+            a dict: {"changed": [urls], "unchanged": [urls], "failed": [urls]}
+        """
+        dialects = dialects or list(get_catalog().dialects)
+        part_types = part_types or list(PART_TYPES)
+        pages = self.plan(dialects, part_types, part)
+        report = {"changed": [], "unchanged": [], "failed": []}
+
+        def check(page):
+            try:
+                return self.check_page(*page)
+            except Exception as error:
+                return "failed", {"error": repr(error)}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            for (_, _, info), (state, entry) in zip(pages, executor.map(check, pages)):
+                url = info["part_url"]
+                report[state].append(url)
+                if state != "failed":
+                    self.manifest[page_key(url)] = entry
+        self.save_manifest()
+        return report
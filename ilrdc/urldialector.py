@@ -1,11 +1,24 @@
-import re 
+import os
+import re
+import json
+import logging
+import warnings
+import threading
 from enum import Enum
+from types import MappingProxyType
 from urllib.parse import urljoin
-from typing import Union, Optional
+from typing import Mapping, Union, Optional
 from dataclasses import dataclass, field
 
 
 BASE_URL = "http://ilrdc.tw/grammar/"
+CATALOG_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ilrdc", "catalog.json")
+# the environment variable which points at a catalog written by `refresh_catalog`
+CATALOG_ENV = "ILRDC_CATALOG"
+VOCAB_PARTS = ("基本詞彙",)
+STORY_PARTS = ("長篇語料",)
+
+logger = logging.getLogger(__name__)
 
 # --------------------------------------------------------------------
 # enum classes
@@ -69,93 +82,285 @@ class ILRDCPart(ILRDCComponent):
 
 
 # --------------------------------------------------------------------
-# helper classes or functions
+# request catalog
 
 
-@dataclass
-class URLCreator:
+@dataclass(frozen=True, eq=False)
+class RequestCatalog:
     """
-    The URLCreator object converts the given dialecdt name to its corresponding url.
+    The RequestCatalog object precomputes the request info of every (dialect, part type, part), so that looking one
+    up is a dict access. The dialects and parts come from the enums by default, or from the site index cached by
+    `refresh_catalog`. It is immutable: its mappings and request infos are read-only, and `lookup` and `generate`
+    return copies of the request infos, which the caller may modify. It compares and hashes by identity, since its
+    mappings are not hashable.
     """
 
-    dialect_ch: str
-    dialect_id: str = field(init=False, default_factory=str)
+    dialects: Mapping[str, int]
+    parts: Mapping[str, int]
+    base_url: str = BASE_URL
 
     def __post_init__(self) -> None:
-        self.dialect_id = ILRDCDialect[self.dialect_ch].value
-        self.list_of_part_ids = list(map(lambda part: part.value, ILRDCPart))
+        part_types = {
+            "grammar": tuple(part for part in self.parts if part not in VOCAB_PARTS + STORY_PARTS),
+            "vocab": tuple(part for part in self.parts if part in VOCAB_PARTS),
+            "story": tuple(part for part in self.parts if part in STORY_PARTS),
+        }
+        by_dialect, plans = {}, {}
+        for dialect_ch, dialect_id in self.dialects.items():
+            infos = {
+                part_ch: MappingProxyType({
+                    "part_name": part_ch,
+                    "part_url": urljoin(self.base_url, f"index.php?l={dialect_id}&p={part_id}"),
+                })
+                for part_ch, part_id in self.parts.items()
+            }
+            by_dialect[dialect_ch] = tuple(infos.values())
+            for part_type, part_names in part_types.items():
+                group = tuple(infos[part_ch] for part_ch in part_names)
+                if group:
+                    plans[dialect_ch, part_type, None] = group if part_type == "grammar" else group[0]
+                for part_ch in part_names:
+                    plans[dialect_ch, part_type, part_ch] = infos[part_ch]
+        object.__setattr__(self, "dialects", MappingProxyType(dict(self.dialects)))
+        object.__setattr__(self, "parts", MappingProxyType(dict(self.parts)))
+        object.__setattr__(self, "part_types", MappingProxyType(part_types))
+        object.__setattr__(self, "part_names", MappingProxyType({v: k for k, v in self.parts.items()}))
+        object.__setattr__(self, "by_dialect", MappingProxyType(by_dialect))
+        object.__setattr__(self, "plans", MappingProxyType(plans))
 
-    def combine_to_url(self, part_id: str) -> str:
-        """The combine_to_url method combines a part id with the dialect id to an url.
+    @classmethod
+    def from_enums(cls, base_url: str = BASE_URL) -> "RequestCatalog":
+        """The from_enums class method builds the catalog of ILRDCDialect and ILRDCPart."""
+        return cls(ILRDCDialect.get_dict_info(), ILRDCPart.get_dict_info(), base_url)
 
-        Args:
-            part_id (str): the part id
+    @classmethod
+    def load(cls, path: str, base_url: str = BASE_URL) -> "RequestCatalog":
+        """The load class method builds the catalog from the file written by `refresh_catalog`."""
+        with open(path, encoding="utf-8") as file:
+            index = json.load(file)
+        return cls(index["dialects"], index["parts"], base_url)
+
+    def validate(
+        self, dialect_ch: str, part_ch: Optional[str] = None, part_type: Optional[str] = None
+    ) -> None:
+        """The validate method raises ValueError on an unknown dialect, part or part type, or on a part which does
+        not belong to the part type."""
+        if dialect_ch not in self.dialects:
+            raise ValueError(f"unknown dialect {dialect_ch!r}, choose from {list(self.dialects)}")
+        if part_type is not None and part_type not in self.part_types:
+            raise ValueError(f"unknown part type {part_type!r}, choose from {list(self.part_types)}")
+        if part_ch:
+            choices = self.part_types[part_type] if part_type is not None else tuple(self.parts)
+            if part_ch not in choices:
+                raise ValueError(f"unknown part {part_ch!r}, choose from {list(choices)}")
+
+    def lookup(
+        self, dialect_ch: str, part_type: str, part_ch: Optional[str] = None
+    ) -> Union[dict[str, str], list[dict[str, str]]]:
+        """The lookup method finds the request info of a dialect, part type and part.
 
         Returns:
-            a str: a url (e.g. http://ilrdc.tw/grammar/index.php?l=2&p=3)
+            a copy: a dict if a part is specified or the part type has a single part, a list otherwise
         """
-        return urljoin(BASE_URL, f"index.php?l={self.dialect_id}&p={part_id}")
+        try:
+            plan = self.plans[dialect_ch, part_type, part_ch or None]
+        except KeyError:
+            self.validate(dialect_ch, part_ch, part_type)
+            raise ValueError(f"the catalog has no {part_type} part") from None
+        return list(map(dict, plan)) if isinstance(plan, tuple) else dict(plan)
+
+    def generate(
+        self, dialect_ch: str, part_ch: Optional[str] = None
+    ) -> Union[dict[str, str], list[dict[str, str]]]:
+        """The generate method finds a copy of the request info of a part of the dialect, or of all its parts in
+        order."""
+        self.validate(dialect_ch, part_ch)
+        infos = self.by_dialect[dialect_ch]
+        if part_ch:
+            return dict(infos[list(self.parts).index(part_ch)])
+        return list(map(dict, infos))
+
+
+_catalogs: dict[str, RequestCatalog] = {}
+_catalogs_lock = threading.Lock()
+# the catalog file chosen by `use_catalog` or `refresh_catalog`: None if not chosen, "" for the enums
+_catalog_path: Optional[str] = None
+
+
+def get_catalog() -> RequestCatalog:
+    """The get_catalog function returns the catalog for the current BASE_URL, built on first use. It is built from
+       the enums, unless a file written by `refresh_catalog` is chosen with `use_catalog` or the ILRDC_CATALOG
+       environment variable.
+
+    Returns:
+        a RequestCatalog object
+    """
+    catalog = _catalogs.get(BASE_URL)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(BASE_URL)
+            if catalog is None:
+                path = os.environ.get(CATALOG_ENV) if _catalog_path is None else _catalog_path
+                if path:
+                    catalog = RequestCatalog.load(path, BASE_URL)
+                    logger.info("loaded the catalog of %s from %s", BASE_URL, path)
+                else:
+                    catalog = RequestCatalog.from_enums(BASE_URL)
+                    logger.info("loaded the built-in catalog of %s", BASE_URL)
+                _catalogs[BASE_URL] = catalog
+    return catalog
+
+
+def use_catalog(path: Optional[str] = CATALOG_PATH) -> RequestCatalog:
+    """The use_catalog function chooses the catalog of the current process: the file written by `refresh_catalog`
+       at `path`, or the enums if `path` is None. It takes precedence over the ILRDC_CATALOG environment variable.
+
+    Args:
+        path (str): the cached file (optional)
+
+    Returns:
+        a RequestCatalog object
+    """
+    global _catalog_path
+    with _catalogs_lock:
+        _catalog_path = path or ""
+        _catalogs.clear()
+    return get_catalog()
 
-    def create(self) -> list[str]:
-        """The create method creates a list of urls.
 
-        Returns:
-            a list
-        """
-        urls = map(self.combine_to_url, self.list_of_part_ids)
-        return list(urls)
-   
+def parse_index(html: str) -> dict[str, dict[str, int]]:
+    """The parse_index function reads the dialects and parts from the links of the site index, e.g.
+       `<a href="index.php?l=2">泰雅語</a>` and `<a href="index.php?l=2&p=3">詞彙與構詞</a>`.
+
+    Returns:
+        a dict: {"dialects": {"泰雅語": 2, ...}, "parts": {"詞彙與構詞": 3, ...}}
+    """
+    dialects, parts = {}, {}
+    links = re.finditer(
+        r'<a[^>]*href="[^"]*index\.php\?l=(\d+)(?:&(?:amp;)?p=(\d+))?"[^>]*>(.*?)</a>', html, re.S
+    )
+    for match in links:
+        name = re.sub(r"<[^>]+>|\s+", "", match.group(3))
+        if not name:
+            continue
+        if match.group(2) is None:
+            dialects.setdefault(name, int(match.group(1)))
+        else:
+            parts.setdefault(name, int(match.group(2)))
+    return {"dialects": dialects, "parts": dict(sorted(parts.items(), key=lambda item: item[1]))}
+
+
+def refresh_catalog(path: str = CATALOG_PATH, session=None) -> RequestCatalog:
+    """The refresh_catalog function downloads the dialects and parts from the site index, caches them in `path`,
+       and uses them in the current process, so that a new language does not need a new release. Other processes
+       use them through `use_catalog` or the ILRDC_CATALOG environment variable.
+
+    Args:
+        path (str): the cached file
+        session (HTTPSession): the session; the process-wide session is used if not given
+
+    Returns:
+        a RequestCatalog object
+    """
+    global _catalog_path
+    from .util import get_default_session
+
+    session = session or get_default_session()
+    index = parse_index(session.fetch(urljoin(BASE_URL, "index.php")))
+    if not index["dialects"] or not index["parts"]:
+        raise ValueError("no dialects or parts were found in the site index")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(index, file, ensure_ascii=False, indent=1)
+    os.replace(temp_path, path)
+    catalog = RequestCatalog(index["dialects"], index["parts"], BASE_URL)
+    with _catalogs_lock:
+        _catalog_path = path
+        _catalogs.clear()
+        _catalogs[BASE_URL] = catalog
+    logger.info("loaded the catalog of %s from %s", BASE_URL, path)
+    return catalog
+
+
+# --------------------------------------------------------------------
+# public interface
+
 
 @dataclass
 class URLDialector:
     """
     The URLDialector object allows the user to type the dialect name and part, and then generates the request information.
-    If the user only types the dialect name, all the request information will be generated.
+    If the user only types the dialect name, all the request information will be generated. The request information
+    comes from the precomputed RequestCatalog, and an unknown dialect or part raises ValueError.
     """
 
     dialect_ch: str
     part_ch: Optional[str] = False
 
     def __post_init__(self) -> None:
-        self.url_list = URLCreator(self.dialect_ch).create()
+        self.catalog = get_catalog()
+        self.catalog.validate(self.dialect_ch, self.part_ch)
+
+    @property
+    def url_list(self) -> list[str]:
+        """The url_list property lists the urls of all the parts of the dialect."""
+        return [info["part_url"] for info in self.catalog.by_dialect[self.dialect_ch]]
+
+    def generate(self) -> Union[dict[str, str], list[dict[str, str]]]:
+        """The generate method generates all the request info. Once the class argument `part_ch` is specified, the chosen
+        request information will be selected from the list."""
+        return self.catalog.generate(self.dialect_ch, self.part_ch)
 
-    def generate_request_info(self, part_url: str) -> dict[str, str]:
-        """The generate_request_info method generates the request info based on the url.
+    def lookup(self, part_type: str) -> Union[dict[str, str], list[dict[str, str]]]:
+        """The lookup method finds the request info of `part_type`, or of the part `part_ch` if it is specified.
 
         Args:
-            url (str): the url from the `url_list`
+            part_type (str): the part type (i.e. grammar, vocab and story)
 
         Returns:
-            a dict: {
-                    "part_name": "詞彙與構詞",
-                    "part_url": "http://ilrdc.tw/grammar/index.php?l=2&p=3"
-                    }
+            a dict if a part is specified or the part type has a single part, a list otherwise
         """
-        part_id = re.search("""(?<=\&p\=)\d*""", part_url).group()
-        part_name = {
-            value: key for key, value in ILRDCPart.get_dict_info().items()
-        }.get(int(part_id))
-
-        return {
-            "part_name": part_name,
-            "part_url": part_url,
-        }
+        return self.catalog.lookup(self.dialect_ch, part_type, self.part_ch)
 
-    def find_particular_request(
-        self, request_info_list: list, part_name: str
-    ) -> dict[str, str]:
-        """The find_particular_request method finds the specifed information from `output` via `part_name`."""
-        for info in request_info_list:
-            if info["part_name"] == part_name:
-                return info
 
-    def generate(self) -> Union[dict[str, str], list[dict[str, str]]]:
-        """The generate method generates all the request info. Once the class argument `part_ch` is specified, the chosen
-        request information will be selected from the list."""
-        request_info_list = list(map(self.generate_request_info, self.url_list))
-        
-        if self.part_ch:
-            return self.find_particular_request(request_info_list, self.part_ch)
+# --------------------------------------------------------------------
+# deprecated interface
+
+
+@dataclass
+class URLCreator:
+    """
+    The URLCreator object converts the given dialect name to the urls of all its parts. It is deprecated: use
+    `URLDialector(dialect_ch).url_list` instead.
+    """
+
+    dialect_ch: str
+    dialect_id: int = field(init=False)
 
-        return request_info_list
+    def __post_init__(self) -> None:
+        warnings.warn(
+            "URLCreator is deprecated, use URLDialector(dialect_ch).url_list instead", DeprecationWarning, stacklevel=3
+        )
+        self.catalog = get_catalog()
+        self.dialect_id = self.catalog.dialects[self.dialect_ch]
+        self.list_of_part_ids = list(self.catalog.parts.values())
+
+    def combine_to_url(self, part_id: int) -> str:
+        """The combine_to_url method combines a part id with the dialect id to an url.
+
+        Args:
+            part_id (int): the part id
+
+        Returns:
+            a str: a url (e.g. http://ilrdc.tw/grammar/index.php?l=2&p=3)
+        """
+        return urljoin(self.catalog.base_url, f"index.php?l={self.dialect_id}&p={part_id}")
+
+    def create(self) -> list[str]:
+        """The create method creates a list of urls.
 
+        Returns:
+            a list
+        """
+        return list(map(self.combine_to_url, self.list_of_part_ids))
@@ -1,3 +1,11 @@
-from .url_downloader import download_url
+from .cache import ResponseCache, CacheEntry, CacheMiss
+from .record_cache import RecordCache
+from .metrics import Metrics
+from .scheduler import Scheduler, TokenBucket, RetryPolicy, AdaptiveLimiter
+from .session import HTTPSession, get_default_session
+from .url_downloader import download_url, adownload_url, create_client
 from .sound_url_modifier import modify_sound_url
-
+from .normalizer import normalize_sound_url, normalize_content, has_sound_url, NO_SOUND_URL
+from .writers import RecordWriter, JSONArrayWriter, JSONLinesWriter, CSVWriter
+from .arrow import records_to_table, write_parquet, read_parquet
+from .audio import AudioDownloader
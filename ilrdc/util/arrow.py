@@ -0,0 +1,85 @@
+from typing import Iterable
+
+
+COLUMNS = [
+    "dialect_ch",
+    "part_type",
+    "part",
+    "story_title",
+    "Id",
+    "dialect",
+    "vocab",
+    "chinese_translation",
+    "sound_url",
+    "alphabet",
+]
+
+DICTIONARY_COLUMNS = {"dialect_ch", "part_type", "part", "story_title", "Id", "alphabet"}
+
+PARTITIONING = ["dialect_ch", "part_type"]
+
+
+def records_to_table(records: Iterable[dict[str, str]]):
+    """The records_to_table function builds an Arrow table column by column from the flat records of
+       `ILRDC.iter_records`. The repeated columns are dictionary-encoded. `pyarrow` is an optional dependency, so it
+       is imported here.
+
+    Args:
+        records (Iterable): the flat records
+
+    Returns:
+        a pyarrow.Table object
+    """
+    import pyarrow as pa
+
+    columns = {name: [] for name in COLUMNS}
+    for record in records:
+        for name, values in columns.items():
+            values.append(record.get(name))
+
+    arrays = []
+    for name, values in columns.items():
+        array = pa.array(values, type=pa.string())
+        if name in DICTIONARY_COLUMNS:
+            array = array.dictionary_encode()
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=COLUMNS)
+
+
+def write_parquet(table, path: str, compression: str = "zstd") -> None:
+    """The write_parquet function writes the table to a Parquet dataset partitioned by dialect and part type
+       (e.g. `path/dialect_ch=泰雅語/part_type=grammar/part-0.parquet`, with the values percent-encoded in the
+       directory names, which `read_parquet` decodes).
+
+    Args:
+        table (pyarrow.Table): the table built by `records_to_table`
+        path (str): the directory of the dataset
+        compression (str): the compression codec
+    """
+    import pyarrow.dataset as ds
+
+    file_format = ds.ParquetFileFormat()
+    ds.write_dataset(
+        table,
+        path,
+        format=file_format,
+        file_options=file_format.make_write_options(compression=compression),
+        partitioning=PARTITIONING,
+        partitioning_flavor="hive",
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+    )
+
+
+def read_parquet(path: str):
+    """The read_parquet function reads the dataset written by `write_parquet` with memory mapping.
+
+    Args:
+        path (str): the directory of the dataset
+
+    Returns:
+        a pyarrow.Table object
+    """
+    import pyarrow.parquet as pq
+
+    return pq.read_table(path, memory_map=True, partitioning="hive")
@@ -0,0 +1,219 @@
+import os
+import re
+import json
+import time
+import hashlib
+from typing import Iterable, Optional
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .session import HTTPSession
+from .metrics import Metrics
+
+
+CHUNK_SIZE = 1 << 16
+
+
+# --------------------------------------------------------------------
+# helper functions
+
+
+def file_hash(path: str) -> str:
+    """The file_hash function hashes a file with sha256.
+
+    Args:
+        path (str): the file path
+
+    Returns:
+        a str
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def range_start(response) -> Optional[int]:
+    """The range_start function reads the first byte of a 206 response from its `Content-Range` header.
+
+    Args:
+        response (requests.Response): the response
+
+    Returns:
+        an int, or None if the header is missing or malformed
+    """
+    match = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def read_etag(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        return file.read() or None
+
+
+# --------------------------------------------------------------------
+# public interface
+
+
+@dataclass
+class AudioDownloader:
+    """
+    The AudioDownloader object downloads the sound files concurrently into a content-addressed store
+    (`dest/objects/ab/abcd....mp3`), so that the same sound file is kept only once. The manifest `dest/manifest.json`
+    maps every sound url to its file. A file already in the manifest with the same size (and sha256 if `verify` is
+    True) is skipped, and an interrupted download is resumed with a Range request. The resume is guarded by an
+    If-Range header carrying the strong ETag of the first response, kept next to the partial file; without a stored
+    ETag, or if the server answers with a 200 or a 206 which does not start at the end of the partial file, the file
+    is downloaded again from the start. The downloads go through the Scheduler of `session`, and are recorded as fetch
+    events in `metrics`, if given.
+    """
+
+    dest: str
+    session: Optional[HTTPSession] = None
+    concurrency: int = 10
+    verify: bool = False
+    metrics: Optional[Metrics] = None
+    manifest: dict[str, dict] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.session is None:
+            self.session = HTTPSession(pool_size=self.concurrency)
+        self.objects_dir = os.path.join(self.dest, "objects")
+        self.partial_dir = os.path.join(self.dest, "partial")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.partial_dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.dest, "manifest.json")
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as file:
+                self.manifest = json.load(file)
+
+    def save_manifest(self) -> None:
+        """The save_manifest method writes the manifest atomically."""
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.manifest, file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    def is_complete(self, url: str) -> bool:
+        """The is_complete method checks whether the sound file of `url` is already in the store."""
+        entry = self.manifest.get(url)
+        if entry is None:
+            return False
+        path = os.path.join(self.dest, entry["path"])
+        if not os.path.exists(path) or os.path.getsize(path) != entry["size"]:
+            return False
+        return not self.verify or file_hash(path) == entry["sha256"]
+
+    def fetch(self, url: str) -> dict:
+        """The fetch method downloads a sound file, resuming the partial file if there is one, and then moves it into
+           the store.
+
+        Args:
+            url (str): the sound url
+
+        Returns:
+            a dict: the manifest entry {"path": "objects/ab/abcd....mp3", "size": 1024, "sha256": "abcd..."}
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        partial_path = os.path.join(self.partial_dir, f"{key}.part")
+        etag_path = os.path.join(self.partial_dir, f"{key}.etag")
+        offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+        etag = read_etag(etag_path)
+        if offset and etag is None:
+            offset = 0
+
+        start = time.perf_counter()
+        result = self.stream_to(url, partial_path, etag_path, offset, etag)
+        if result is None:
+            # the server did not resume at the end of the partial file
+            result = self.stream_to(url, partial_path, etag_path, 0, None)
+        status, written = result
+        if self.metrics is not None:
+            self.metrics.record(
+                "fetch", time.perf_counter() - start, url=url, bytes=written, status=status, cache="none"
+            )
+        if os.path.exists(etag_path):
+            os.remove(etag_path)
+
+        digest = file_hash(partial_path)
+        extension = os.path.splitext(url)[1]
+        relative_path = os.path.join("objects", digest[:2], f"{digest}{extension}")
+        path = os.path.join(self.dest, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = os.path.getsize(partial_path)
+        if os.path.exists(path):
+            os.remove(partial_path)
+        else:
+            os.replace(partial_path, path)
+        return {"path": relative_path, "size": size, "sha256": digest}
+
+    def stream_to(
+        self, url: str, partial_path: str, etag_path: str, offset: int, etag: Optional[str]
+    ) -> Optional[tuple[int, int]]:
+        """The stream_to method writes the response of `url` to the partial file. If `offset` is not 0, the bytes
+           from `offset` are requested if the sound file still has the ETag `etag`, and are appended to the partial
+           file.
+
+        Args:
+            url (str): the sound url
+            partial_path (str): the partial file
+            etag_path (str): the file keeping the ETag of the partial file
+            offset (int): the size of the partial file to resume, or 0 to start over
+            etag (str): the stored ETag of the partial file
+
+        Returns:
+            a tuple: (the HTTP status, the bytes written), or None if a 206 response does not start at `offset`
+        """
+        headers = {"Range": f"bytes={offset}-", "If-Range": etag} if offset else None
+        written = 0
+        with self.session.stream(url, headers) as response:
+            status = response.status_code
+            if status == 416 and offset:
+                return status, written
+            response.raise_for_status()
+            if status == 206 and (not offset or range_start(response) != offset):
+                return None
+            new_etag = response.headers.get("ETag", "")
+            if status != 206:
+                # a weak ETag cannot be used in If-Range, so such a file cannot be resumed
+                with open(etag_path, "w", encoding="utf-8") as file:
+                    file.write("" if new_etag.startswith("W/") else new_etag)
+            with open(partial_path, "ab" if status == 206 else "wb") as file:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    file.write(chunk)
+                    written += len(chunk)
+        return status, written
+
+    def download(self, urls: Iterable[str]) -> dict:
+        """The download method downloads every unique sound url that is not in the store yet.
+
+        Args:
+            urls (Iterable): the sound urls; the placeholder "沒有音檔" is ignored
+
+        Returns:
+            a dict: {"downloaded": [urls], "skipped": [urls], "failed": {url: error}}
+        """
+        unique_urls = list(dict.fromkeys(url for url in urls if url.startswith("http")))
+        report = {"downloaded": [], "skipped": [], "failed": {}}
+        pending = []
+        for url in unique_urls:
+            if self.is_complete(url):
+                report["skipped"].append(url)
+            else:
+                pending.append(url)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+            futures = {executor.submit(self.fetch, url): url for url in pending}
+            try:
+                for future in as_completed(futures):
+                    url = futures[future]
+                    try:
+                        self.manifest[url] = future.result()
+                        report["downloaded"].append(url)
+                    except Exception as error:
+                        report["failed"][url] = repr(error)
+            finally:
+                self.save_manifest()
+        return report
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Optional
+from dataclasses import dataclass
+
+
+class CacheMiss(LookupError):
+    """
+    The CacheMiss exception is raised when an offline ResponseCache does not have the requested url.
+    """
+
+
+@dataclass
+class CacheEntry:
+    """
+    The CacheEntry object keeps track of a cached page, including its html and validators.
+    """
+
+    url: str
+    text: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: float = 0.0
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """The validators property sets the headers of a conditional request.
+
+        Returns:
+            a dict: {"If-None-Match": '"abc"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class ResponseCache:
+    """
+    The ResponseCache object stores the raw html of the pages on disk, keyed by their urls. An entry younger than
+    `max_age` seconds is served without asking ilrdc.tw; an older one is revalidated with ETag/Last-Modified.
+    Entries are evicted in least-recently-used order once the cache exceeds `max_size` bytes, or once they have not
+    been used for `max_idle` seconds. An `offline` cache never touches the network, so it can stand in for the site.
+    """
+
+    cache_dir: str
+    max_age: Optional[float] = None
+    max_size: Optional[int] = None
+    max_idle: Optional[float] = None
+    offline: bool = False
+
+    def __post_init__(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path(self, url: str, suffix: str) -> str:
+        """The path method makes the file path of the argument `url`.
+
+        Args:
+            url (str): the url
+            suffix (str): either ".html" or ".json"
+
+        Returns:
+            a str
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """The get method gets the cached page of the argument `url`, and marks it as recently used.
+
+        Args:
+            url (str): the url
+
+        Returns:
+            a CacheEntry object if the url is cached, None otherwise
+        """
+        try:
+            with open(self.path(url, ".json"), encoding="utf-8") as file:
+                meta = json.load(file)
+            with open(self.path(url, ".html"), encoding="utf-8") as file:
+                text = file.read()
+        except (OSError, ValueError):
+            return None
+        os.utime(self.path(url, ".html"))
+        return CacheEntry(text=text, **meta)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """The is_fresh method checks whether the argument `entry` can be served without revalidation."""
+        if self.max_age is None:
+            return False
+        return time.time() - entry.stored_at < self.max_age
+
+    def put(
+        self,
+        url: str,
+        text: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CacheEntry:
+        """The put method stores a page, and then evicts the old entries.
+
+        Args:
+            url (str): the url
+            text (str): the html
+            etag (str): the ETag header
+            last_modified (str): the Last-Modified header
+
+        Returns:
+            a CacheEntry object
+        """
+        entry = CacheEntry(url, text, etag, last_modified, time.time())
+        self._write(self.path(url, ".html"), text)
+        self._write_meta(entry)
+        self.evict()
+        return entry
+
+    def revalidate(self, entry: CacheEntry) -> None:
+        """The revalidate method restarts the freshness lifetime of `entry` after a 304 Not Modified response."""
+        entry.stored_at = time.time()
+        self._write_meta(entry)
+
+    def evict(self) -> None:
+        """The evict method removes the idle entries, and then the least recently used ones until the cache fits
+        in `self.max_size`."""
+        if self.max_size is None and self.max_idle is None:
+            return
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".html"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name[: -len(".html")]))
+        entries.sort()
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        for used_at, size, key in entries:
+            too_old = self.max_idle is not None and now - used_at > self.max_idle
+            too_big = self.max_size is not None and total > self.max_size
+            if not (too_old or too_big):
+                continue
+            for suffix in (".html", ".json"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, f"{key}{suffix}"))
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def _write_meta(self, entry: CacheEntry) -> None:
+        meta = {
+            "url": entry.url,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "stored_at": entry.stored_at,
+        }
+        self._write(self.path(entry.url, ".json"), json.dumps(meta))
+
+    def _write(self, path: str, content: str) -> None:
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(temp_path, path)
@@ -0,0 +1,149 @@
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Generator
+from dataclasses import dataclass, field
+
+PHASES = ("fetch", "parse", "validate", "write")
+
+# --------------------------------------------------------------------
+# helper functions
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """The percentile function picks the nearest-rank percentile of the sorted argument `values`."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# --------------------------------------------------------------------
+# public interface
+
+
+@dataclass
+class Metrics:
+    """
+    The Metrics object collects an event per page and phase:
+        fetch: the latency, bytes, HTTP status and cache ("hit", "miss", "revalidated" or "none") of a page
+        parse: the time to clean a page, including the validation, and its rows
+        validate: the time pydantic spends validating a page (only if `strict` is True)
+        write: the time to write a file, and its rows
+    Pass it as `metrics` to ILRDC, the downloaders, HTTPSession.fetch or the writers. Nothing is timed when no
+    Metrics object is given.
+    """
+
+    events: list[dict] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.lock = threading.Lock()
+
+    def record(self, phase: str, seconds: float, **labels) -> None:
+        """The record method records an event.
+
+        Args:
+            phase (str): the phase (i.e. fetch, parse, validate and write)
+            seconds (float): the duration
+            labels: the other values of the event, e.g. url, bytes, status, cache or rows
+        """
+        with self.lock:
+            self.events.append({"phase": phase, "seconds": seconds, **labels})
+
+    @contextmanager
+    def time(self, phase: str, **labels) -> Generator[dict, None, None]:
+        """The time method times the body of a with statement. The yielded dict can be updated with the labels known
+        only at the end, e.g. the rows."""
+        start = time.perf_counter()
+        yield labels
+        self.record(phase, time.perf_counter() - start, **labels)
+
+    def summary(self) -> dict[str, dict]:
+        """The summary method aggregates the events by phase.
+
+        Returns:
+            a dict: {
+                "fetch": {"count": 17, "seconds": 3.2, "mean": 0.19, "p50": 0.15, "p95": 0.6, "max": 0.9,
+                          "bytes": 512000, "rows": 0, "status": {200: 17}, "cache": {"miss": 17}},
+                ...
+            }
+        """
+        with self.lock:
+            events = list(self.events)
+        summary = {}
+        for phase in PHASES:
+            phase_events = [event for event in events if event["phase"] == phase]
+            if not phase_events:
+                continue
+            seconds = sorted(event["seconds"] for event in phase_events)
+            summary[phase] = {
+                "count": len(seconds),
+                "seconds": sum(seconds),
+                "mean": sum(seconds) / len(seconds),
+                "p50": percentile(seconds, 0.5),
+                "p95": percentile(seconds, 0.95),
+                "max": seconds[-1],
+                "bytes": sum(event.get("bytes", 0) for event in phase_events),
+                "rows": sum(event.get("rows", 0) for event in phase_events),
+                "status": dict(Counter(event["status"] for event in phase_events if "status" in event)),
+                "cache": dict(Counter(event["cache"] for event in phase_events if "cache" in event)),
+            }
+        return summary
+
+    def report(self) -> str:
+        """The report method formats `self.summary()` as a table.
+
+        Returns:
+            a str
+        """
+        lines = [f"{'phase':<10}{'count':>7}{'total s':>10}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}{'rows':>9}{'bytes':>12}"]
+        for phase, stats in self.summary().items():
+            lines.append(
+                f"{phase:<10}{stats['count']:>7}{stats['seconds']:>10.3f}{stats['mean'] * 1000:>10.1f}"
+                f"{stats['p95'] * 1000:>10.1f}{stats['max'] * 1000:>10.1f}{stats['rows']:>9}{stats['bytes']:>12}"
+            )
+            for key in ("status", "cache"):
+                if stats[key]:
+                    counts = ", ".join(f"{name}: {count}" for name, count in stats[key].items())
+                    lines.append(f"{'':<10}{key} {counts}")
+        return "\n".join(lines)
+
+    def to_openmetrics(self, prefix: str = "ilrdc") -> str:
+        """The to_openmetrics method exports `self.summary()` in the OpenMetrics text format, which Prometheus
+        scrapes.
+
+        Args:
+            prefix (str): the prefix of the metric names
+
+        Returns:
+            a str
+        """
+        summary = self.summary()
+        lines = []
+        for phase, stats in summary.items():
+            name = f"{prefix}_{phase}_seconds"
+            lines += [
+                f"# TYPE {name} summary",
+                f"# UNIT {name} seconds",
+                f'{name}{{quantile="0.5"}} {stats["p50"]}',
+                f'{name}{{quantile="0.95"}} {stats["p95"]}',
+                f"{name}_count {stats['count']}",
+                f"{name}_sum {stats['seconds']}",
+            ]
+        for unit, phases in (("rows", ("parse", "write")), ("bytes", ("fetch",))):
+            for phase in phases:
+                if phase in summary:
+                    name = f"{prefix}_{phase}_{unit}"
+                    lines += [f"# TYPE {name} counter", f"{name}_total {summary[phase][unit]}"]
+        if "fetch" in summary:
+            for key in ("status", "cache"):
+                name = f"{prefix}_fetch_{key}"
+                lines.append(f"# TYPE {name} counter")
+                for value, count in summary["fetch"][key].items():
+                    lines.append(f'{name}_total{{{key}="{escape_label(value)}"}} {count}')
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
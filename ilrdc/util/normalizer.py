@@ -0,0 +1,38 @@
+from typing import Optional
+from .sound_url_modifier import modify_sound_url
+
+NO_SOUND_URL = "沒有音檔"
+
+
+def normalize_sound_url(sound_url: Optional[str]) -> str:
+    """The normalize_sound_url function makes sure there is a sound url, and corrects its form.
+
+    Args:
+        sound_url (str): the sound url found in the html (e.g. `/sound/2/4-1-1.mp3`), or None
+
+    Returns:
+        a str: the full sound url, or "沒有音檔" if there is no sound url
+    """
+    if not sound_url:
+        return NO_SOUND_URL
+    return modify_sound_url(sound_url)
+
+
+def has_sound_url(sound_url: Optional[str]) -> bool:
+    """The has_sound_url function checks whether a cleaned record has a real sound url, not the placeholder."""
+    return bool(sound_url) and sound_url != NO_SOUND_URL
+
+
+def normalize_content(value: Optional[str], default: str = "not found") -> str:
+    """The normalize_content function makes sure there is a value.
+
+    Args:
+        value (str): the value, or None
+        default (str): the value returned if `value` is None
+
+    Returns:
+        a str
+    """
+    if value is None:
+        return default
+    return value
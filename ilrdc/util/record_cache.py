@@ -0,0 +1,84 @@
+import json
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+from dataclasses import dataclass
+
+
+@dataclass
+class RecordCache:
+    """
+    The RecordCache object stores the cleaned records of a page in SQLite, keyed by the hash of the page and the
+    parser version, so that an unchanged page is never parsed twice.
+    """
+
+    path: str
+
+    def __post_init__(self) -> None:
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+
+    def __enter__(self) -> "RecordCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """The close method closes the database."""
+        self.connection.close()
+
+    @staticmethod
+    def key(html: str, parser_version: str) -> str:
+        """The key method hashes the page with the parser version.
+
+        Args:
+            html (str): the html of the page
+            parser_version (str): the parser version, e.g. "GrammarCleaner/1"
+
+        Returns:
+            a str
+        """
+        digest = hashlib.sha256(parser_version.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(html.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, html: str, parser_version: str) -> Optional[list[dict]]:
+        """The get method gets the cleaned records of the page.
+
+        Args:
+            html (str): the html of the page
+            parser_version (str): the parser version
+
+        Returns:
+            a list if the page has been parsed before, None otherwise
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT data FROM records WHERE key = ?",
+                (self.key(html, parser_version),),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def put(self, html: str, parser_version: str, records: list[dict]) -> None:
+        """The put method stores the cleaned records of the page.
+
+        Args:
+            html (str): the html of the page
+            parser_version (str): the parser version
+            records (list): the cleaned records
+        """
+        data = json.dumps(records, ensure_ascii=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO records (key, data) VALUES (?, ?)",
+                (self.key(html, parser_version), data),
+            )
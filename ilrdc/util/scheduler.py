@@ -0,0 +1,279 @@
+import time
+import random
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Optional, Awaitable, TypeVar
+from dataclasses import dataclass, field
+
+if TYPE_CHECKING:
+    import asyncio
+
+T = TypeVar("T")
+Response = tuple[int, dict, T]
+
+# --------------------------------------------------------------------
+# helper functions
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """The parse_retry_after function parses the Retry-After header, which is either a number of seconds or an
+       HTTP date.
+
+    Args:
+        value (str): the header, e.g. "120" or "Wed, 21 Oct 2015 07:28:00 GMT"
+
+    Returns:
+        a float: the number of seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def wake(future: "asyncio.Future") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+# --------------------------------------------------------------------
+# public interface
+
+
+@dataclass
+class TokenBucket:
+    """
+    The TokenBucket object limits the request rate to `rate` requests per second, allowing bursts of up to `burst`
+    requests. Tokens are reserved rather than waited for, so the same bucket serves threads and coroutines.
+    """
+
+    rate: float
+    burst: int = 1
+
+    def __post_init__(self) -> None:
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """The reserve method takes a token, borrowing it from the future if the bucket is empty.
+
+        Returns:
+            a float: the number of seconds to wait before sending the request
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+@dataclass
+class RetryPolicy:
+    """
+    The RetryPolicy object decides which responses are retried and how long to wait in between: exponential backoff
+    with full jitter, or the Retry-After header when the server sends one.
+    """
+
+    retries: int = 4
+    backoff: float = 0.5
+    max_backoff: float = 30
+    max_retry_after: float = 300
+    statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+    def retryable(self, status: int) -> bool:
+        return status in self.statuses
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """The delay method computes the wait before the next attempt.
+
+        Args:
+            attempt (int): the number of the failed attempt, starting from 0
+            retry_after (str): the Retry-After header of the response
+
+        Returns:
+            a float: the number of seconds
+        """
+        seconds = parse_retry_after(retry_after)
+        if seconds is not None:
+            return min(seconds, self.max_retry_after)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+@dataclass
+class AdaptiveLimiter:
+    """
+    The AdaptiveLimiter object caps the number of requests in flight with additive-increase/multiplicative-decrease:
+    the limit grows by one per window of successful requests and is cut by `decrease` on errors, or when the recent
+    latency exceeds `tolerance` times the long-run latency. Both are moving averages, so pages of different sizes do
+    not look like congestion. It can be shared by threads and coroutines.
+    """
+
+    initial: float = 10
+    min_limit: int = 1
+    max_limit: int = 64
+    tolerance: float = 3.0
+    decrease: float = 0.5
+
+    def __post_init__(self) -> None:
+        self.limit = float(self.initial)
+        self.inflight = 0
+        self.baseline: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.decreased_at = 0.0
+        self.condition = threading.Condition()
+        self.waiters: deque = deque()
+
+    def available(self) -> bool:
+        return self.inflight < max(self.min_limit, int(self.limit))
+
+    def acquire(self) -> None:
+        """The acquire method blocks the thread until a request may be sent."""
+        with self.condition:
+            while not self.available():
+                self.condition.wait()
+            self.inflight += 1
+
+    async def aacquire(self) -> None:
+        """The aacquire coroutine is the async version of `acquire`."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.condition:
+                if self.available():
+                    self.inflight += 1
+                    return
+                future = loop.create_future()
+                self.waiters.append((loop, future))
+            await future
+
+    def release(self, latency: float, ok: bool) -> None:
+        """The release method records the outcome of a request and adjusts the limit.
+
+        Args:
+            latency (float): the number of seconds the request took
+            ok (bool): whether the server handled the request
+        """
+        with self.condition:
+            self.inflight -= 1
+            self.baseline = latency if self.baseline is None else 0.95 * self.baseline + 0.05 * latency
+            self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+            congested = not ok or self.latency > self.tolerance * self.baseline
+            now = time.monotonic()
+            if not congested:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            elif now - self.decreased_at > self.latency:
+                # one cut per round trip, so a burst of failures does not collapse the limit
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                self.decreased_at = now
+            self.notify()
+
+    def seed(self, limit: int) -> None:
+        """The seed method raises the limit to `limit` (at most `max_limit`), e.g. to the concurrency a caller asks
+        for. A limit already cut for congestion is kept.
+
+        Args:
+            limit (int): the number of requests in flight to allow
+        """
+        with self.condition:
+            if not self.decreased_at and limit > self.limit:
+                self.limit = float(min(limit, self.max_limit))
+                self.notify()
+
+    def notify(self) -> None:
+        """The notify method wakes the waiting threads and coroutines; `self.condition` must be held."""
+        self.condition.notify_all()
+        while self.waiters:
+            loop, future = self.waiters.popleft()
+            loop.call_soon_threadsafe(wake, future)
+
+
+@dataclass
+class Scheduler:
+    """
+    The Scheduler object sends every request of a HTTPSession: it waits for the rate limit and a free slot of the
+    adaptive limiter, and retries connection errors, timeouts and the statuses of `retry`. A Retry-After header
+    pauses all the requests, not only the one that received it.
+    """
+
+    rate: Optional[float] = None
+    burst: int = 1
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    limiter: AdaptiveLimiter = field(default_factory=AdaptiveLimiter)
+
+    def __post_init__(self) -> None:
+        self.bucket = TokenBucket(self.rate, self.burst) if self.rate else None
+        self.paused_until = 0.0
+
+    def wait(self) -> float:
+        delay = self.paused_until - time.monotonic()
+        if self.bucket is not None:
+            delay = max(delay, 0.0) + self.bucket.reserve()
+        return max(delay, 0.0)
+
+    def backoff(self, attempt: int, headers: Optional[dict] = None) -> float:
+        retry_after = headers.get("Retry-After") if headers is not None else None
+        delay = self.retry.delay(attempt, retry_after)
+        if retry_after is not None:
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        return delay
+
+    def call(self, send: Callable[[], Response], exceptions: tuple = ()) -> Response:
+        """The call method sends a request with the rate limit, the adaptive limiter and the retries.
+
+        Args:
+            send (Callable): the function sending the request, returning (status, headers, response)
+            exceptions (tuple): the exceptions to retry, e.g. connection errors and timeouts
+
+        Returns:
+            a tuple: the return value of the last attempt
+        """
+        for attempt in range(self.retry.retries + 1):
+            time.sleep(self.wait())
+            self.limiter.acquire()
+            start, ok = time.monotonic(), False
+            try:
+                status, headers, response = send()
+                ok = not self.retry.retryable(status)
+            except exceptions:
+                if attempt == self.retry.retries:
+                    raise
+                headers = None
+            finally:
+                # every failure, including the exceptions which are not retried, frees the slot
+                self.limiter.release(time.monotonic() - start, ok=ok)
+            if ok or attempt == self.retry.retries:
+                return status, headers, response
+            time.sleep(self.backoff(attempt, headers))
+
+    async def acall(self, send: Callable[[], Awaitable[Response]], exceptions: tuple = ()) -> Response:
+        """The acall coroutine is the async version of `call`."""
+        import asyncio
+
+        for attempt in range(self.retry.retries + 1):
+            await asyncio.sleep(self.wait())
+            await self.limiter.aacquire()
+            start, ok = time.monotonic(), False
+            try:
+                status, headers, response = await send()
+                ok = not self.retry.retryable(status)
+            except exceptions:
+                if attempt == self.retry.retries:
+                    raise
+                headers = None
+            finally:
+                # the cancellation of the task frees the slot too
+                self.limiter.release(time.monotonic() - start, ok=ok)
+            if ok or attempt == self.retry.retries:
+                return status, headers, response
+            await asyncio.sleep(self.backoff(attempt, headers))
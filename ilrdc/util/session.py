@@ -0,0 +1,294 @@
+import time
+from typing import TYPE_CHECKING, Optional
+from functools import lru_cache
+from dataclasses import dataclass, field
+from .cache import ResponseCache, CacheMiss
+from .scheduler import Scheduler, AdaptiveLimiter
+from .metrics import Metrics
+
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
+
+
+@lru_cache(maxsize=None)
+def get_user_agent() -> str:
+    """The get_user_agent function resolves the User-Agent once per process, since loading the browser database of
+       `fake_useragent` costs more than many of the pages do.
+
+    Returns:
+        a str
+    """
+    from fake_useragent import UserAgent
+
+    return UserAgent().google
+
+
+@dataclass
+class HTTPSession:
+    """
+    The HTTPSession object keeps a pool of keep-alive connections to ilrdc.tw, which is shared by all the downloaders.
+    If a `cache` is given, the pages are served from disk and revalidated with conditional requests. Every request
+    goes through `scheduler`, which rate-limits, retries and adapts the concurrency to the server. requests is
+    imported when the session is created, and bs4 and aiohttp when they are first needed.
+    """
+
+    pool_size: int = 10
+    timeout: Optional[float] = 30
+    headers: dict[str, str] = field(default_factory=dict)
+    cache: Optional[ResponseCache] = None
+    scheduler: Optional[Scheduler] = None
+
+    def __post_init__(self) -> None:
+        if self.scheduler is None:
+            self.scheduler = Scheduler(limiter=AdaptiveLimiter(initial=self.pool_size))
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"user-agent": get_user_agent(), **self.headers})
+
+    def __enter__(self) -> "HTTPSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """The close method closes all the pooled connections."""
+        self.session.close()
+
+    def cached(self, url: str):
+        """The cached method looks up the argument `url` in `self.cache`.
+
+        Args:
+            url (str): the url
+
+        Returns:
+            a tuple: (the html if it can be served without a request, the cached entry)
+        """
+        if self.cache is None:
+            return None, None
+        entry = self.cache.get(url)
+        if entry is not None and (self.cache.offline or self.cache.is_fresh(entry)):
+            return entry.text, entry
+        if self.cache.offline:
+            raise CacheMiss(url)
+        return None, entry
+
+    def store(self, url: str, status: int, text: str, headers, entry) -> str:
+        """The store method stores the response in `self.cache`, or reuses the cached entry on 304 Not Modified.
+
+        Args:
+            url (str): the url
+            status (int): the status code of the response
+            text (str): the body of the response
+            headers (Mapping): the headers of the response
+            entry (CacheEntry): the cached entry returned by `self.cached`
+
+        Returns:
+            a str: the html
+        """
+        if self.cache is None:
+            return text
+        if status == 304 and entry is not None:
+            self.cache.revalidate(entry)
+            return entry.text
+        if 200 <= status < 300:
+            self.cache.put(url, text, headers.get("ETag"), headers.get("Last-Modified"))
+        return text
+
+    def get(self, url: str, headers: Optional[dict[str, str]] = None, **kwargs) -> "requests.Response":
+        """The get method sends a GET request through `self.scheduler`. Once the retries are used up, a response
+        whose status is still retryable raises requests.HTTPError.
+
+        Args:
+            url (str): the url
+            headers (dict): the extra headers
+
+        Returns:
+            a requests.Response object
+        """
+
+        import requests
+
+        def send():
+            response = self.session.get(url, headers=headers, timeout=self.timeout, **kwargs)
+            if kwargs.get("stream") and self.scheduler.retry.retryable(response.status_code):
+                response.content  # read the error page so the connection goes back to the pool
+            return response.status_code, response.headers, response
+
+        status, _, response = self.scheduler.call(
+            send, (requests.ConnectionError, requests.Timeout)
+        )
+        if self.scheduler.retry.retryable(status):
+            response.raise_for_status()
+        return response
+
+    def is_page(self, status: int, entry) -> bool:
+        """The is_page method checks whether a response carries the page: a 2xx status, or 304 Not Modified with a
+        cached entry to reuse. Any other status, e.g. the error page of a 404 or 403, must not be cleaned as data."""
+        return 200 <= status < 300 or (status == 304 and entry is not None)
+
+    def cache_state(self, status: int) -> str:
+        """The cache_state method names how `self.cache` served a response: "none", "miss" or "revalidated"."""
+        if self.cache is None:
+            return "none"
+        return "revalidated" if status == 304 else "miss"
+
+    def fetch(self, url: str, metrics: Optional[Metrics] = None) -> str:
+        """The fetch method fetches the html of the url over the pooled connections. A response which is not the page
+           (see `is_page`) raises requests.HTTPError.
+
+        Args:
+            url (str): the url
+            metrics (Metrics): the collector of the fetch latency, bytes, status and cache state (optional)
+
+        Returns:
+            a str
+        """
+        start = time.perf_counter()
+        text, entry = self.cached(url)
+        if text is not None:
+            if metrics is not None:
+                metrics.record("fetch", time.perf_counter() - start, url=url, bytes=0, status=200, cache="hit")
+            return text
+        validators = entry.validators if entry is not None else {}
+        req = self.get(url, validators)
+        if metrics is not None:
+            metrics.record(
+                "fetch",
+                time.perf_counter() - start,
+                url=url,
+                bytes=len(req.content),
+                status=req.status_code,
+                cache=self.cache_state(req.status_code),
+            )
+        if not self.is_page(req.status_code, entry):
+            import requests
+
+            raise requests.HTTPError(f"{req.status_code} {req.reason} for url: {url}", response=req)
+        return self.store(url, req.status_code, req.text, req.headers, entry)
+
+    def fetch_if_changed(self, url: str, validators: dict[str, str]) -> tuple[int, str, dict]:
+        """The fetch_if_changed method sends a conditional request, bypassing `self.cache`.
+
+        Args:
+            url (str): the url
+            validators (dict): the conditional headers, e.g. {"If-None-Match": '"abc"'}
+
+        Returns:
+            a tuple: (the status code, the html or an empty str on 304 Not Modified, the headers)
+        """
+        req = self.get(url, validators)
+        return req.status_code, req.text, dict(req.headers)
+
+    def stream(self, url: str, headers: Optional[dict[str, str]] = None) -> "requests.Response":
+        """The stream method sends a request whose body is read in chunks, bypassing `self.cache`. It is used to
+        download the sound files.
+
+        Args:
+            url (str): the url
+            headers (dict): the extra headers, e.g. {"Range": "bytes=1024-"}
+
+        Returns:
+            a requests.Response object, to be used as a context manager
+        """
+        return self.get(url, headers, stream=True)
+
+    async def afetch(self, url: str, client, metrics: Optional[Metrics] = None) -> str:
+        """The afetch coroutine is the async version of `fetch`. A response which is not the page raises
+           aiohttp.ClientResponseError.
+
+        Args:
+            url (str): the url
+            client (aiohttp.ClientSession): the client created by `self.create_client`
+            metrics (Metrics): the collector of the fetch latency, bytes, status and cache state (optional)
+
+        Returns:
+            a str
+        """
+        start = time.perf_counter()
+        text, entry = self.cached(url)
+        if text is not None:
+            if metrics is not None:
+                metrics.record("fetch", time.perf_counter() - start, url=url, bytes=0, status=200, cache="hit")
+            return text
+        import asyncio
+        import aiohttp
+
+        validators = entry.validators if entry is not None else {}
+
+        async def send():
+            async with client.get(url, headers=validators) as response:
+                return response.status, response.headers, (response, await response.text())
+
+        status, headers, (response, text) = await self.scheduler.acall(
+            send, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+        )
+        if self.scheduler.retry.retryable(status):
+            response.raise_for_status()
+        if metrics is not None:
+            metrics.record(
+                "fetch",
+                time.perf_counter() - start,
+                url=url,
+                bytes=len(text.encode("utf-8")),
+                status=status,
+                cache=self.cache_state(status),
+            )
+        if not self.is_page(status, entry):
+            raise aiohttp.ClientResponseError(
+                response.request_info, response.history, status=status, message=response.reason, headers=headers
+            )
+        return self.store(url, status, text, headers, entry)
+
+    def download(self, url: str) -> "BeautifulSoup":
+        """The download method downloads the url.
+
+        Args:
+            url (str): the url
+
+        Returns:
+            a BeautifulSoup object
+        """
+        from bs4 import BeautifulSoup
+
+        return BeautifulSoup(self.fetch(url), "lxml")
+
+    def create_client(self, concurrency: Optional[int] = None):
+        """The create_client method creates an async HTTP client with the same headers and timeout. `aiohttp` is only
+           needed by the async interface, so it is imported here.
+
+        Args:
+            concurrency (int): the maximum number of simultaneous connections per host, `self.pool_size` by default
+
+        Returns:
+            an aiohttp.ClientSession object
+        """
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit_per_host=concurrency or self.pool_size)
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=dict(self.session.headers),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+
+_default_session: Optional[HTTPSession] = None
+
+
+def get_default_session() -> HTTPSession:
+    """The get_default_session function returns the process-wide session used when no session is given.
+
+    Returns:
+        a HTTPSession object
+    """
+    global _default_session
+    if _default_session is None:
+        _default_session = HTTPSession()
+    return _default_session
@@ -1,17 +1,48 @@
-import requests
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
+from typing import TYPE_CHECKING, Optional
+from .session import HTTPSession, get_default_session
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
-def download_url(url: str) -> BeautifulSoup:
+
+def download_url(url: str, session: Optional[HTTPSession] = None) -> "BeautifulSoup":
     """The download_url function downloads the url.
 
     Args:
         url (str): the url
+        session (HTTPSession): the shared session; the process-wide session is used if not given
+
+    Returns:
+        a BeautifulSoup object
+    """
+    return (session or get_default_session()).download(url)
+
+
+def create_client(concurrency: Optional[int] = None, session: Optional[HTTPSession] = None):
+    """The create_client function creates an async HTTP client shared by all the downloaders.
+
+    Args:
+        concurrency (int): the maximum number of simultaneous connections per host, the pool size of the session by default
+        session (HTTPSession): the session whose headers and timeout are used
+
+    Returns:
+        an aiohttp.ClientSession object
+    """
+    return (session or get_default_session()).create_client(concurrency)
+
+
+async def adownload_url(url: str, client, session: Optional[HTTPSession] = None) -> "BeautifulSoup":
+    """The adownload_url coroutine downloads the url with the async client.
+
+    Args:
+        url (str): the url
+        client (aiohttp.ClientSession): the client created by `create_client`
+        session (HTTPSession): the shared session; the process-wide session is used if not given
 
     Returns:
         a BeautifulSoup object
     """
-    req = requests.get(url, headers={"user-agent": UserAgent().google})
-    soup = BeautifulSoup(req.text, "lxml")
-    return soup
+    from bs4 import BeautifulSoup
+
+    text = await (session or get_default_session()).afetch(url, client)
+    return BeautifulSoup(text, "lxml")
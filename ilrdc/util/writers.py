@@ -0,0 +1,163 @@
+import os
+import csv
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from typing import IO, Iterable, Optional
+from dataclasses import dataclass, field
+from .metrics import Metrics
+
+
+@dataclass
+class RecordWriter(ABC):
+    """
+    The RecordWriter object streams the records to `path` in a single pass through a buffer of `buffering` bytes.
+    The records are written to a temporary file, which replaces `path` only when the writer is closed without error.
+    If `metrics` is given, the time from opening to closing the file and the rows are recorded as a write event.
+    """
+
+    path: str
+    buffering: int = 1 << 16
+    encoding: str = "utf-8"
+    metrics: Optional[Metrics] = field(default=None, repr=False)
+    file: Optional[IO[str]] = field(init=False, default=None, repr=False)
+
+    def __enter__(self) -> "RecordWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        self.close(commit=exc_type is None)
+
+    def open(self) -> None:
+        """The open method opens the temporary file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self.temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self.rows = 0
+        self.started_at = time.perf_counter()
+        self.file = open(
+            self.temp_path,
+            "w",
+            encoding=self.encoding,
+            buffering=self.buffering,
+            newline="",
+        )
+        self.start()
+
+    def close(self, commit: bool = True) -> None:
+        """The close method finishes the file, and then moves it to `self.path`; if `commit` is False, the temporary
+        file is removed instead."""
+        if self.file is None:
+            return
+        try:
+            if commit:
+                self.finish()
+            self.file.close()
+            if commit:
+                os.replace(self.temp_path, self.path)
+                if self.metrics is not None:
+                    self.metrics.record(
+                        "write",
+                        time.perf_counter() - self.started_at,
+                        path=self.path,
+                        rows=self.rows,
+                        format=type(self).__name__,
+                    )
+        finally:
+            self.file = None
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+
+    def write_all(self, records: Iterable[dict]) -> int:
+        """The write_all method writes all the records.
+
+        Args:
+            records (Iterable): the records
+
+        Returns:
+            an int: the number of records written
+        """
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def write(self, record: dict) -> None:
+        """The write method writes a record, and counts it in `self.rows`."""
+        self.write_record(record)
+        self.rows += 1
+
+    def start(self) -> None:
+        """The start method writes what comes before the first record."""
+        pass
+
+    def finish(self) -> None:
+        """The finish method writes what comes after the last record."""
+        pass
+
+    @abstractmethod
+    def write_record(self, record: dict) -> None:
+        """The write_record method writes a record in the format of the writer."""
+        pass
+
+
+@dataclass
+class JSONArrayWriter(RecordWriter):
+    """
+    The JSONArrayWriter object writes the records as a JSON array, the same as `json.dump(records, file)`.
+    """
+
+    def start(self) -> None:
+        self.file.write("[")
+
+    def write_record(self, record: dict) -> None:
+        if self.rows:
+            self.file.write(", ")
+        self.file.write(json.dumps(record, ensure_ascii=False))
+
+    def finish(self) -> None:
+        self.file.write("]")
+
+
+@dataclass
+class JSONLinesWriter(RecordWriter):
+    """
+    The JSONLinesWriter object writes a record per line (JSON Lines).
+    """
+
+    def write_record(self, record: dict) -> None:
+        self.file.write(json.dumps(record, ensure_ascii=False))
+        self.file.write("\n")
+
+
+@dataclass
+class CSVWriter(RecordWriter):
+    """
+    The CSVWriter object writes the records as CSV. If `columns` is not given, the keys of the first record are used.
+    The file starts with a BOM by default, so that Excel detects UTF-8.
+    """
+
+    encoding: str = "utf_8_sig"
+    columns: Optional[list[str]] = None
+
+    def start(self) -> None:
+        self.writer = None
+
+    def write_record(self, record: dict) -> None:
+        if self.writer is None:
+            self.writer = csv.DictWriter(
+                self.file,
+                fieldnames=self.columns or list(record),
+                extrasaction="ignore",
+                lineterminator="\n",
+            )
+            self.writer.writeheader()
+        self.writer.writerow(record)
+
+    def finish(self) -> None:
+        if self.writer is None and self.columns:
+            self.start()
+            csv.writer(self.file, lineterminator="\n").writerow(self.columns)
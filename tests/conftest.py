@@ -0,0 +1,28 @@
+"""
+The fixtures of the tests. `site` serves a local stand-in of ilrdc.tw built from the pages in `benchmarks/fixtures/`
+and points BASE_URL at it, so the tests run offline.
+"""
+import pytest
+
+from ilrdc import urldialector
+from tests.pages import Site, serve_site
+
+# --------------------------------------------------------------------
+# fixtures
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """The site fixture serves a Site on a local port and points BASE_URL at it."""
+    with serve_site(Site()) as site:
+        monkeypatch.setattr(urldialector, "BASE_URL", site.base_url)
+        yield site
+
+
+@pytest.fixture
+def session():
+    """The session fixture is a HTTPSession which retries quickly."""
+    from ilrdc.util import HTTPSession, RetryPolicy, Scheduler
+
+    with HTTPSession(scheduler=Scheduler(retry=RetryPolicy(retries=1, backoff=0.01))) as session:
+        yield session
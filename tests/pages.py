@@ -0,0 +1,131 @@
+"""
+The pages shared by the tests and the benchmarks. The pages in `benchmarks/fixtures/` are hand-built copies of the
+structure of the ilrdc.tw pages (a grammar part, 基本詞彙 and 長篇語料), and `serve_site` serves them as a local
+stand-in of ilrdc.tw, so both suites run offline.
+"""
+import re
+import hashlib
+import threading
+from pathlib import Path
+from functools import lru_cache
+from contextlib import contextmanager
+from typing import Generator, Optional
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ilrdc.base import get_backend
+
+FIXTURES = Path(__file__).parent.parent / "benchmarks" / "fixtures"
+PAGES = {18: "vocab.html", 19: "story.html"}
+
+# --------------------------------------------------------------------
+# helper functions
+
+
+@lru_cache(maxsize=None)
+def read_fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@lru_cache(maxsize=None)
+def scale_fixture(name: str, rows: int) -> str:
+    """The scale_fixture function repeats the table rows of a fixture page until the page has `rows` rows."""
+    html = read_fixture(name)
+    lines = html.splitlines()
+    tr_lines = [line for line in lines if line.startswith("<tr")]
+    start, end = lines.index(tr_lines[0]), lines.index(tr_lines[-1]) + 1
+    body = [tr_lines[num % len(tr_lines)] for num in range(rows)]
+    return "\n".join(lines[:start] + body + lines[end:])
+
+
+def etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def parse_records(cleaner: type, html: str, parser: str = "lxml") -> list[dict[str, str]]:
+    backend = get_backend(parser)
+    return list(cleaner(backend.parse(html), backend).extract_data())
+
+
+# --------------------------------------------------------------------
+# the stand-in of ilrdc.tw
+
+
+@dataclass
+class Site:
+    """
+    The Site object is the content of the stand-in: the html of a part id (a grammar page by default), the sound
+    files, the statuses to answer instead, and a log of the requests unless `log` is False (e.g. in a benchmark).
+    The status of part id -1 breaks the Range requests of the sound files: 200 ignores them, and 206 answers them from
+    the first byte.
+    """
+
+    pages: dict[int, str] = field(default_factory=dict)
+    sounds: dict[str, bytes] = field(default_factory=dict)
+    statuses: dict[int, int] = field(default_factory=dict)
+    requests: list[tuple[str, dict]] = field(default_factory=list)
+    base_url: str = ""
+    log: bool = True
+
+    def page(self, part_id: int) -> str:
+        return self.pages.get(part_id) or read_fixture(PAGES.get(part_id, "grammar.html"))
+
+    def count(self, pattern: str) -> int:
+        return sum(1 for path, _ in self.requests if re.search(pattern, path))
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    site: Site
+
+    def do_GET(self) -> None:
+        if self.site.log:
+            self.site.requests.append((self.path, dict(self.headers)))
+        if "/sound/" in self.path:
+            return self.send_sound(self.site.sounds.get(self.path.split("/sound/", 1)[1]))
+        match = re.search(r"p=(\d+)", self.path)
+        part_id = int(match.group(1)) if match else 0
+        if part_id in self.site.statuses:
+            return self.send_body(self.site.statuses[part_id], b"")
+        body = self.site.page(part_id).encode("utf-8")
+        tag = etag(body)
+        if self.headers.get("If-None-Match") == tag:
+            return self.send_body(304, b"", {"ETag": tag})
+        self.send_body(200, body, {"ETag": tag, "Content-Type": "text/html; charset=utf-8"})
+
+    def send_sound(self, data: Optional[bytes]) -> None:
+        if data is None:
+            return self.send_body(404, b"")
+        tag = etag(data)
+        match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if_range = self.headers.get("If-Range")
+        if match is None or self.site.statuses.get(-1) == 200 or (if_range is not None and if_range != tag):
+            return self.send_body(200, data, {"ETag": tag})
+        start = 0 if self.site.statuses.get(-1) == 206 else int(match.group(1))
+        if start >= len(data):
+            return self.send_body(416, b"", {"Content-Range": f"bytes */{len(data)}"})
+        self.send_body(206, data[start:], {"ETag": tag, "Content-Range": f"bytes {start}-{len(data) - 1}/{len(data)}"})
+
+    def send_body(self, status: int, body: bytes, headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@contextmanager
+def serve_site(site: Site) -> Generator[Site, None, None]:
+    """The serve_site function serves `site` on a local port while the context is open, and sets its base url."""
+    handler = type("Handler", (SiteHandler,), {"site": site})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    site.base_url = f"http://127.0.0.1:{server.server_port}/grammar/"
+    try:
+        yield site
+    finally:
+        server.shutdown()
+        server.server_close()
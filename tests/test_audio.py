@@ -0,0 +1,146 @@
+import os
+import hashlib
+from ilrdc import ILRDC
+from ilrdc import ilrdc as ilrdc_module
+from ilrdc.util import AudioDownloader, HTTPSession, Metrics, Scheduler
+from tests.pages import etag
+
+SOUND = bytes(range(256)) * 64
+
+
+def partial_path(downloader: AudioDownloader, url: str) -> str:
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(downloader.partial_dir, f"{key}.part")
+
+
+def etag_path(downloader: AudioDownloader, url: str) -> str:
+    return partial_path(downloader, url)[: -len(".part")] + ".etag"
+
+
+def interrupt(downloader: AudioDownloader, url: str, data: bytes, tag: str = etag(SOUND)) -> None:
+    """The interrupt function leaves a partial file, and the ETag of its first response unless `tag` is None."""
+    with open(partial_path(downloader, url), "wb") as file:
+        file.write(data)
+    if tag is not None:
+        with open(etag_path(downloader, url), "w", encoding="utf-8") as file:
+            file.write(tag)
+
+
+def stored(downloader: AudioDownloader, url: str) -> bytes:
+    with open(os.path.join(downloader.dest, downloader.manifest[url]["path"]), "rb") as file:
+        return file.read()
+
+
+def test_download_and_skip(site, session, tmp_path):
+    site.sounds["2/4-1-1.mp3"] = SOUND
+    url = f"{site.base_url}sound/2/4-1-1.mp3"
+    metrics = Metrics()
+    downloader = AudioDownloader(str(tmp_path), session, metrics=metrics)
+    assert downloader.download([url, url, "沒有音檔"]) == {"downloaded": [url], "skipped": [], "failed": {}}
+    assert stored(downloader, url) == SOUND
+    assert metrics.summary()["fetch"]["bytes"] == len(SOUND)
+    assert AudioDownloader(str(tmp_path), session).download([url])["skipped"] == [url]
+
+
+def test_resume_appends_a_206_response(site, session, tmp_path):
+    site.sounds["2/a.mp3"] = SOUND
+    url = f"{site.base_url}sound/2/a.mp3"
+    downloader = AudioDownloader(str(tmp_path), session)
+    interrupt(downloader, url, SOUND[:1000])
+    downloader.manifest[url] = downloader.fetch(url)
+    headers = site.requests[-1][1]
+    assert (headers["Range"], headers["If-Range"]) == ("bytes=1000-", etag(SOUND))
+    assert stored(downloader, url) == SOUND
+    assert os.listdir(downloader.partial_dir) == []
+
+
+def test_first_response_keeps_its_etag(site, session, tmp_path):
+    site.sounds["2/a.mp3"] = SOUND
+    url = f"{site.base_url}sound/2/a.mp3"
+    downloader = AudioDownloader(str(tmp_path), session)
+    # the body is written, but the file is not moved into the store yet, as after an interrupted download
+    result = downloader.stream_to(url, partial_path(downloader, url), etag_path(downloader, url), 0, None)
+    assert result == (200, len(SOUND))
+    with open(etag_path(downloader, url), encoding="utf-8") as file:
+        assert file.read() == etag(SOUND)
+
+
+def test_resume_restarts_on_a_200_response(site, session, tmp_path):
+    site.sounds["2/a.mp3"] = SOUND
+    site.statuses[-1] = 200
+    url = f"{site.base_url}sound/2/a.mp3"
+    downloader = AudioDownloader(str(tmp_path), session)
+    interrupt(downloader, url, b"stale bytes")
+    downloader.manifest[url] = downloader.fetch(url)
+    assert stored(downloader, url) == SOUND
+
+
+def test_resume_restarts_if_the_sound_file_changed(site, session, tmp_path):
+    site.sounds["2/a.mp3"] = SOUND
+    url = f"{site.base_url}sound/2/a.mp3"
+    downloader = AudioDownloader(str(tmp_path), session)
+    interrupt(downloader, url, b"old version of the file", etag(b"old version"))
+    downloader.manifest[url] = downloader.fetch(url)
+    assert len(site.requests) == 1 and site.requests[0][1]["If-Range"] == etag(b"old version")
+    assert stored(downloader, url) == SOUND
+
+
+def test_resume_restarts_without_a_stored_etag(site, session, tmp_path):
+    site.sounds["2/a.mp3"] = SOUND
+    url = f"{site.base_url}sound/2/a.mp3"
+    downloader = AudioDownloader(str(tmp_path), session)
+    interrupt(downloader, url, b"stale bytes", None)
+    downloader.manifest[url] = downloader.fetch(url)
+    assert "Range" not in site.requests[0][1]
+    assert stored(downloader, url) == SOUND
+
+
+def test_resume_restarts_if_the_range_does_not_start_at_the_offset(site, session, tmp_path):
+    site.sounds["2/a.mp3"] = SOUND
+    site.statuses[-1] = 206
+    url = f"{site.base_url}sound/2/a.mp3"
+    metrics = Metrics()
+    downloader = AudioDownloader(str(tmp_path), session, metrics=metrics)
+    interrupt(downloader, url, SOUND[:1000])
+    downloader.manifest[url] = downloader.fetch(url)
+    assert [headers.get("Range") for _, headers in site.requests] == ["bytes=1000-", None]
+    assert stored(downloader, url) == SOUND
+    assert [event["bytes"] for event in metrics.events] == [len(SOUND)]
+
+
+def test_resume_keeps_a_complete_file_on_416(site, session, tmp_path):
+    site.sounds["2/a.mp3"] = SOUND
+    url = f"{site.base_url}sound/2/a.mp3"
+    downloader = AudioDownloader(str(tmp_path), session)
+    interrupt(downloader, url, SOUND)
+    downloader.manifest[url] = downloader.fetch(url)
+    assert stored(downloader, url) == SOUND
+    assert os.listdir(downloader.partial_dir) == []
+
+
+def test_download_audio_keeps_the_scheduler_of_the_session(monkeypatch):
+    captured = {}
+
+    class Downloader:
+        def __init__(self, dest, session, concurrency, metrics=None):
+            captured.update(session=session, concurrency=concurrency, metrics=metrics)
+
+        def download(self, urls):
+            return {}
+
+    monkeypatch.setattr(ilrdc_module, "AudioDownloader", Downloader)
+    scheduler, metrics = Scheduler(rate=5), Metrics()
+    session = HTTPSession(pool_size=2, scheduler=scheduler)
+    closed = []
+    monkeypatch.setattr(HTTPSession, "close", lambda self: closed.append(self))
+    ILRDC("泰雅語", "vocab", session=session, metrics=metrics).download_audio(concurrency=8)
+    assert captured["session"].pool_size == 8 and captured["session"].scheduler is scheduler
+    assert captured["metrics"] is metrics
+
+    # the sessions created for the download are closed, and the session of the caller is not
+    larger = captured["session"]
+    assert closed == [larger]
+    ILRDC("泰雅語", "vocab", session=session).download_audio(concurrency=2)
+    assert captured["session"] is session and closed == [larger]
+    ILRDC("泰雅語", "vocab").download_audio(concurrency=2)
+    assert closed == [larger, captured["session"]]
@@ -0,0 +1,49 @@
+import pytest
+from ilrdc.util import CacheMiss, HTTPSession, Metrics, ResponseCache, RetryPolicy, Scheduler
+from tests.pages import read_fixture
+
+
+def cached_session(cache: ResponseCache) -> HTTPSession:
+    return HTTPSession(cache=cache, scheduler=Scheduler(retry=RetryPolicy(retries=1, backoff=0.01)))
+
+
+def test_fresh_entries_are_served_from_disk(site, tmp_path):
+    url = f"{site.base_url}index.php?l=2&p=18"
+    metrics = Metrics()
+    with cached_session(ResponseCache(str(tmp_path), max_age=60)) as session:
+        assert session.fetch(url, metrics) == session.fetch(url, metrics) == read_fixture("vocab.html")
+    assert site.count(r"p=18$") == 1
+    assert [event["cache"] for event in metrics.events] == ["miss", "hit"]
+
+
+def test_stale_entries_are_revalidated(site, tmp_path):
+    url = f"{site.base_url}index.php?l=2&p=10"
+    metrics = Metrics()
+    with cached_session(ResponseCache(str(tmp_path))) as session:
+        first = session.fetch(url, metrics)
+        assert session.fetch(url, metrics) == first
+        site.pages[10] = first.replace("maniq", "mangiq")
+        assert "mangiq" in session.fetch(url, metrics)
+    assert site.count(r"p=10$") == 3
+    assert "If-None-Match" not in site.requests[0][1] and "If-None-Match" in site.requests[1][1]
+    assert [event["cache"] for event in metrics.events] == ["miss", "revalidated", "miss"]
+    assert [event["status"] for event in metrics.events] == [200, 304, 200]
+
+
+def test_offline_cache_never_touches_the_network(site, tmp_path):
+    url = f"{site.base_url}index.php?l=2&p=18"
+    with cached_session(ResponseCache(str(tmp_path))) as session:
+        text = session.fetch(url)
+    with cached_session(ResponseCache(str(tmp_path), offline=True)) as session:
+        assert session.fetch(url) == text
+        with pytest.raises(CacheMiss):
+            session.fetch(f"{site.base_url}index.php?l=2&p=19")
+    assert len(site.requests) == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_size=250)
+    for name in ("a", "b", "c"):
+        cache.put(f"http://ilrdc.tw/{name}", name * 100)
+    assert cache.get("http://ilrdc.tw/a") is None
+    assert cache.get("http://ilrdc.tw/c").text == "c" * 100
@@ -0,0 +1,98 @@
+import json
+import logging
+import pytest
+from ilrdc import urldialector
+from ilrdc.urldialector import RequestCatalog, URLDialector, get_catalog, parse_index, refresh_catalog, use_catalog
+
+INDEX = """
+<ul>
+  <li><a href="index.php?l=2">泰雅語</a></li>
+  <li><a href="index.php?l=40"> <b>新語言</b> </a></li>
+  <li><a href="index.php?l=2&amp;p=18">基本詞彙</a></li>
+  <li><a href="./index.php?l=2&p=3">詞彙與構詞</a></li>
+  <li><a href="index.php?l=2&p=19">長篇語料</a></li>
+  <li><a href="index.php?l=3"><img src="logo.png"></a></li>
+</ul>
+"""
+
+
+@pytest.fixture(autouse=True)
+def catalogs(monkeypatch):
+    """The catalogs fixture gives every test a clean choice of catalog."""
+    monkeypatch.setattr(urldialector, "_catalogs", {})
+    monkeypatch.setattr(urldialector, "_catalog_path", None)
+    monkeypatch.delenv(urldialector.CATALOG_ENV, raising=False)
+
+
+def test_parse_index_reads_the_dialects_and_parts():
+    index = parse_index(INDEX)
+    assert index["dialects"] == {"泰雅語": 2, "新語言": 40}
+    assert list(index["parts"].items()) == [("詞彙與構詞", 3), ("基本詞彙", 18), ("長篇語料", 19)]
+
+
+def test_refresh_catalog_caches_and_uses_the_index(site, session, tmp_path):
+    site.pages[0] = INDEX
+    path = str(tmp_path / "catalog.json")
+    catalog = refresh_catalog(path, session)
+    assert site.count(r"/grammar/index\.php$") == 1
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file) == parse_index(INDEX)
+    assert get_catalog() is catalog
+    assert catalog.lookup("新語言", "vocab")["part_url"] == f"{site.base_url}index.php?l=40&p=18"
+
+
+def test_refresh_catalog_rejects_an_empty_index(site, session, tmp_path):
+    site.pages[0] = "<html></html>"
+    with pytest.raises(ValueError):
+        refresh_catalog(str(tmp_path / "catalog.json"), session)
+    assert not (tmp_path / "catalog.json").exists()
+
+
+def test_cached_catalog_is_used_only_when_chosen(tmp_path, monkeypatch, caplog):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(parse_index(INDEX), ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(urldialector, "CATALOG_PATH", str(path))
+    caplog.set_level(logging.INFO, logger="ilrdc.urldialector")
+
+    assert "新語言" not in get_catalog().dialects
+    assert "built-in catalog" in caplog.text
+
+    assert "新語言" in use_catalog(str(path)).dialects
+    assert str(path) in caplog.text
+    assert "新語言" not in use_catalog(None).dialects
+
+
+def test_catalog_environment_variable(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(parse_index(INDEX), ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setenv(urldialector.CATALOG_ENV, str(path))
+    assert "新語言" in get_catalog().dialects
+
+
+def test_catalog_is_hashable_and_validates_names():
+    catalog = RequestCatalog.from_enums()
+    assert {catalog: 1}[catalog] == 1 and catalog != RequestCatalog.from_enums()
+    with pytest.raises(ValueError):
+        catalog.validate("不存在的語言")
+    with pytest.raises(ValueError):
+        catalog.validate("泰雅語", "否定句結構", "vocab")
+
+
+def test_request_infos_are_copies():
+    catalog = RequestCatalog.from_enums()
+    expected = catalog.lookup("泰雅語", "vocab")
+    for infos in (catalog.lookup("泰雅語", "vocab"), catalog.lookup("泰雅語", "grammar"), catalog.generate("泰雅語")):
+        for info in infos if isinstance(infos, list) else [infos]:
+            assert isinstance(info, dict)
+            info["part_url"] = "changed"
+    assert catalog.lookup("泰雅語", "vocab") == expected and catalog.generate("泰雅語", "基本詞彙") == expected
+    assert all(info["part_url"] != "changed" for info in catalog.by_dialect["泰雅語"])
+    with pytest.raises(TypeError):
+        catalog.plans["泰雅語", "vocab", None]["part_url"] = "changed"
+
+
+def test_url_creator_is_deprecated():
+    with pytest.warns(DeprecationWarning, match="URLCreator"):
+        creator = urldialector.URLCreator("泰雅語")
+    assert creator.create() == URLDialector("泰雅語").url_list
+    assert creator.combine_to_url(3) == f"{urldialector.BASE_URL}index.php?l=2&p=3"
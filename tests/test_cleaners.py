@@ -0,0 +1,93 @@
+"""
+The cleaners must give the same records as the cleaners before the parser backends, whichever the backend and
+whether or not the rows are validated. `benchmarks/fixtures/records.json` pins the records of the fixture pages,
+and the small pages below pin the edge cases.
+"""
+import json
+import pytest
+from ilrdc.base import get_backend
+from ilrdc.core.grammar import GrammarCleaner
+from ilrdc.core.story import StoryCleaner
+from ilrdc.core.vocabulary import VocabularyCleaner
+from tests.pages import FIXTURES, read_fixture
+
+CLEANERS = {"grammar": GrammarCleaner, "vocab": VocabularyCleaner, "story": StoryCleaner}
+SOUND = "https://ilrdc.tw/grammar/sound/2/"
+
+GRAMMAR = """<html><body><div class="content"><table class="template-1">
+<tr src="./sound/2/4-1-1.mp3"><td class="code">(4-1)a.</td><td class="ab">maniq ngahi’ qu Silan.</td><td class="ch">Silan 在吃地瓜。</td></tr>
+<tr src="./sound/2/4-1-3mp3"><td class="code"> (4-1)b. </td><td class="ab">wal mqaniq bzyok qu huzil.</td><td class="ch">狗吃了豬。</td></tr>
+<tr src="./sound/2/4-1-4.wav"><td class="code">(4-1)c.</td><td class="ab">musa' su' <b>inu</b>?</td><td class="ch">你要去哪裡？</td></tr>
+<tr><td class="code">(4-2)a.</td><td class="ab">ini ku ktay qu squliq.</td><td class="ch">我沒看到人。</td></tr>
+</table></div></body></html>"""
+
+VOCAB = """<html><body><table>
+<tr><td class="alphabet">B</td></tr>
+<tr><td class="ab">bazing</td><td class="ch">聽</td><td></td></tr>
+<tr><td class="ab">bhut</td><td class="ch">射</td><td><audio src="./sound/2/A2-1-3mp3"></audio></td></tr>
+<tr><td class="alphabet">C</td></tr>
+<tr><td class="alphabet">E</td></tr>
+<tr><td class="ab">cyux</td><td class="ch">在</td><td><audio src="./sound/2/A2-1-4.mp3"></audio></td></tr>
+</table></body></html>"""
+
+STORY = """<html><body><div id="part_19"><table>
+<tr><td class="ab">Pinqzywan</td><td class="ch">紋面</td></tr>
+<tr><td class="ab"></td><td class="ch"></td><td><audio src="./sound/2/A3-0-0.mp3"></audio></td></tr>
+<tr><td class="ab">cingay balay qu pinqzywan.</td><td class="ch">關於紋面的起源，眾說紛紜。</td></tr>
+<tr><td class="ab">kya qu kbalay.</td><td class="ch">有人說。</td><td><audio src="./sound/2/A3-0-2mp3"></audio></td></tr>
+</table></div></body></html>"""
+
+EXPECTED = {
+    "grammar": (
+        GRAMMAR,
+        [
+            {"Id": "(4-1)a.", "dialect": "maniq ngahi’ qu Silan.", "chinese_translation": "Silan 在吃地瓜。", "sound_url": f"{SOUND}4-1-1.mp3"},
+            {"Id": "(4-1)b.", "dialect": "wal mqaniq bzyok qu huzil.", "chinese_translation": "狗吃了豬。", "sound_url": f"{SOUND}4-1-3.mp3"},
+            {"Id": "(4-1)c.", "dialect": "musa' su' inu?", "chinese_translation": "你要去哪裡？", "sound_url": f"{SOUND}4-1-4.wav"},
+            # the old cleaner raised on a row without a sound file
+            {"Id": "(4-2)a.", "dialect": "ini ku ktay qu squliq.", "chinese_translation": "我沒看到人。", "sound_url": "沒有音檔"},
+        ],
+    ),
+    "vocab": (
+        VOCAB,
+        [
+            {"vocab": "bazing", "chinese_translation": "聽", "sound_url": "沒有音檔", "alphabet": "B"},
+            {"vocab": "bhut", "chinese_translation": "射", "sound_url": f"{SOUND}A2-1-3.mp3", "alphabet": "B"},
+            # the old cleaner raised on the second of two adjacent header rows
+            {"vocab": "cyux", "chinese_translation": "在", "sound_url": f"{SOUND}A2-1-4.mp3", "alphabet": "E"},
+        ],
+    ),
+    "story": (
+        STORY,
+        [
+            {"dialect": "Pinqzywan", "chinese_translation": "紋面", "sound_url": "沒有音檔"},
+            {"dialect": "", "chinese_translation": "", "sound_url": f"{SOUND}A3-0-0.mp3"},
+            {"dialect": "cingay balay qu pinqzywan.", "chinese_translation": "關於紋面的起源，眾說紛紜。", "sound_url": "沒有音檔"},
+            {"dialect": "kya qu kbalay.", "chinese_translation": "有人說。", "sound_url": f"{SOUND}A3-0-2.mp3"},
+        ],
+    ),
+}
+
+MODES = [(parser, strict) for parser in ("bs4", "lxml") for strict in (False, True)]
+
+
+def clean(part_type: str, html: str, parser: str, strict: bool) -> list[dict[str, str]]:
+    backend = get_backend(parser)
+    return list(CLEANERS[part_type](backend.parse(html), backend, strict).extract_data())
+
+
+@pytest.mark.parametrize("parser, strict", MODES)
+@pytest.mark.parametrize("part_type", CLEANERS)
+def test_fixture_pages_give_the_pinned_records(part_type, parser, strict):
+    with open(FIXTURES / "records.json", encoding="utf-8") as file:
+        expected = json.load(file)[part_type]
+    records = clean(part_type, read_fixture(f"{part_type}.html"), parser, strict)
+    assert records == expected
+    assert [list(record) for record in records] == [list(record) for record in expected]
+
+
+@pytest.mark.parametrize("parser, strict", MODES)
+@pytest.mark.parametrize("part_type", CLEANERS)
+def test_edge_cases_give_the_pinned_records(part_type, parser, strict):
+    html, expected = EXPECTED[part_type]
+    assert clean(part_type, html, parser, strict) == expected
@@ -0,0 +1,50 @@
+import io
+import pytest
+from ilrdc.cli import Progress, main
+from ilrdc.util import Metrics
+
+STORIES = ("祖靈", "紋面", "老人")
+
+
+def export(tmp_path, *options) -> int:
+    return main(["export", "--dialects", "泰雅語", "--out", str(tmp_path), "--timeout", "5", *options])
+
+
+def test_export_writes_every_part(site, tmp_path, capsys):
+    assert export(tmp_path, "--parts", "vocab,story", "--format", "jsonl,csv", "--jobs", "2") == 0
+    # a file per format of the vocabulary, and of each of the three stories
+    names = {path.name for path in tmp_path.iterdir()}
+    assert names == {f"泰雅語 - {key}.{suffix}" for key in STORIES + ("基本詞彙",) for suffix in ("jsonl", "csv")}
+    assert capsys.readouterr().out.splitlines() == ["exported: 8 files", "failed: 0"]
+
+
+def test_dry_run_lists_the_parts_without_downloading(site, tmp_path, capsys):
+    assert export(tmp_path / "out", "--dry-run") == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 18 and lines[-1].startswith("17 parts, formats: jsonl")
+    assert lines[0].split("\t")[:2] == ["泰雅語", "grammar"]
+    assert lines[-2] == f"泰雅語\tstory\t-\t{site.base_url}index.php?l=2&p=19"
+    assert not site.requests and not (tmp_path / "out").exists()
+
+
+def test_failed_parts_exit_with_1(site, tmp_path, capsys):
+    site.statuses[18] = 404
+    assert export(tmp_path, "--parts", "vocab,story") == 1
+    output = capsys.readouterr()
+    assert "failed: 1" in output.out and "l=2&p=18" in output.err
+    assert {path.name for path in tmp_path.iterdir()} == {f"泰雅語 - {key}.jsonl" for key in STORIES}
+
+
+@pytest.mark.parametrize("options", [["--dialects", "不存在的語言"], ["--jobs", "0"], ["--jobs", "many"]])
+def test_bad_arguments_exit_with_2(tmp_path, capsys, options):
+    with pytest.raises(SystemExit) as error:
+        main(["export", "--out", str(tmp_path), "--dry-run", *options])
+    assert error.value.code == 2
+    assert "Traceback" not in capsys.readouterr().err
+
+
+def test_progress_has_no_eta_before_the_first_part():
+    progress = Progress(4, Metrics(), stream=io.StringIO())
+    assert progress.line().endswith("ETA --")
+    progress.update(ok=True)
+    assert progress.line().endswith("s") and "nan" not in progress.line()
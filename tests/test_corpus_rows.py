@@ -0,0 +1,31 @@
+from ilrdc import ILRDC
+from ilrdc.corpus import Corpus
+
+
+def test_rows_keep_the_key_order_of_each_record(site, session):
+    records = []
+    for part_type in ("grammar", "vocab", "story"):
+        records += list(ILRDC("泰雅語", part_type, session=session).iter_records())
+    records += [
+        {"sound_url": "沒有音檔", "dialect_ch": "邵語", "ch": "你好"},
+        {"ch": "再見", "extra": None, "dialect_ch": "邵語"},
+        {},
+    ]
+    corpus = Corpus.from_records(records)
+    assert len(corpus) == len(records)
+    assert {record["part_type"] for record in records[:-3]} == {"grammar", "vocab", "story"}
+    for row, record in zip(corpus, records):
+        expected = {key: value for key, value in record.items() if value is not None}
+        assert list(row) == list(expected) and len(row) == len(expected)
+        assert list(row.to_dict().items()) == list(expected.items())
+    assert corpus.to_dicts()[-2] == {"ch": "再見", "dialect_ch": "邵語"}
+    # the key orders are interned, a few per part type
+    assert len(corpus.key_orders) < 10
+
+
+def test_extend_keeps_the_key_order_of_both_batches():
+    first = [{"ch": "一", "dialect_ch": "邵語"}]
+    second = [{"dialect_ch": "泰雅語", "part": "基本詞彙", "ch": "二"}]
+    corpus = Corpus.from_records(first).extend(second)
+    assert corpus.to_dicts() == first + second
+    assert [list(row) for row in corpus] == [list(first[0]), list(second[0])]
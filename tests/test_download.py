@@ -0,0 +1,51 @@
+"""
+The async engine, the batch, the process pool of parsers, strict mode and the streamed records must give the same
+data as `ILRDC.download_data` and `ILRDC.iter_records`.
+"""
+import asyncio
+import pytest
+from ilrdc import ILRDC
+
+PART_TYPES = ("grammar", "vocab", "story")
+
+
+@pytest.mark.parametrize("part_type", PART_TYPES)
+def test_adownload_data_equals_download_data(site, session, part_type):
+    expected = ILRDC("泰雅語", part_type, session=session).download_data()
+    assert asyncio.run(ILRDC("泰雅語", part_type, session=session).adownload_data()) == expected
+
+
+def test_adownload_data_of_a_part(site, session):
+    expected = ILRDC("泰雅語", "grammar", "否定句結構", session=session).download_data()
+    assert asyncio.run(ILRDC("泰雅語", "grammar", "否定句結構", session=session).adownload_data()) == expected
+
+
+@pytest.mark.parametrize("parse_workers", [None, 2])
+def test_download_many_equals_download_data(site, session, parse_workers):
+    dialects = ["泰雅語", "邵語"]
+    result = asyncio.run(ILRDC.download_many(dialects, list(PART_TYPES), session=session, parse_workers=parse_workers))
+    assert list(result) == [(dialect_ch, part_type) for dialect_ch in dialects for part_type in PART_TYPES]
+    for (dialect_ch, part_type), data in result.items():
+        assert data == ILRDC(dialect_ch, part_type, session=session).download_data()
+
+
+@pytest.mark.parametrize("part_type", PART_TYPES)
+def test_strict_mode_gives_the_same_data(site, session, part_type):
+    expected = ILRDC("泰雅語", part_type, session=session).download_data()
+    assert ILRDC("泰雅語", part_type, session=session, strict=True).download_data() == expected
+
+
+async def collect(ilrdc: ILRDC) -> list[dict[str, str]]:
+    return [record async for record in ilrdc.aiter_records()]
+
+
+@pytest.mark.parametrize("part_type", PART_TYPES)
+def test_aiter_records_equals_iter_records(site, session, part_type):
+    expected = list(ILRDC("泰雅語", part_type, session=session).iter_records())
+    records = asyncio.run(collect(ILRDC("泰雅語", part_type, session=session)))
+    # the pages arrive in any order, but the records of a page keep theirs
+    assert len(records) == len(expected) > 0
+    for part in {record["part"] for record in expected}:
+        assert [record for record in records if record["part"] == part] == [
+            record for record in expected if record["part"] == part
+        ]
@@ -0,0 +1,32 @@
+import json
+import pytest
+from ilrdc import ILRDC
+
+VOCAB_URL = r"l=2&p=18$"
+
+
+def test_export_downloads_once_for_every_format(site, session, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ilrdc = ILRDC("泰雅語", "vocab", session=session)
+    paths = ilrdc.export(("json", "csv", "jsonl"), str(tmp_path))
+    ilrdc.to_json()
+    assert site.count(VOCAB_URL) == 1
+    assert sorted(path.rsplit(".", 1)[1] for path in paths) == ["csv", "json", "jsonl"]
+
+    ilrdc.refresh()
+    ilrdc.export(("json",), str(tmp_path))
+    assert site.count(VOCAB_URL) == 2
+
+
+def test_export_writes_a_repeated_format_once(site, session, tmp_path):
+    paths = ILRDC("泰雅語", "vocab", session=session).export(("json", "json", "csv", "json"), str(tmp_path))
+    assert [path.rsplit(".", 1)[1] for path in paths] == ["json", "csv"]
+    with open(paths[0], encoding="utf-8") as file:
+        assert json.load(file)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["泰雅語 - 基本詞彙.csv", "泰雅語 - 基本詞彙.json"]
+
+
+def test_export_rejects_an_unknown_format(site, session, tmp_path):
+    with pytest.raises(ValueError, match="xml"):
+        ILRDC("泰雅語", "vocab", session=session).export(("json", "xml"), str(tmp_path))
+    assert site.count(VOCAB_URL) == 0
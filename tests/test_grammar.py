@@ -0,0 +1,36 @@
+import pytest
+import requests
+from ilrdc.core.grammar import GrammarDownloader
+from ilrdc.urldialector import URLDialector, get_catalog
+from tests.pages import read_fixture
+
+
+def number_parts(site) -> dict[str, int]:
+    """The number_parts function gives every grammar part a page whose first id names the part."""
+    catalog = get_catalog()
+    part_ids = {part: catalog.parts[part] for part in catalog.part_types["grammar"]}
+    for part_id in part_ids.values():
+        site.pages[part_id] = read_fixture("grammar.html").replace("(4-1)a.", f"(P{part_id})a.", 1)
+    return part_ids
+
+
+@pytest.mark.parametrize("max_workers", [1, 10])
+def test_download_keeps_the_part_order_and_isolates_failures(site, session, max_workers):
+    part_ids = number_parts(site)
+    site.statuses[10], site.statuses[12] = 404, 503
+    data = GrammarDownloader(URLDialector("泰雅語"), session, max_workers=max_workers).download()
+
+    assert len(data) == len(part_ids) == 15
+    for entry, (part, part_id) in zip(data, part_ids.items()):
+        if part_id in (10, 12):
+            assert isinstance(entry, str) and f"「{part}」下載失敗" in entry and str(site.statuses[part_id]) in entry
+        else:
+            assert list(entry) == [part] and entry[part][0]["Id"] == f"(P{part_id})a." and len(entry[part]) == 40
+    # the 503 part is retried once, the 404 part is not
+    assert site.count(r"p=12$") == 2 and site.count(r"p=10$") == 1
+
+
+def test_a_single_failing_part_raises(site, session):
+    site.statuses[10] = 404
+    with pytest.raises(requests.HTTPError):
+        GrammarDownloader(URLDialector("泰雅語", "否定句結構"), session).download()
@@ -0,0 +1,32 @@
+import sys
+import json
+import subprocess
+import pytest
+
+HEAVY = ("requests", "lxml", "bs4", "pydantic", "pandas", "pyarrow")
+
+
+def imported_modules(code: str) -> set[str]:
+    script = f"import sys, json\n{code}\nprint(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return {name.split(".")[0] for name in json.loads(output.splitlines()[-1])}
+
+
+def test_import_does_not_load_the_heavy_dependencies():
+    modules = imported_modules("import ilrdc\nilrdc.ILRDCDialect.get_list_info()\nilrdc.get_catalog()")
+    assert not modules & set(HEAVY)
+
+
+def test_lazy_attributes_resolve():
+    import ilrdc
+
+    assert ilrdc.Corpus is __import__("ilrdc.corpus", fromlist=["Corpus"]).Corpus
+    assert set(ilrdc.LAZY_ATTRIBUTES) <= set(dir(ilrdc))
+    assert not imported_modules("import ilrdc\nilrdc.Corpus") & set(HEAVY)
+
+
+def test_unknown_attribute_raises():
+    import ilrdc
+
+    with pytest.raises(AttributeError, match="missing"):
+        ilrdc.missing
@@ -0,0 +1,87 @@
+import pytest
+from ilrdc import ILRDC
+from ilrdc.util import CSVWriter, JSONLinesWriter, Metrics
+
+
+def recorded() -> Metrics:
+    metrics = Metrics()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        metrics.record("fetch", seconds, url="u", bytes=100, status=200, cache="miss")
+    metrics.record("fetch", 1.0, url="u", bytes=0, status=304, cache="revalidated")
+    metrics.record("parse", 0.05, url="u", rows=7)
+    metrics.record("write", 0.5, path="out.csv", rows=7, format="CSVWriter")
+    return metrics
+
+
+def test_summary_aggregates_by_phase():
+    summary = recorded().summary()
+    assert list(summary) == ["fetch", "parse", "write"]
+    fetch = summary["fetch"]
+    assert fetch["count"] == 5 and fetch["seconds"] == pytest.approx(2.0) and fetch["mean"] == pytest.approx(0.4)
+    assert (fetch["p50"], fetch["p95"], fetch["max"]) == (0.3, 1.0, 1.0)
+    assert fetch["bytes"] == 400 and fetch["rows"] == 0
+    assert fetch["status"] == {200: 4, 304: 1} and fetch["cache"] == {"miss": 4, "revalidated": 1}
+    assert summary["parse"]["rows"] == 7 and summary["parse"]["status"] == {}
+    assert Metrics().summary() == {}
+
+
+def test_report_has_a_line_per_phase():
+    lines = recorded().report().splitlines()
+    assert lines[0].split() == ["phase", "count", "total", "s", "mean", "ms", "p95", "ms", "max", "ms", "rows", "bytes"]
+    assert lines[1].split() == ["fetch", "5", "2.000", "400.0", "1000.0", "1000.0", "0", "400"]
+    assert lines[2].split() == ["status", "200:", "4,", "304:", "1"]
+    assert lines[3].split() == ["cache", "miss:", "4,", "revalidated:", "1"]
+    assert lines[4].split()[:2] == ["parse", "1"] and lines[5].split()[:2] == ["write", "1"]
+
+
+def test_openmetrics_output():
+    metrics = recorded()
+    metrics.record("fetch", 0.1, url="u", status=200, cache='a "b"\\c\nd')
+    text = metrics.to_openmetrics(prefix="test")
+    lines = text.splitlines()
+    assert text.endswith("\n") and lines[-1] == "# EOF" and lines.count("# EOF") == 1
+    assert lines[:6] == [
+        "# TYPE test_fetch_seconds summary",
+        "# UNIT test_fetch_seconds seconds",
+        'test_fetch_seconds{quantile="0.5"} 0.3',
+        'test_fetch_seconds{quantile="0.95"} 1.0',
+        "test_fetch_seconds_count 6",
+        f"test_fetch_seconds_sum {sum((0.1, 0.2, 0.3, 0.4, 1.0, 0.1))}",
+    ]
+    assert "# TYPE test_parse_rows counter" in lines and "test_parse_rows_total 7" in lines
+    assert "test_write_rows_total 7" in lines and "test_fetch_bytes_total 400" in lines
+    assert 'test_fetch_status_total{status="304"} 1' in lines
+    assert 'test_fetch_cache_total{cache="a \\"b\\"\\\\c\\nd"} 1' in lines
+    assert Metrics().to_openmetrics() == "# EOF\n"
+
+
+@pytest.mark.parametrize("writer_class", [JSONLinesWriter, CSVWriter])
+def test_writers_record_a_write_event(tmp_path, writer_class):
+    metrics, path = Metrics(), str(tmp_path / "out")
+    with writer_class(path, metrics=metrics) as writer:
+        writer.write_all([{"Id": "1"}, {"Id": "2"}])
+    [event] = metrics.events
+    assert event["phase"] == "write" and event["seconds"] >= 0
+    assert (event["path"], event["rows"], event["format"]) == (path, 2, writer_class.__name__)
+
+    # a write that is not committed records nothing
+    writer = writer_class(path, metrics=metrics)
+    writer.open()
+    writer.close(commit=False)
+    assert len(metrics.events) == 1
+
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_strict_mode_records_validate_events(site, session, strict):
+    metrics = Metrics()
+    data = ILRDC("泰雅語", "vocab", session=session, strict=strict, metrics=metrics).download_data()
+    [records] = data.values()
+    parse = [event for event in metrics.events if event["phase"] == "parse"]
+    validate = [event for event in metrics.events if event["phase"] == "validate"]
+    assert [event["rows"] for event in parse] == [len(records)]
+    if strict:
+        [event] = validate
+        assert event["url"] == parse[0]["url"] and event["rows"] == len(records)
+        assert 0 < event["seconds"] <= parse[0]["seconds"]
+    else:
+        assert validate == []
@@ -0,0 +1,63 @@
+import os
+from urllib.parse import quote
+import pytest
+from ilrdc import ILRDC, export_parquet
+from ilrdc.util import Metrics, read_parquet
+from ilrdc.util.arrow import COLUMNS, DICTIONARY_COLUMNS
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def rows(table) -> list[dict[str, str]]:
+    records = [{key: value for key, value in row.items() if value is not None} for row in table.to_pylist()]
+    return sorted(records, key=lambda record: sorted(record.items()))
+
+
+def dataset_files(path) -> list[str]:
+    return sorted(
+        os.path.relpath(os.path.join(root, name), path) for root, _, names in os.walk(path) for name in names
+    )
+
+
+def test_to_parquet_writes_a_partitioned_dataset(site, session, tmp_path):
+    path = str(tmp_path / "dataset")
+    metrics = Metrics()
+    ilrdc = ILRDC("泰雅語", "vocab", session=session, metrics=metrics)
+    table = ilrdc.to_parquet(path)
+    records = list(ilrdc.iter_records())
+
+    # the partition values are percent-encoded in the directory names
+    assert dataset_files(path) == [os.path.join(f"dialect_ch={quote('泰雅語')}", "part_type=vocab", "part-0.parquet")]
+    assert table.num_rows == len(records) and table.column_names == COLUMNS
+    assert [event["rows"] for event in metrics.events if event["phase"] == "write"] == [len(records)]
+
+    metadata = pq.ParquetFile(os.path.join(path, dataset_files(path)[0])).metadata
+    row_group = metadata.row_group(0)
+    columns = {row_group.column(num).path_in_schema: row_group.column(num) for num in range(metadata.num_columns)}
+    # the partition columns are in the directory names, not in the file
+    assert set(columns) == set(COLUMNS) - {"dialect_ch", "part_type"}
+    assert all(column.compression == "ZSTD" for column in columns.values())
+    for name in DICTIONARY_COLUMNS - {"dialect_ch", "part_type"}:
+        assert "RLE_DICTIONARY" in columns[name].encodings or "PLAIN_DICTIONARY" in columns[name].encodings
+
+    assert rows(read_parquet(path)) == rows(pa.Table.from_pylist(records))
+
+
+def test_export_parquet_reads_back_the_same_rows(site, session, tmp_path):
+    path = str(tmp_path / "dataset")
+    table = export_parquet(["泰雅語", "邵語"], ["vocab", "story"], path, session=session)
+    assert {os.path.dirname(name) for name in dataset_files(path)} == {
+        os.path.join(f"dialect_ch={quote(dialect_ch)}", f"part_type={part_type}")
+        for dialect_ch in ("泰雅語", "邵語")
+        for part_type in ("vocab", "story")
+    }
+    for name in DICTIONARY_COLUMNS:
+        assert pa.types.is_dictionary(table.schema.field(name).type)
+    back = read_parquet(path)
+    assert back.num_rows == table.num_rows
+    assert rows(back) == rows(table)
+
+    # writing the same partitions again replaces them
+    export_parquet(["泰雅語"], ["vocab"], path, session=session)
+    assert read_parquet(path).num_rows == table.num_rows
@@ -0,0 +1,65 @@
+import asyncio
+from ilrdc import ILRDC
+from ilrdc.plan import ILRDCBatch
+from ilrdc.urldialector import get_catalog
+from ilrdc.util import Metrics
+
+
+def test_pipeline_bounds_the_pages_waiting_for_the_parsers(site, session):
+    metrics = Metrics()
+    batch = ILRDCBatch(session, metrics=metrics)
+    for dialect_ch in get_catalog().dialects:
+        for part_type in ("grammar", "vocab", "story"):
+            batch.add(dialect_ch, part_type)
+    result = asyncio.run(batch.arun(parse_workers=1))
+    assert len(result) == 30 and not any(isinstance(data, Exception) for data in result.values())
+
+    # a fetch event is recorded when a page arrives, a parse event when it has been cleaned
+    pending, peak = 0, 0
+    for event in metrics.events:
+        if event["phase"] == "fetch":
+            pending += 1
+        elif event["phase"] == "parse":
+            pending -= 1
+        peak = max(peak, pending)
+    assert sum(event["phase"] == "fetch" for event in metrics.events) == 170
+    assert peak <= 4
+
+
+def overlapping_batch(session) -> ILRDCBatch:
+    return (
+        ILRDCBatch(session)
+        .add("泰雅語", "grammar")
+        .add("泰雅語", "grammar", "否定句結構")
+        .add("泰雅語", "vocab")
+        .add("泰雅語", "vocab")
+        .add("泰雅語", "story")
+        .add("邵語", "vocab")
+    )
+
+
+def test_run_fetches_each_page_once(site, session):
+    batch = overlapping_batch(session)
+    assert len(batch.requests) == 5
+    result = batch.run()
+    # the grammar parts, vocabulary and story of 泰雅語, and the vocabulary of 邵語
+    paths = [path for path, _ in site.requests]
+    assert len(paths) == len(set(paths)) == len(batch.plan()) == 18
+    for request, data in result.items():
+        expected = ILRDC(request.dialect_ch, request.part_type, request.part, session=session).download_data()
+        assert data == expected
+
+
+def test_arun_fetches_each_page_once(site, session):
+    batch = overlapping_batch(session)
+    result = asyncio.run(batch.arun())
+    paths = [path for path, _ in site.requests]
+    assert len(paths) == len(set(paths)) == 18
+    assert result == batch.run()
+
+
+def test_concurrency_seeds_the_limiter_of_the_session(site, session):
+    limiter = session.scheduler.limiter
+    assert limiter.limit == session.pool_size == 10
+    asyncio.run(ILRDC.download_many(["泰雅語"], ["vocab"], concurrency=30, session=session))
+    assert limiter.limit >= 30
@@ -0,0 +1,32 @@
+from ilrdc import ILRDC
+from ilrdc.core.vocabulary import VocabularyCleaner
+from ilrdc.util import Metrics, RecordCache
+
+
+def download(session, record_cache: RecordCache) -> tuple[list, list[str]]:
+    metrics = Metrics()
+    data = ILRDC("泰雅語", "vocab", session=session, record_cache=record_cache, metrics=metrics).download_data()
+    return data, [event.get("cache", "miss") for event in metrics.events if event["phase"] == "parse"]
+
+
+def test_unchanged_pages_are_not_parsed_again(site, session, tmp_path):
+    with RecordCache(str(tmp_path / "records.sqlite")) as record_cache:
+        data, parses = download(session, record_cache)
+        assert parses == ["miss"]
+        assert download(session, record_cache) == (data, ["hit"])
+
+
+def test_parser_version_bump_misses(site, session, tmp_path, monkeypatch):
+    with RecordCache(str(tmp_path / "records.sqlite")) as record_cache:
+        data, _ = download(session, record_cache)
+        monkeypatch.setattr(VocabularyCleaner, "parser_version", "next")
+        assert download(session, record_cache) == (data, ["miss"])
+        assert download(session, record_cache) == (data, ["hit"])
+
+
+def test_changed_pages_miss(tmp_path):
+    with RecordCache(str(tmp_path / "records.sqlite")) as record_cache:
+        record_cache.put("<html>a</html>", "VocabularyCleaner/2", [{"vocab": "a"}])
+        assert record_cache.get("<html>a</html>", "VocabularyCleaner/2") == [{"vocab": "a"}]
+        assert record_cache.get("<html>b</html>", "VocabularyCleaner/2") is None
+        assert record_cache.get("<html>a</html>", "VocabularyCleaner/3") is None
@@ -0,0 +1,86 @@
+import os
+import csv
+import json
+import pytest
+from ilrdc.ilrdc import export_records
+from ilrdc.util import CSVWriter, JSONArrayWriter, JSONLinesWriter, Metrics
+
+RECORDS = [
+    {"Id": "(4-1)a.", "dialect": "maniq ngahi’ qu Silan.", "chinese_translation": "Silan 在吃地瓜。", "sound_url": "沒有音檔"},
+    {"Id": "(4-2)b.", "dialect": 'say "hi", ok', "chinese_translation": "狗吃了豬。\n第二行", "sound_url": "x.mp3"},
+]
+
+
+def write(writer_class, path, records, **kwargs) -> str:
+    with writer_class(str(path), **kwargs) as writer:
+        assert writer.write_all(records) == len(records)
+    return path.read_text(encoding=kwargs.get("encoding", "utf-8"))
+
+
+@pytest.mark.parametrize("records", [RECORDS, [], RECORDS * 3])
+def test_json_array_equals_json_dump(tmp_path, records):
+    text = write(JSONArrayWriter, tmp_path / "out.json", records)
+    assert text == json.dumps(records, ensure_ascii=False)
+    assert json.loads(text) == records
+
+
+def test_json_lines(tmp_path):
+    text = write(JSONLinesWriter, tmp_path / "out.jsonl", RECORDS)
+    assert [json.loads(line) for line in text.splitlines()] == RECORDS and text.endswith("\n")
+
+
+def test_csv_header_bom_and_column_order(tmp_path):
+    path = tmp_path / "out.csv"
+    write(CSVWriter, path, RECORDS)
+    assert path.read_bytes().startswith(b"\xef\xbb\xbfId,dialect,chinese_translation,sound_url\n")
+    with open(path, encoding="utf_8_sig", newline="") as file:
+        assert list(csv.DictReader(file)) == RECORDS
+
+    # the given columns set the order, and the other keys are left out
+    write(CSVWriter, path, RECORDS, columns=["sound_url", "Id"])
+    with open(path, encoding="utf_8_sig", newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows == [["sound_url", "Id"], ["沒有音檔", "(4-1)a."], ["x.mp3", "(4-2)b."]]
+
+
+def test_csv_without_records_writes_the_header(tmp_path):
+    path = tmp_path / "out.csv"
+    write(CSVWriter, path, [], columns=["Id", "dialect"])
+    assert path.read_bytes() == b"\xef\xbb\xbfId,dialect\n"
+
+
+@pytest.mark.parametrize("writer_class", [JSONArrayWriter, JSONLinesWriter, CSVWriter])
+def test_failed_writes_leave_the_target_untouched(tmp_path, writer_class):
+    path = tmp_path / "out"
+    path.write_text("old", encoding="utf-8")
+
+    writer = writer_class(str(path))
+    writer.open()
+    writer.write(RECORDS[0])
+    assert os.path.exists(writer.temp_path)
+    writer.close(commit=False)
+    assert path.read_text(encoding="utf-8") == "old" and os.listdir(tmp_path) == ["out"]
+
+    with pytest.raises(RuntimeError):
+        with writer_class(str(path)) as writer:
+            writer.write(RECORDS[0])
+            raise RuntimeError("the download failed")
+    assert path.read_text(encoding="utf-8") == "old" and os.listdir(tmp_path) == ["out"]
+
+
+@pytest.mark.parametrize("writer_class", [JSONArrayWriter, JSONLinesWriter, CSVWriter])
+def test_direct_writes_are_counted(tmp_path, writer_class):
+    metrics = Metrics()
+    with writer_class(str(tmp_path / "out"), metrics=metrics) as writer:
+        for record in RECORDS * 2:
+            writer.write(record)
+        writer.write_all(RECORDS)
+    assert writer.rows == 6 and metrics.events[0]["rows"] == 6
+
+
+def test_export_records_counts_the_rows_of_each_file(tmp_path):
+    metrics = Metrics()
+    export_records("泰雅語", {"a": RECORDS, "b": RECORDS[:1]}, str(tmp_path), ("json", "csv"), metrics)
+    assert sorted((os.path.basename(event["path"]), event["rows"]) for event in metrics.events) == [
+        ("泰雅語 - a.csv", 2), ("泰雅語 - a.json", 2), ("泰雅語 - b.csv", 1), ("泰雅語 - b.json", 1)
+    ]
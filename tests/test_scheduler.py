@@ -0,0 +1,187 @@
+import asyncio
+import time
+from email.utils import formatdate
+import pytest
+
+from ilrdc.util import scheduler as scheduler_module
+from ilrdc.util.scheduler import AdaptiveLimiter, RetryPolicy, Scheduler, parse_retry_after
+
+
+@pytest.fixture
+def sleeps(monkeypatch) -> list[float]:
+    """The sleeps fixture records the sleeps of the scheduler instead of sleeping."""
+    slept = []
+    monkeypatch.setattr(scheduler_module.time, "sleep", slept.append)
+    return slept
+
+
+def responses(*statuses, headers=None):
+    calls = []
+
+    def send():
+        calls.append(None)
+        return statuses[min(len(calls), len(statuses)) - 1], headers or {}, f"response {len(calls)}"
+
+    return send, calls
+
+
+def test_call_retries_the_retryable_statuses(sleeps):
+    send, calls = responses(503, 503, 200)
+    scheduler = Scheduler(retry=RetryPolicy(retries=4, backoff=0.5))
+    assert scheduler.call(send) == (200, {}, "response 3")
+    assert len(calls) == 3
+    assert scheduler.limiter.inflight == 0
+
+
+def test_call_gives_up_after_the_retries(sleeps):
+    send, calls = responses(503)
+    scheduler = Scheduler(retry=RetryPolicy(retries=3))
+    status, _, _ = scheduler.call(send)
+    assert status == 503 and len(calls) == 4
+    assert scheduler.limiter.inflight == 0
+
+
+def test_call_retries_the_listed_exceptions(sleeps):
+    calls = []
+
+    def send():
+        calls.append(None)
+        raise ConnectionError("refused")
+
+    scheduler = Scheduler(retry=RetryPolicy(retries=2))
+    with pytest.raises(ConnectionError):
+        scheduler.call(send, exceptions=(ConnectionError,))
+    assert len(calls) == 3
+    assert scheduler.limiter.inflight == 0
+
+
+def test_call_releases_the_slot_on_other_exceptions(sleeps):
+    scheduler = Scheduler(limiter=AdaptiveLimiter(initial=2, max_limit=2))
+
+    def send():
+        raise ValueError("not a request error")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            scheduler.call(send, exceptions=(ConnectionError,))
+    assert scheduler.limiter.inflight == 0
+    assert scheduler.call(responses(200)[0])[0] == 200
+
+
+def test_acall_releases_the_slot_on_cancellation():
+    async def main():
+        scheduler = Scheduler(limiter=AdaptiveLimiter(initial=1, max_limit=1))
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(scheduler.acall(slow))
+        await asyncio.sleep(0.01)
+        assert scheduler.limiter.inflight == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert scheduler.limiter.inflight == 0
+
+        async def send():
+            return 200, {}, "ok"
+
+        return await asyncio.wait_for(scheduler.acall(send), 1)
+
+    assert asyncio.run(main()) == (200, {}, "ok")
+
+
+def test_full_jitter_backoff_bounds():
+    policy = RetryPolicy(backoff=0.5, max_backoff=3)
+    for attempt in range(8):
+        bound = min(3, 0.5 * 2**attempt)
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert all(0 <= delay <= bound for delay in delays)
+        assert max(delays) > bound / 2
+
+
+def test_retry_after_is_used_and_capped():
+    policy = RetryPolicy(max_retry_after=60)
+    assert policy.delay(0, "7") == 7
+    assert policy.delay(5, "3600") == 60
+    assert 8 <= policy.delay(0, formatdate(time.time() + 10, usegmt=True)) <= 10
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_after_pauses_the_whole_session(sleeps):
+    send, calls = responses(429, 200, headers={"Retry-After": "5"})
+    scheduler = Scheduler()
+    assert scheduler.call(send)[0] == 200
+    # the backoff of the 429, then the pause, which the sleep is not long enough to lift here
+    assert sleeps[:2] == [0.0, 5.0] and 4 < sleeps[2] <= 5
+    assert 4 < scheduler.wait() <= 5
+
+
+def test_adaptive_limiter_increases_additively():
+    limiter = AdaptiveLimiter(initial=4, max_limit=5)
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release(0.1, ok=True)
+    assert limiter.limit == pytest.approx(5, abs=0.1)
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(0.1, ok=True)
+    assert limiter.limit == 5
+
+
+def test_adaptive_limiter_decreases_multiplicatively_once_per_round_trip():
+    limiter = AdaptiveLimiter(initial=16, min_limit=2, decrease=0.5)
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(10.0, ok=False)
+    assert limiter.limit == 8
+    limiter.decreased_at = 0.0
+    for _ in range(4):
+        limiter.decreased_at = 0.0
+        limiter.acquire()
+        limiter.release(0.01, ok=False)
+    assert limiter.limit == 2
+
+
+def test_adaptive_limiter_treats_slow_responses_as_congestion():
+    limiter = AdaptiveLimiter(initial=10, tolerance=3.0)
+    for _ in range(50):
+        limiter.acquire()
+        limiter.release(0.1, ok=True)
+    before = limiter.limit
+    limiter.acquire()
+    limiter.release(5.0, ok=True)
+    assert limiter.limit == pytest.approx(before * 0.5)
+
+
+def test_adaptive_limiter_seed():
+    limiter = AdaptiveLimiter(initial=10, max_limit=40)
+    limiter.seed(5)
+    assert limiter.limit == 10
+    limiter.seed(30)
+    assert limiter.limit == 30
+    limiter.seed(100)
+    assert limiter.limit == 40
+
+    # a limit cut for congestion is kept
+    limiter = AdaptiveLimiter(initial=10)
+    limiter.acquire()
+    limiter.release(0.1, ok=False)
+    limiter.seed(30)
+    assert limiter.limit == 5
+
+
+def test_adaptive_limiter_seed_wakes_the_waiters():
+    limiter = AdaptiveLimiter(initial=1)
+
+    async def main():
+        await limiter.aacquire()
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        limiter.seed(2)
+        await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(main())
+    assert limiter.inflight == 2
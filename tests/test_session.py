@@ -0,0 +1,37 @@
+import asyncio
+import aiohttp
+import pytest
+import requests
+from ilrdc.util import create_client
+
+
+def part_url(site, part_id: int) -> str:
+    return f"{site.base_url}index.php?l=2&p={part_id}"
+
+
+@pytest.mark.parametrize("status", [403, 404, 410, 503])
+def test_fetch_raises_for_error_statuses(site, session, status):
+    site.statuses[10] = status
+    with pytest.raises(requests.HTTPError) as error:
+        session.fetch(part_url(site, 10))
+    assert error.value.response.status_code == status
+    assert session.fetch(part_url(site, 11)).startswith("<")
+
+
+@pytest.mark.parametrize("status", [403, 404, 503])
+def test_afetch_raises_for_error_statuses(site, session, status):
+    site.statuses[10] = status
+
+    async def fetch():
+        async with create_client(session=session) as client:
+            return await session.afetch(part_url(site, 10), client)
+
+    with pytest.raises(aiohttp.ClientResponseError) as error:
+        asyncio.run(fetch())
+    assert error.value.status == status
+
+
+def test_not_modified_needs_a_cached_entry(session):
+    assert session.is_page(200, None) and session.is_page(204, None)
+    assert session.is_page(304, object()) and not session.is_page(304, None)
+    assert not session.is_page(404, None) and not session.is_page(301, None)
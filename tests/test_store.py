@@ -0,0 +1,50 @@
+from ilrdc import ILRDC
+from ilrdc.store import CorpusStore
+from tests.pages import read_fixture
+
+
+def test_ingest_and_search(site, session):
+    with CorpusStore() as store:
+        grammar = list(ILRDC("泰雅語", "grammar", "否定句結構", session=session).iter_records())
+        assert store.ingest(grammar) == len(grammar)
+        assert store.ingest(ILRDC("泰雅語", "vocab", session=session)) > 0
+
+        # a full-text match on the dialect text, and a LIKE match for a query shorter than three characters
+        matches = store.search("maniq")
+        assert matches and all("maniq" in record["dialect"] for record in matches)
+        assert {record["part_type"] for record in matches} == {"grammar"}
+        translation = grammar[0]["chinese_translation"]
+        assert translation in [record["chinese_translation"] for record in store.search(translation[:2])]
+        assert store.search("maniq", part="vocab") == [] and store.search("maniq", dialect="邵語") == []
+        assert len(store.search("maniq", limit=1)) == 1
+
+
+def test_records_round_trip(site, session):
+    records = list(ILRDC("泰雅語", "vocab", session=session).iter_records())
+    with CorpusStore() as store:
+        store.ingest(records)
+        assert store.search(records[0]["vocab"], limit=None)[0] == records[0]
+
+
+def test_ingesting_again_replaces_the_part(site, session):
+    ilrdc = ILRDC("泰雅語", "grammar", "否定句結構", session=session)
+    vocab = ILRDC("泰雅語", "vocab", session=session)
+    with CorpusStore() as store:
+        first = store.ingest(ilrdc)
+        store.ingest(vocab)
+        matches = store.search("maniq", limit=None)
+        count = store.connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+        assert store.ingest(ilrdc) == first
+        assert store.search("maniq", limit=None) == matches
+        assert store.connection.execute("SELECT COUNT(*) FROM records").fetchone()[0] == count
+        # the full-text index agrees with the records, i.e. no entry of a replaced row is left
+        store.connection.execute("INSERT INTO records_fts (records_fts, rank) VALUES ('integrity-check', 1)")
+
+
+def test_refresh_replaces_the_changed_rows(site, session):
+    with CorpusStore() as store:
+        store.ingest(ILRDC("泰雅語", "grammar", "否定句結構", session=session))
+        site.pages[10] = read_fixture("grammar.html").replace("maniq", "mangiq")
+        store.ingest(ILRDC("泰雅語", "grammar", "否定句結構", session=session))
+        assert store.search("maniq") == [] and store.search("mangiq")
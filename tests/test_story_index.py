@@ -0,0 +1,93 @@
+from ilrdc.base import get_backend
+from ilrdc.core.story import StoryCleaner, StoryDownloader, StoryEntry
+from ilrdc.urldialector import URLDialector
+from ilrdc.util import HTTPSession, Metrics, RecordCache, ResponseCache, has_sound_url
+from tests.pages import read_fixture
+
+
+def parse_story_page(html: str) -> list[dict[str, str]]:
+    backend = get_backend("lxml")
+    return list(StoryCleaner(backend.parse(html), backend).extract_data())
+
+
+def test_index_counts_match_the_parsed_stories():
+    records = parse_story_page(read_fixture("story.html"))
+    downloader = StoryDownloader(URLDialector("泰雅語"))
+    index = downloader.index_stories(records)
+    stories = downloader.get_each_story(records)
+    assert [entry.title for entry in index] == [title for story in stories for title in story]
+    for entry, story in zip(index, stories):
+        (sentences,) = story.values()
+        assert entry.sentences == len(sentences) == 8
+        assert entry.audio == sum(has_sound_url(sentence["sound_url"]) for sentence in sentences)
+    assert [entry.audio for entry in index] == [5, 5, 5]
+
+
+def test_index_agrees_with_segment_stories():
+    records = parse_story_page(read_fixture("story.html"))
+    downloader = StoryDownloader(URLDialector("泰雅語"))
+    segmented = list(downloader.segment_stories(records))
+    indexed = [
+        (entry.title, record)
+        for entry in downloader.index_stories(records)
+        for record in records[entry.start : entry.stop]
+    ]
+    assert segmented == indexed
+
+
+def test_index_of_a_page_without_titles():
+    downloader = StoryDownloader(URLDialector("泰雅語"))
+    records = [{"dialect": "a", "chinese_translation": "甲", "sound_url": "沒有音檔"}]
+    assert downloader.index_stories(records) == []
+    assert downloader.get_each_story(records) == []
+
+
+def test_get_story_and_iter_stories(site):
+    downloader = StoryDownloader(URLDialector("泰雅語"))
+    full = downloader.download()
+    index = downloader.get_story_index()
+    assert isinstance(index[0], StoryEntry)
+    assert downloader.get_story("祖靈") == full[1]["祖靈"]
+    assert [{entry.title: sentences} for entry, sentences in downloader.iter_stories()] == full
+    # the page is fetched again by each call, not once per story, and the downloader keeps only the index
+    assert site.count(r"p=19") == 4
+    assert not any(isinstance(value, StoryCleaner) for value in vars(downloader).values())
+    assert downloader.get_story("老人") == full[2]["老人"]
+    assert site.count(r"p=19") == 5
+
+
+def test_story_index_uses_the_caches(site, tmp_path):
+    session = HTTPSession(cache=ResponseCache(str(tmp_path / "pages")))
+    metrics = Metrics()
+    with session, RecordCache(str(tmp_path / "records.sqlite")) as record_cache:
+        downloader = StoryDownloader(URLDialector("泰雅語"), session, record_cache, metrics=metrics)
+        downloader.get_story_index()
+        assert [event["phase"] for event in metrics.events] == ["fetch", "parse"]
+        sentences = downloader.get_story("祖靈")
+        again = StoryDownloader(URLDialector("泰雅語"), session, record_cache, metrics=metrics)
+        assert again.get_story_index() == downloader.get_story_index() and again.get_story("祖靈") == sentences
+    # the later fetches are revalidated, and the second index comes from the record cache
+    assert [event.get("cache") for event in metrics.events if event["phase"] == "fetch"] == [
+        "miss", "revalidated", "revalidated", "revalidated"
+    ]
+    assert [event.get("cache") for event in metrics.events if event["phase"] == "parse"] == [None, "hit"]
+
+
+def test_changed_story_page_is_indexed_again(site):
+    downloader = StoryDownloader(URLDialector("泰雅語"))
+    first = downloader.get_story("老人")
+    html = read_fixture("story.html")
+    rows = [line for line in html.splitlines() if line.startswith("<tr")]
+    site.pages[19] = html.replace("\n".join(rows[:10]) + "\n", "")
+    assert downloader.get_story("老人") == first
+    assert [entry.title for entry in downloader.get_story_index()] == ["祖靈", "老人"]
+
+
+def test_get_story_of_an_unknown_title(site):
+    downloader = StoryDownloader(URLDialector("泰雅語"))
+    try:
+        downloader.get_story("沒有")
+    except ValueError as error:
+        assert "紋面" in str(error)
+    else:
+        raise AssertionError("ValueError not raised")
@@ -0,0 +1,55 @@
+import os
+from ilrdc.sync import Synchronizer
+from tests.pages import read_fixture
+
+VOCAB_URL = "l=2&p=18"
+GRAMMAR_URL = "l=2&p=10"
+
+
+def sync(site, session, output_dir, formats=("json",)) -> dict[str, list[str]]:
+    synchronizer = Synchronizer(str(output_dir), formats, session=session)
+    report = synchronizer.sync(["泰雅語"], ["vocab"])
+    for state, urls in synchronizer.sync(["泰雅語"], ["grammar"], "否定句結構").items():
+        report[state] += urls
+    return {state: sorted(url.split("?", 1)[1] for url in urls) for state, urls in report.items()}
+
+
+def test_unchanged_pages_are_not_rewritten(site, session, tmp_path):
+    assert sync(site, session, tmp_path)["changed"] == [GRAMMAR_URL, VOCAB_URL]
+    written = {name: os.path.getmtime(tmp_path / name) for name in os.listdir(tmp_path) if name != "manifest.json"}
+    report = sync(site, session, tmp_path)
+    assert report == {"changed": [], "unchanged": [GRAMMAR_URL, VOCAB_URL], "failed": []}
+    # the second run sends conditional requests, which are answered with 304
+    assert all("If-None-Match" in headers for _, headers in site.requests[-2:])
+    assert written == {name: os.path.getmtime(tmp_path / name) for name in written}
+
+
+def test_changed_pages_are_rewritten(site, session, tmp_path):
+    sync(site, session, tmp_path)
+    site.pages[10] = read_fixture("grammar.html").replace("maniq", "mangiq")
+    report = sync(site, session, tmp_path)
+    assert report["changed"] == [GRAMMAR_URL] and report["unchanged"] == [VOCAB_URL]
+    with open(tmp_path / "泰雅語 - 否定句結構.json", encoding="utf-8") as file:
+        assert "mangiq" in file.read()
+
+
+def test_added_formats_are_written(site, session, tmp_path):
+    sync(site, session, tmp_path)
+    report = sync(site, session, tmp_path, ("json", "csv"))
+    assert report["changed"] == [GRAMMAR_URL, VOCAB_URL]
+    assert (tmp_path / "泰雅語 - 否定句結構.csv").exists() and (tmp_path / "泰雅語 - 基本詞彙.csv").exists()
+    assert sync(site, session, tmp_path, ("csv",))["changed"] == []
+
+
+def test_deleted_outputs_are_written_again(site, session, tmp_path):
+    sync(site, session, tmp_path)
+    os.remove(tmp_path / "泰雅語 - 基本詞彙.json")
+    report = sync(site, session, tmp_path)
+    assert report["changed"] == [VOCAB_URL] and report["unchanged"] == [GRAMMAR_URL]
+    assert (tmp_path / "泰雅語 - 基本詞彙.json").exists()
+
+
+def test_failed_pages_are_reported(site, session, tmp_path):
+    site.statuses[18] = 404
+    report = sync(site, session, tmp_path)
+    assert report["failed"] == [VOCAB_URL] and report["changed"] == [GRAMMAR_URL]